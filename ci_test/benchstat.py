@@ -0,0 +1,188 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""benchmark ns/op 样本的统计比较: 中位数, bootstrap 置信区间和 Mann-Whitney U 检验"""
+
+import math
+import random
+from functools import lru_cache
+
+PERF_CSV_CLASS = "class"
+PERF_CSV_CASE = "case_name"
+PERF_CSV_PER_OP = "case_time_per_op(ns/op)"
+
+
+def bench_key(tcs, case_name):
+    """
+    benchmark 的比较键
+    报告中的 class 带有 split_log 路径前缀, 长度随工程目录变化, 只保留 用例文件名.TCS.CASE
+    """
+    return f"{str(tcs).replace(chr(92), '/').rsplit('/', 1)[-1]}.{case_name}"
+
+
+def median(values):
+    return percentile(values, 50)
+
+
+def percentile(values, p):
+    """线性插值的百分位数"""
+    data = sorted(values)
+    if not data:
+        return float("nan")
+    k = (len(data) - 1) * p / 100
+    f = math.floor(k)
+    c = math.ceil(k)
+    if f == c:
+        return data[int(k)]
+    return data[f] + (data[c] - data[f]) * (k - f)
+
+
+def cv(values):
+    """变异系数 stdev/mean"""
+    if len(values) < 2:
+        return 0.0
+    mean = sum(values) / len(values)
+    if mean == 0:
+        return 0.0
+    var = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+    return math.sqrt(var) / mean
+
+
+@lru_cache(maxsize=None)
+def _u_count(u, m, n):
+    """大小为 m/n 的两组无重复样本中 U 统计量恰好为 u 的排列数"""
+    if u < 0:
+        return 0
+    if m == 0 or n == 0:
+        return 1 if u == 0 else 0
+    return _u_count(u - n, m - 1, n) + _u_count(u, m, n - 1)
+
+
+def mann_whitney_greater(base, current):
+    """
+    单侧 Mann-Whitney U 检验, H1: current 大于 base
+    样本较小且无重复值时用精确分布, 否则用带连续性和重复值修正的正态近似
+    :return: (U, p)
+    """
+    m = len(base)
+    n = len(current)
+    if m == 0 or n == 0:
+        return 0.0, 1.0
+    ranked = sorted([(v, 0) for v in base] + [(v, 1) for v in current])
+    ranks = [0.0] * len(ranked)
+    tie_term = 0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        tie_term += t ** 3 - t
+        i = j + 1
+    rank_sum = sum(r for r, (_, group) in zip(ranks, ranked) if group == 1)
+    u = rank_sum - n * (n + 1) / 2  # current 中每个值大于 base 中值的次数
+    if tie_term == 0 and m <= 20 and n <= 20:
+        total = math.comb(m + n, m)
+        count = sum(_u_count(x, n, m) for x in range(int(u), m * n + 1))
+        return u, count / total
+    mu = m * n / 2
+    sigma = math.sqrt(m * n / 12 * ((m + n + 1) - tie_term / ((m + n) * (m + n - 1))))
+    if sigma == 0:
+        return u, 1.0
+    z = (u - mu - 0.5) / sigma
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def min_p_value(m, n):
+    """样本数为 m/n 时单侧精确 Mann-Whitney U 检验能得到的最小 p 值, 即两组完全分开时的 1/C(m+n, m)"""
+    if m == 0 or n == 0:
+        return 1.0
+    return 1 / math.comb(m + n, m)
+
+
+def bootstrap_change_ci(base, current, iterations=2000, confidence=0.95, seed=0):
+    """中位数相对变化 median(current)/median(base)-1 的 bootstrap 置信区间"""
+    rng = random.Random(seed)
+    changes = []
+    for _ in range(iterations):
+        b = median([rng.choice(base) for _ in base]) if len(base) > 1 else base[0]
+        c = median([rng.choice(current) for _ in current])
+        if b:
+            changes.append(c / b - 1)
+    if not changes:
+        return float("nan"), float("nan")
+    alpha = (1 - confidence) / 2 * 100
+    return percentile(changes, alpha), percentile(changes, 100 - alpha)
+
+
+def compare(baseline, current, threshold=5.0, alpha=0.05):
+    """
+    比较两组 benchmark 样本
+    :param baseline/current: {benchmark: [ns/op, ...]}
+    :param threshold: 变慢超过该百分比才算回退
+    :return: [dict] 每个 benchmark 一行, verdict 为 regression/improvement/same/insufficient/new/missing;
+             insufficient 表示样本数太少, 即使两组完全分开 p 值也达不到 alpha, 无法判定
+    """
+    rows = []
+    for key in sorted(set(baseline) | set(current)):
+        base = baseline.get(key) or []
+        cur = current.get(key) or []
+        row = {"benchmark": key, "base_n": len(base), "current_n": len(cur),
+               "base_median": median(base) if base else None, "current_median": median(cur) if cur else None,
+               "change": None, "ci_low": None, "ci_high": None, "p": None}
+        if not base:
+            row["verdict"] = "new"
+        elif not cur:
+            row["verdict"] = "missing"
+        else:
+            row["change"] = row["current_median"] / row["base_median"] - 1 if row["base_median"] else 0.0
+            row["ci_low"], row["ci_high"] = bootstrap_change_ci(base, cur)
+            _, p_slower = mann_whitney_greater(base, cur)
+            _, p_faster = mann_whitney_greater(cur, base)
+            row["p"] = min(p_slower, p_faster)
+            if min_p_value(len(base), len(cur)) >= alpha:
+                row["verdict"] = "insufficient"
+            elif p_slower < alpha and row["ci_low"] * 100 > threshold:
+                row["verdict"] = "regression"
+            elif p_faster < alpha and row["ci_high"] * 100 < -threshold:
+                row["verdict"] = "improvement"
+            else:
+                row["verdict"] = "same"
+        rows.append(row)
+    return rows
+
+
+def load_perf_csv(path):
+    """读取 perf.csv 或 bench_samples.csv 作为基线: {benchmark: [ns/op, ...]}"""
+    import csv
+    samples = {}
+    with open(path, "r", encoding="UTF-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                value = float(row[PERF_CSV_PER_OP])
+            except (KeyError, TypeError, ValueError):
+                continue
+            samples.setdefault(bench_key(row[PERF_CSV_CLASS], row[PERF_CSV_CASE]), []).append(value)
+    return samples
+
+
+def write_samples_csv(path, samples):
+    import csv
+    with open(path, "w", encoding="UTF-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([PERF_CSV_CLASS, PERF_CSV_CASE, "run", PERF_CSV_PER_OP])
+        for key in sorted(samples):
+            tcs, case_name = key.rsplit(".", 1)
+            for run, value in enumerate(samples[key]):
+                writer.writerow([tcs, case_name, run, value])
+
+
+def write_compare_csv(path, rows):
+    import csv
+    fields = ["benchmark", "verdict", "base_n", "current_n", "base_median", "current_median", "change", "ci_low",
+              "ci_high", "p"]
+    with open(path, "w", encoding="UTF-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
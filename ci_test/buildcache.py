@@ -0,0 +1,93 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""cjpm build 输出目录的本地缓存, 以工程配置, 源码, 编译器和构建选项的内容哈希为键"""
+
+import os
+import shutil
+import time
+
+# 不参与哈希的目录: 构建输出和版本管理目录
+IGNORED_DIRS = {".git", "target", "build", "__pycache__"}
+
+
+def _update_file(hasher, path):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+
+
+def update_tree(hasher, root):
+    """按相对路径排序把目录下所有文件的路径和内容加入哈希"""
+    for dir_path, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+        for name in sorted(files):
+            path = os.path.join(dir_path, name)
+            hasher.update(os.path.relpath(path, root).replace(os.sep, "/").encode("utf-8") + b"\0")
+            _update_file(hasher, path)
+
+
+def cache_key(home_dir, cjc_version, triple, flags, dependencies=()):
+    """
+    :param flags: 影响构建输出的选项, 如 ["--coverage"]
+    :param dependencies: 本地 path 依赖的目录, 内容变化时缓存失效
+    """
+    import hashlib
+    hasher = hashlib.sha256()
+    for name in ("cjpm.toml", "cjpm.lock", "module.json"):
+        path = os.path.join(home_dir, name)
+        hasher.update(name.encode("utf-8") + b"\0")
+        if os.path.isfile(path):
+            _update_file(hasher, path)
+    for root in [os.path.join(home_dir, "src")] + sorted(dependencies):
+        hasher.update(b"\0tree\0")
+        if os.path.isdir(root):
+            update_tree(hasher, root)
+    hasher.update("\0".join([cjc_version or "", triple or ""] + sorted(flags)).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+class BuildCache:
+    def __init__(self, cache_dir, max_entries=10):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def _entry(self, key):
+        return os.path.join(self.cache_dir, f"{key}.tar")
+
+    def restore(self, key, target_dir):
+        """命中时用缓存替换 target_dir, 返回是否命中"""
+        entry = self._entry(key)
+        if not os.path.isfile(entry):
+            return False
+        import tarfile
+        shutil.rmtree(target_dir, ignore_errors=True)
+        with tarfile.open(entry, "r") as tar:
+            tar.extractall(os.path.dirname(target_dir))
+        os.utime(entry)  # 按最近使用时间淘汰
+        return True
+
+    def store(self, key, target_dir):
+        """把 target_dir 打包写入缓存, 先写临时文件再重命名, 并发构建不会读到写了一半的缓存"""
+        if not os.path.isdir(target_dir):
+            return False
+        import tarfile
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = self._entry(key)
+        temp = f"{entry}.{os.getpid()}.tmp"
+        with tarfile.open(temp, "w") as tar:
+            tar.add(target_dir, arcname=os.path.basename(target_dir))
+        os.replace(temp, entry)
+        self.prune()
+        return True
+
+    def prune(self):
+        """只保留最近使用的 max_entries 个缓存"""
+        entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".tar")]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for entry in entries[self.max_entries:]:
+            os.remove(entry)
+        # 被中断的写入留下的临时文件
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".tmp") and time.time() - os.path.getmtime(path) > 24 * 3600:
+                os.remove(path)
@@ -1,33 +1,46 @@
 # @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
 # Licensed under the Apache-2.0 License. See LICENSE file for details.
 
-import csv
 import glob
-import zipfile
 import argparse
-import configparser
+import contextlib
 import json
 import logging
 import os
 import re
 import platform
 import shutil
+import signal
 import subprocess
 import sys
+import tempfile
 import threading
-import uuid
 import time
-import urllib.request
-import urllib.parse
-import urllib.error
+from collections.abc import Mapping
 from subprocess import PIPE
 from pathlib import Path
-from xml.dom import minidom
-from config import ArgConfig, llt_check_not_start_or_end_with_target
-from tomlkit import parse, dump as dump_c
-from logging import handlers
-from logging.handlers import TimedRotatingFileHandler
-import xml.etree.cElementTree as Et
+from config import RAW_OUTPUT, ArgConfig, llt_check_not_start_or_end_with_target
+from buildcache import BuildCache, cache_key
+from configcache import freeze, invalidate, load_cfg, load_json, load_toml, load_toml_document
+from envpaths import library_env_name, update_env_paths
+from importscan import uses_stdx
+from libindex import link_names, reset_index, walk_cached
+from gitfetch import CI_LIB_URL, checkout_branch, fetch_branch, fetch_branches, has_branch, strip_credentials, \
+    update_mirror
+from toolchain import probe
+from libfuzzer import artifact_kind, crash_signature, parse_fuzz_lines, summarize, write_crashes_json, \
+    write_series_csv, write_stats_json
+from benchstat import bench_key, compare, cv, load_perf_csv, median, percentile, write_compare_csv, \
+    write_samples_csv
+
+# 只在子命令中用到的模块(tomlkit, xml, csv, sqlite3, urllib, zipfile, logging.handlers 等)在函数中导入,
+# 上面的辅助模块也只在函数中导入 configparser, csv, hashlib, calendar, urllib 等较重的标准库,
+# ciTest.py --help 不加载, 用 startup_bench.py 检查启动耗时
+
+
+def dump_c(data, fp):
+    from tomlkit import dump
+    return dump(data, fp)
 
 dynamic_lib = ".dll" if platform.system() == "Windows" else ".so"
 static_lib = ".lib" if platform.system() == "Windows" else ".a"
@@ -45,6 +58,7 @@ def add_llt_common_arguments(parser):
     test_parser_path.add_argument("--target", help="适用于ohos")
     test_parser_path.add_argument("--clean", action='store_true', help="是否清空测试临时目录")
     test_parser_path.add_argument("-p", "--path", help="指定跑一个文件夹, 适用于在test/LLT文件夹多个文件夹方式")
+    add_quiet_argument(parser)
     parser.set_defaults(func=test)
 
 
@@ -65,6 +79,12 @@ def add_hlt_common_arguments(cjtest_parser):
     cjtest_parser_branch.add_argument("--clean", action='store_true', help="是否清空测试临时目录")
     cjtest_parser_branch.add_argument("--main", action='store_true', help="HLT用例测试方式")
     cjtest_parser_branch.add_argument("--fuzz", action='store_true', help="HLT用例测试方式")
+    add_quiet_argument(cjtest_parser)
+
+
+def add_quiet_argument(parser):
+    parser.add_argument("-q", "--quiet", "--progress", dest="quiet", action='store_true',
+                        help="用例的原始输出只写入每个用例的日志文件, 控制台只显示一行刷新的进度信息")
 
 
 def __set_args_default_attribute(args, attr: str):
@@ -95,9 +115,16 @@ def set_args_default_attribute(args):
     __set_args_default_attribute(args, "csv")
     __set_args_default_attribute(args, "update_stdx")
     __set_args_default_attribute(args, "update_toml")
+    __set_args_default_attribute(args, "quiet")
+    __set_args_default_attribute(args, "repeat")
+    __set_args_default_attribute(args, "baseline")
+    __set_args_default_attribute(args, "warmup")
+    __set_args_default_attribute(args, "cpus")
+    __set_args_default_attribute(args, "serial")
+    __set_args_default_attribute(args, "budget")
 
 
-def parse_args(cfgs):
+def create_parser():
     parser = argparse.ArgumentParser(description="仓颉三方库功能集成脚本")
     sub_parser = parser.add_subparsers()
     coverage_parser = sub_parser.add_parser("coverage", help="生成覆盖率报告的命令")
@@ -125,6 +152,7 @@ def parse_args(cfgs):
     build_parser.add_argument("--release", action='store_true', help="release模式编译")
     build_parser.add_argument("--debug", action='store_true', help="debug模式编译")
     build_parser.add_argument('--verbose', action='store_true', help="--verbose")
+    build_parser.add_argument("--no-cache", action='store_true', help="不使用构建缓存, 直接执行cjpm build")
     build_parser.set_defaults(func=build)
 
     build_parser = sub_parser.add_parser("download", help="下载测试仓库文件")
@@ -187,6 +215,9 @@ def parse_args(cfgs):
     fuzz_parser.add_argument("--case")
     fuzz_parser.add_argument("--clean", action='store_true', help="是否清空测试临时目录")
     fuzz_parser.add_argument("-p", "--path")
+    fuzz_parser.add_argument("--budget", type=parse_duration,
+                             help="所有 fuzz 目标的总时间预算, 如 2h/90m/600s, 按覆盖率增长动态分配给各目标")
+    add_quiet_argument(fuzz_parser)
 
     bench_parser = sub_parser.add_parser("bench", help="性能用例测试方式, 会寻找test/bench文件夹是否存在性能用例")
     bench_parser.set_defaults(func=bench_mark)
@@ -194,6 +225,26 @@ def parse_args(cfgs):
     bench_parser.add_argument("--case", help="")
     bench_parser.add_argument("--clean", action='store_true', help="是否清空测试临时目录")
     bench_parser.add_argument("-p", "--path", help="")
+    bench_parser.add_argument("--repeat", type=int,
+                              help=f"每个性能用例执行的次数, 用于统计 ns/op 的分布; 默认 1, 指定 --baseline 时默认 {BASELINE_REPEAT}")
+    bench_parser.add_argument("--baseline", help="性能基线: perf.csv/bench_samples.csv 文件路径, "
+                                                 "或 history 表示历史数据库中最近几次 bench 运行")
+    bench_parser.add_argument("--baseline-last", type=int, default=5, help="--baseline=history 时使用最近N次 bench 运行")
+    bench_parser.add_argument("--threshold", type=float, default=5.0,
+                              help="中位数变慢超过该百分比且统计显著时判定为性能回退, 默认 5")
+    bench_parser.add_argument("--alpha", type=float, default=0.05, help="Mann-Whitney U 检验的显著性水平, 默认 0.05")
+    bench_parser.add_argument("--warmup", type=int, default=0, help="正式计时前每个性能用例预热执行的次数, 输出丢弃")
+    bench_parser.add_argument("--cpu", dest="cpus", type=parse_cpu_list,
+                              help="执行性能用例时绑定的CPU, 如 3 或 2,3 或 4-7 (仅linux)")
+    bench_parser.add_argument("--serial", action='store_true',
+                              help="执行性能用例时持有本机文件锁, 与其他同样带 --serial 的 bench 任务串行执行")
+    bench_parser.add_argument("--check-governor", action='store_true',
+                              help="CPU 调频策略为 powersave 时直接退出")
+    bench_parser.add_argument("--compare-cj-home", nargs=2, metavar=("A", "B"),
+                              help="分别用两个仓颉环境编译并执行性能用例, 对比 ns/op")
+    bench_parser.add_argument("--rounds", type=int, default=3,
+                              help="--compare-cj-home 时两个仓颉环境交替执行的轮数, 默认 3")
+    add_quiet_argument(bench_parser)
 
     ## 计算 DT个数方法
     count_parser = sub_parser.add_parser("count", help="默认会统计LLT和HLT总计的用例数")
@@ -206,12 +257,31 @@ def parse_args(cfgs):
     perf_parser.set_defaults(func=perf_test)
     perf_parser.add_argument("--case")
 
+    history_parser = sub_parser.add_parser("history", help="查询本地历史数据库中的用例结果和耗时")
+    # history 只读本地数据库, 不需要检查 cjc 工具链
+    history_parser.set_defaults(func=history, needs_toolchain=False)
+    history_query = history_parser.add_mutually_exclusive_group()
+    history_query.add_argument("--slowest", type=int, help="列出平均耗时最长的N个用例(默认)")
+    history_query.add_argument("--trend", help="查看某个用例(文件名或testcase名)每次运行的结果和耗时")
+    history_query.add_argument("--flaky", action='store_true', help="列出结果不稳定的用例及失败率")
+    history_parser.add_argument("--by", choices=["compile", "run"], default="run", help="--slowest 按编译还是运行耗时排序")
+    history_parser.add_argument("--kind", choices=["llt", "hlt", "bench", "fuzz"], help="只统计某类运行")
+    history_parser.add_argument("--last", type=int, default=20, help="只统计最近N次运行")
+    return parser
+
+
+def parse_args(cfgs):
+    parser = create_parser()
     par = parser.parse_args()
     par.CANGJIE_CI_TEST_CFGS = cfgs
     if len(sys.argv) == 1:
         parser.print_help()
         sys.exit(1)
-    config_cjc(par)
+    # --help 和参数错误时不需要读取 ci_test.cfg 和创建日志文件
+    cfgs.LOG = init_log(cfgs, "ci_test")
+    if getattr(par, "needs_toolchain", True):
+        with timed_phase("env"):
+            config_cjc(par)
     try:
         par.func(par)
     except KeyboardInterrupt:
@@ -224,9 +294,115 @@ def perf_test(args):
     cfgs.LOG.info("请注意生成火焰图时需要开启O2编译选项优化. ")
 
 
+def parse_cpu_list(value):
+    cpus = set()
+    try:
+        for part in value.split(","):
+            if "-" in part:
+                first, last = part.split("-", 1)
+                cpus.update(range(int(first), int(last) + 1))
+            elif part.strip():
+                cpus.add(int(part))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的CPU列表: {value}")
+    if not cpus:
+        raise argparse.ArgumentTypeError(f"无效的CPU列表: {value}")
+    return cpus
+
+
+def check_cpu_governor(cfgs, cpus=None):
+    """CPU 调频策略为 powersave 时 ns/op 波动很大, 直接退出"""
+    governors = {}
+    for path in glob.glob("/sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_governor"):
+        cpu = int(re.search(r"cpu(\d+)", path).group(1))
+        if cpus and cpu not in cpus:
+            continue
+        with open(path, "r") as f:
+            governors[cpu] = f.read().strip()
+    if not governors:
+        cfgs.LOG.warning("无法读取 CPU 调频策略(scaling_governor), 跳过检查")
+        return
+    powersave = sorted(cpu for cpu, governor in governors.items() if governor == "powersave")
+    if powersave:
+        cfgs.LOG.error(f"CPU {','.join(map(str, powersave))} 的调频策略为 powersave, 性能数据不可信, "
+                       f"请切换为 performance 后再试.")
+        exit(1)
+    cfgs.LOG.info(f"CPU 调频策略: {', '.join(sorted(set(governors.values())))}")
+
+
+def bench_child_args(args):
+    """--compare-cj-home 时传给每次子进程 bench 的参数"""
+    child_args = ["bench", "--repeat", str(args.repeat or 1), "--warmup", str(args.warmup or 0)]
+    for option, value in (("--root", args.root), ("--case", args.case), ("--path", args.path)):
+        if value:
+            child_args += [option, value]
+    if args.cpus:
+        child_args += ["--cpu", ",".join(map(str, sorted(args.cpus)))]
+    if args.serial:
+        child_args.append("--serial")
+    if args.quiet:
+        child_args.append("--quiet")
+    return child_args
+
+
+def compare_toolchains(args, cfgs):
+    """
+    A/B 两个仓颉环境交替(ABBA 顺序)编译并执行同一套性能用例, 抵消机器状态随时间的漂移;
+    每轮切换环境时重新 build, 各自的 ns/op 样本汇总后逐个比较, 结果写入 bench_ab.csv
+    """
+    homes = [os.path.abspath(home) for home in args.compare_cj_home]
+    for home in homes:
+        if not os.path.exists(os.path.join(home, "bin")):
+            cfgs.LOG.error(f"仓颉环境不存在: {home}")
+            return 1
+    envs = []
+    for home in homes:
+        env = dict(os.environ)
+        set_cangjie_home(cfgs, home, env)
+        envs.append(env)
+    ci_test = os.path.join(cfgs.FILE_ROOT, "ciTest.py")
+    samples = [{}, {}]
+    built = None
+    for rnd in range(args.rounds):
+        for idx in ((0, 1) if rnd % 2 == 0 else (1, 0)):
+            label = "AB"[idx]
+            if built != idx:
+                cfgs.LOG.info(f"[round {rnd + 1}/{args.rounds}] {label}: build with {homes[idx]}")
+                if subprocess.run([sys.executable, ci_test, "build"], cwd=cfgs.HOME_DIR, env=envs[idx]).returncode:
+                    cfgs.LOG.error(f"{label}: {homes[idx]} 编译失败")
+                    return 1
+                built = idx
+            cfgs.LOG.info(f"[round {rnd + 1}/{args.rounds}] {label}: bench with {homes[idx]}")
+            code = subprocess.run([sys.executable, ci_test] + bench_child_args(args), cwd=cfgs.HOME_DIR,
+                                  env=envs[idx]).returncode
+            samples_csv = os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", "bench_samples.csv")
+            if code not in (0, 1) or not os.path.exists(samples_csv):
+                cfgs.LOG.error(f"{label}: {homes[idx]} 性能用例执行失败, return === {code}")
+                return 1
+            for key, values in load_perf_csv(samples_csv).items():
+                samples[idx].setdefault(key, []).extend(values)
+    rows = compare(samples[0], samples[1], args.threshold, args.alpha)
+    write_compare_csv(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", "bench_ab.csv"), rows)
+    cfgs.LOG.info(f"A = {homes[0]}")
+    cfgs.LOG.info(f"B = {homes[1]}")
+    log_bench_compare(cfgs.LOG, rows, f"Benchmark A/B ({args.rounds} rounds, threshold: {args.threshold}%, "
+                                      f"alpha: {args.alpha})", "A", "B")
+    return 0
+
+
 def bench_mark(args):
     set_args_default_attribute(args)
     cfgs = args.CANGJIE_CI_TEST_CFGS
+    if args.repeat is None:
+        # 每个用例只有 1 个样本时 Mann-Whitney U 检验的 p 值最小也有 0.5, 与基线比较永远判定不了回退
+        args.repeat = BASELINE_REPEAT if args.baseline else 1
+    if args.cpus and not hasattr(os, "sched_setaffinity"):
+        cfgs.LOG.warning("当前平台不支持绑定CPU, 忽略 --cpu")
+        args.cpus = None
+    if getattr(args, "check_governor", False):
+        check_cpu_governor(cfgs, args.cpus)
+    if getattr(args, "compare_cj_home", None):
+        exit(compare_toolchains(args, cfgs))
     if args.root:
         set_cjtest_path(args, cfgs, '3rd_party_root')
     if get_cjtest_path(args, cfgs, "") == "":
@@ -295,6 +471,7 @@ def fuzz_test(args):
 
 def cjtest(args):
     # os.popen('{} -v'.format(master_cjc))
+    set_args_default_attribute(args)
     cfgs = args.CANGJIE_CI_TEST_CFGS
     if args.coverage:
         args.optimize = '-O0 --coverage'
@@ -336,7 +513,7 @@ def cangjie_ut(args):
 
 
 def main(cfgs):
-    cfgs.LOG = init_log(cfgs, "ci_test")
+    cfgs.START_TIME = time.time()
     parse_args(cfgs)
 
 
@@ -392,6 +569,7 @@ def build(args):
         cfgs.LOG.info(f"清理build构建目录: {os.path.join(cfgs.HOME_DIR, cfgs.BUILD_BIN)}")
         shutil.rmtree(os.path.join(cfgs.HOME_DIR, cfgs.BUILD_BIN), ignore_errors=True)
     runBuild(args, cfgs)
+    reset_index()  # 构建输出目录已变化, 同一进程中之后的测试重新索引
 
 
 def download(args):
@@ -417,6 +595,8 @@ def download(args):
     # 1. 构建Git仓库HTTPS URL（处理账号密码+特殊字符编码）
     git_host = "gitcode.com"  # 可根据实际场景改为GitLab/Gitee等，或抽成配置
     # 对用户名/密码做URL编码（避免特殊字符如@、&导致URL错误）
+    import urllib.parse
+    import uuid
     encoded_username = urllib.parse.quote(args.username or "", safe="")
     encoded_password = urllib.parse.quote(args.password or "", safe="")
 
@@ -445,35 +625,29 @@ def download(args):
             cfgs.LOG.error(f"删除已有目录失败：{e}")
             raise
 
-    # 4. 构建git clone命令（浅克隆+指定目录）
-    clone_cmd = [
-        "git", "clone", "--depth", str(args.depth), repo_url, '-b', args.bench, clone_target_dir  # 克隆到指定目录
-    ]
-    cfgs.LOG.info(f"执行Git命令：{' '.join(clone_cmd).replace(args.password, '****')}")
-
-    # 5. 执行克隆命令（捕获异常并记录日志）
-    try:
-        # 执行命令并捕获输出（stdout/stderr）
-        result = subprocess.run(
-            clone_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding="utf-8",
-            check=True  # 执行失败时抛出CalledProcessError
-        )
-        # 打印克隆成功日志
-        cfgs.LOG.info(f"仓库克隆成功！输出：{result.stdout.strip()}")
-
-    except subprocess.CalledProcessError as e:
-        # 命令执行失败（如仓库不存在、账号密码错误、网络问题）
-        error_msg = f"仓库克隆失败！命令返回码：{e.returncode}，错误信息：{e.stderr.strip()}"
-        cfgs.LOG.error(error_msg)
-        raise Exception(error_msg) from e  # 抛出异常让上层处理
-    except Exception as e:
-        # 其他异常（如权限不足、路径错误）
-        cfgs.LOG.error(f"克隆仓库时发生未知错误：{str(e)}")
-        raise
+    def mask(text):
+        return text.replace(args.password, '****') if args.password else text
+
+    # 4. 配置了镜像目录时只从远端拉取增量到本地镜像, 并且只检出 test 目录
+    if cfgs.git_mirror_dir:
+        mirror, code, out = update_mirror(cfgs.git_mirror_dir, repo_url, [args.bench], int(args.depth))
+        cfgs.LOG.info(f"更新本地镜像：{mirror} <- {strip_credentials(repo_url)} {args.bench}")
+        for line in mask(out).splitlines():
+            cfgs.LOG.info(line)
+        if code != 0 and not has_branch(mirror, args.bench):
+            error_msg = f"仓库克隆失败！命令返回码：{code}，错误信息：{mask(out).strip()}"
+            cfgs.LOG.error(error_msg)
+            raise Exception(error_msg)
+        if code != 0:
+            cfgs.LOG.warning(f"镜像更新失败, 使用本地镜像中已有的 {args.bench}")
+        code, out = checkout_branch(mirror, args.bench, os.path.join(cfgs.HOME_DIR, clone_target_dir), ["test"])
+        if code != 0:
+            error_msg = f"从本地镜像检出失败！命令返回码：{code}，错误信息：{out.strip()}"
+            cfgs.LOG.error(error_msg)
+            raise Exception(error_msg)
+        cfgs.LOG.info("仓库克隆成功！")
+    else:
+        __clone_test_repo(cfgs, args, repo_url, clone_target_dir, mask)
     # 5 文件夹 check
 
     if os.path.exists(target_dir):
@@ -508,6 +682,38 @@ def download(args):
     cfgs.LOG.info(f"文件夹已移动到：{target_dir}")
 
 
+def __clone_test_repo(cfgs, args, repo_url, clone_target_dir, mask):
+    # 构建git clone命令（浅克隆+指定目录）
+    clone_cmd = [
+        "git", "clone", "--depth", str(args.depth), repo_url, '-b', args.bench, clone_target_dir  # 克隆到指定目录
+    ]
+    cfgs.LOG.info(f"执行Git命令：{mask(' '.join(clone_cmd))}")
+
+    # 5. 执行克隆命令（捕获异常并记录日志）
+    try:
+        # 执行命令并捕获输出（stdout/stderr）
+        result = subprocess.run(
+            clone_cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            check=True  # 执行失败时抛出CalledProcessError
+        )
+        # 打印克隆成功日志
+        cfgs.LOG.info(f"仓库克隆成功！输出：{result.stdout.strip()}")
+
+    except subprocess.CalledProcessError as e:
+        # 命令执行失败（如仓库不存在、账号密码错误、网络问题）
+        error_msg = f"仓库克隆失败！命令返回码：{e.returncode}，错误信息：{e.stderr.strip()}"
+        cfgs.LOG.error(error_msg)
+        raise Exception(error_msg) from e  # 抛出异常让上层处理
+    except Exception as e:
+        # 其他异常（如权限不足、路径错误）
+        cfgs.LOG.error(f"克隆仓库时发生未知错误：{str(e)}")
+        raise
+
+
 def test(args):
     set_args_default_attribute(args)
     cfgs = args.CANGJIE_CI_TEST_CFGS
@@ -533,21 +739,22 @@ def test(args):
         args.optimize = f" -O{args.O}"
     cfgs.Woff = ""
     try:
-        version = os.popen('cjc -v').readline().split('Cangjie Compiler: ')[1].split(' (')[0]
-        vs = version.split('.')
+        vs = probe()["version"].split('.')
         if float(vs[0]) > 0 or float(vs[1]) >= 39.7:
             cfgs.Woff = " -Woff all"
     except:
         pass
-    __find_cjpm_home_librarys(args, cfgs)
+    with timed_phase("env"):
+        __find_cjpm_home_librarys(args, cfgs)
     runAll(args, cfgs)
+    record_history(args, cfgs, "llt")
+    print_time_summary(cfgs, cfgs.LOG)
     end_build(cfgs)
 
 
 def __find_cjpm_home_librarys(args, cfgs):
     try:
-        parms = parse(open(os.path.join(cfgs.HOME_DIR, "cjpm.lock"), "r", encoding='UTF-8').read())
-        sss = ''
+        parms = load_toml(os.path.join(cfgs.HOME_DIR, "cjpm.lock"))
         for key, value in parms['requires'].items():
             for k, v in value.items():
                 if k == 'commitId':
@@ -556,27 +763,26 @@ def __find_cjpm_home_librarys(args, cfgs):
                                                                                               v))
                     sub_lib = os.path.join(cfgs.BUILD_CJPM_PATH, key, v, str_lib)
                     if os.path.exists(sub_lib):
-                        sss = f' -L {sub_lib} '
+                        add_library_path(cfgs, sub_lib)
                         __set_up_the_link_lib(cfgs, sub_lib)
-                        sss += __improt_libs([sub_lib], cfgs)
+                        __improt_libs([sub_lib], cfgs)
                         if cfgs.OS_PLATFORM == "windows":
                             __get_windows_c_lib_arr(cfgs, sub_lib)
         str_lib = __get_cjpm_library_cjpm_lock_foreign_requires_path(cfgs, cfgs.HOME_DIR)
         sub_lib = os.path.join(cfgs.HOME_DIR, str_lib)
         if os.path.exists(sub_lib):
-            sss = f' -L {sub_lib} '
+            add_library_path(cfgs, sub_lib)
             __set_up_the_link_lib(cfgs, sub_lib)
-            sss += __improt_libs([sub_lib], cfgs)
+            __improt_libs([sub_lib], cfgs)
             if cfgs.OS_PLATFORM == "windows":
                 __get_windows_c_lib_arr(cfgs, sub_lib)
-        cfgs.IMPORT_PATH += sss
     except Exception as e:
         cfgs.LOG.error(f"函数__find_cjpm_home_librarys，遇到异常错误 {e}")
 
 
 
 def __get_windows_c_lib_arr(cfgs, sub_lib):
-    for path, _, libs in os.walk(sub_lib):
+    for path, _, libs in walk_cached(sub_lib):
         for lib in libs:
             if lib.startswith("lib") and lib.endswith(".dll"):
                 cfgs.WINDOWS_C_LIB_ARR.add(os.path.join(path, lib))
@@ -584,7 +790,7 @@ def __get_windows_c_lib_arr(cfgs, sub_lib):
 
 def __get_cjpm_library_cjpm_lock_foreign_requires_path(cfgs, that_lib_path):
     if cfgs.BUILD_BIN != "build" and os.path.exists(os.path.join(that_lib_path, "cjpm.toml")):
-        parm = parse(open(os.path.join(that_lib_path, "cjpm.toml"), "r", encoding='UTF-8').read())
+        parm = load_toml(os.path.join(that_lib_path, "cjpm.toml"))
         if parm.get('ffi') is not None:
             for key, value in parm['ffi'].items():
                 if key == "c":
@@ -594,7 +800,7 @@ def __get_cjpm_library_cjpm_lock_foreign_requires_path(cfgs, that_lib_path):
                                 return str(v).replace('./', '').replace('/', os.path.sep)
     else:
         # json
-        parm = json.load(open(os.path.join(that_lib_path, "module.json"), 'r', encoding='UTF-8'))
+        parm = load_json(os.path.join(that_lib_path, "module.json"))
         for ke, val in parm["foreign_requires"].items():
             for k, v in val.items():
                 if k == 'path':
@@ -603,48 +809,33 @@ def __get_cjpm_library_cjpm_lock_foreign_requires_path(cfgs, that_lib_path):
 
 
 # 下载stdx 文件
-def download_large_with_urllib(url, save_path, chunk_size=1024 * 1024):
+def download_stdx(cfgs, url, save_path):
+    """:return: 下载并校验通过的 zip 路径, 失败时返回 None"""
+    from downloader import DownloadError, download_file, expected_sha256, load_manifest
+    manifest = load_manifest(cfgs.download_manifest)
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            # 获取文件总大小
-            total_size = int(response.headers.get('Content-Length', 0))
-
-            with open(save_path, 'wb') as f:
-                downloaded_size = 0
-                while True:
-                    chunk = response.read(chunk_size)
-                    if not chunk:
-                        break  # 下载完成
-                    f.write(chunk)
-                    downloaded_size += len(chunk)
-                    # 显示进度
-                    progress = (downloaded_size / total_size) * 100 if total_size > 0 else 0
-                    print(f"\r下载进度：{downloaded_size}/{total_size} bytes ({progress:.2f}%)", end="")
-
-        print(f"\n下载成功！文件保存到：{save_path}")
-    except urllib.error.URLError as e:
-        print(f"\n下载失败：{e}")
+        return download_file(url, save_path, cache_dir=cfgs.download_cache_dir, sha256=expected_sha256(manifest, url),
+                             segments=cfgs.download_segments, log=cfgs.LOG.info)
+    except DownloadError as e:
+        cfgs.LOG.warn(str(e))
+        return None
 
 # 解压stdx 文件
-def unzip_file(zip_path, extract_dir):
+def unzip_file(cfgs, zip_path, extract_dir):
     """
-    解压 ZIP 文件（无密码）
+    解压 ZIP 文件（无密码）, 已经解压且内容一致的文件跳过
     :param zip_path: ZIP 文件路径
     :param extract_dir: 解压目标目录
     """
+    import zipfile
+    from zipextract import extract_zip
     try:
-        # 确保目标目录存在
-        os.makedirs(extract_dir, exist_ok=True)
-
-        # 打开 ZIP 文件
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            # 解压所有文件到目标目录
-            zip_ref.extractall(extract_dir)
-            print(f"解压成功！文件已提取到：{extract_dir}")
+        extracted, skipped = extract_zip(zip_path, extract_dir)
+        cfgs.LOG.info(f"解压成功！文件已提取到：{extract_dir}, 解压 {extracted} 个文件, 跳过未变化的 {skipped} 个文件")
     except zipfile.BadZipFile:
-        print(f"解压失败：{zip_path} 不是有效的 ZIP 文件")
+        cfgs.LOG.error(f"解压失败：{zip_path} 不是有效的 ZIP 文件")
     except Exception as e:
-        print(f"解压失败：{e}")
+        cfgs.LOG.error(f"解压失败：{e}")
 
 
 def config_cjc(args):
@@ -655,14 +846,14 @@ def config_cjc(args):
     cfg = os.path.join(cfgs.HOME_DIR, cfgs.CONFIG_FILE)
     try:
         if str(cfgs.CONFIG_FILE).endswith('.toml'):
-            parm = parse(open(cfg, "r", encoding='UTF-8').read())
+            parm = load_toml(cfg)
             if parm.get('package') is not None:
                 for key, value in parm['package'].items():
                     if key == "cjc-version":
                         cfgs.EXPECT_CJC_VERSION = value
                         break
         else:
-            parm = json.load(open(cfg, 'r', encoding='UTF-8'))
+            parm = load_json(cfg)
             cfgs.EXPECT_CJC_VERSION = parm['cjc_version']
     except:
         cfgs.LOG.warn("本项目没有配置文件module.json和cjpm.toml")
@@ -700,20 +891,16 @@ def config_cjc(args):
         cfgs.CANGJIE_HOME = os.path.dirname(os.path.dirname(shutil.which("cjc")))
     except:
         cfgs.LOG.warn("默认配置和用户都未设置仓颉环境, 请检查")
-    out = "".join(os.popen('{} -v'.format(shutil.which("cjc"))).readlines())
-    cfgs.LOG.info(out)
-    cfgs.BASE_CJC_VERSION = out.split('Cangjie Compiler: ')[1].split(' (')[0]
-    h_cjc_version_arr = cfgs.BASE_CJC_VERSION.split(".")
-    cfgs.CANGJIE_TARGET = out.split('Target: ')[1].replace('\n', '').replace('\r', '')
-    h_cjc_version = float(h_cjc_version_arr[0])
-    if float(h_cjc_version_arr[1]) != 0:
-        h_cjc_version += float(f'0.{h_cjc_version_arr[1]}')
-    if h_cjc_version < 0.49:
-        cfgs.set_build_bin("build")
-        cfgs.LIB_DIR = os.path.join(cfgs.HOME_DIR, "build")
-    else:
-        cfgs.set_build_bin("target")
-        cfgs.LIB_DIR = os.path.join(cfgs.HOME_DIR, "target")
+    toolchain = probe()
+    if toolchain is None:
+        cfgs.LOG.error("cjc -v 执行失败, 请检查仓颉环境")
+        exit(1)
+    cfgs.LOG.info(toolchain["output"])
+    cfgs.BASE_CJC_VERSION = toolchain["version"]
+    cfgs.CANGJIE_TARGET = toolchain["target"]
+    h_cjc_version = toolchain["version_number"]
+    cfgs.set_build_bin(toolchain["build_bin"])
+    cfgs.LIB_DIR = os.path.join(cfgs.HOME_DIR, toolchain["build_bin"])
     # config stdx for 0.60.*
     if not cfgs.CANGJIE_STDX_DIR:
         if h_cjc_version >= 0.60:
@@ -723,29 +910,15 @@ def config_cjc(args):
             else:
                 master_cjc = shutil.which("cjc")
                 cfgs.LOG.info("未配置仓颉环境, 正在配置指定的路径的stdx")
-            if cfgs.CANGJIE_TARGET == "aarch64-linux-ohos":
-                targ = "linux_ohos_aarch64_llvm"
-            elif cfgs.CANGJIE_TARGET == "x86_64-linux-ohos":
-                targ = "linux_ohos_x86_64_llvm"
-            elif cfgs.CANGJIE_TARGET == "x86_64-unknown-linux-gnu":
-                targ = "linux_x86_64_llvm"
-            elif "windows" in cfgs.CANGJIE_TARGET:
-                targ = "windows_x86_64_llvm"
-            elif "mingw32" in cfgs.CANGJIE_TARGET:
-                targ = "windows_x86_64_llvm"
-            elif "aarch64" in cfgs.CANGJIE_TARGET:
-                targ = "linux_aarch64_llvm"
-            else:
-                targ = "stdx"
+            targ = toolchain["stdx_platform"]
             if not os.path.exists(os.path.join(Path(master_cjc).parent.parent, targ)):
                 if hasattr(args, 'update_stdx') and args.update_stdx:
                     cfgs.LOG.info("stdx文件夹不存在, 正在下载stdx: " + cfgs.get_stdx_url())
-                    if not os.path.exists(os.path.join(cfgs.cj_home, cfgs.BASE_CJC_VERSION, 'stdx.zip')):
-                        download_large_with_urllib(cfgs.get_stdx_url(), os.path.join(cfgs.cj_home, cfgs.BASE_CJC_VERSION, 'stdx.zip'))
-                    if os.path.exists(os.path.join(cfgs.cj_home, cfgs.BASE_CJC_VERSION, 'stdx.zip')):
-                        unzip_file(os.path.join(cfgs.cj_home, cfgs.BASE_CJC_VERSION, 'stdx.zip'), os.path.join(cfgs.cj_home, cfgs.BASE_CJC_VERSION))
+                    stdx_zip = download_stdx(cfgs, cfgs.get_stdx_url(), os.path.join(cfgs.cj_home, cfgs.BASE_CJC_VERSION, 'stdx.zip'))
+                    if stdx_zip:
+                        unzip_file(cfgs, stdx_zip, os.path.join(cfgs.cj_home, cfgs.BASE_CJC_VERSION))
                     else:
-                        cfgs.LOG.warn(f"stdx.zip不存在, 下载失败: {os.path.join(cfgs.cj_home, cfgs.BASE_CJC_VERSION, 'stdx.zip')}")
+                        cfgs.LOG.warn(f"stdx下载失败: {cfgs.get_stdx_url()}")
                         exit(1)
                 if not os.path.exists(os.path.join(Path(master_cjc).parent.parent, targ)):
                     cfgs.LOG.warn("stdx路径不存在: " + os.path.join(Path(master_cjc).parent.parent, targ))
@@ -758,6 +931,7 @@ def config_cjc(args):
 
 def init_log(cfgs, name):
     """init log config"""
+    from logging.handlers import TimedRotatingFileHandler
     parser_maple_test_config_file(cfgs)
     log_path = cfgs.BASE_DIR
     create_file(log_path)
@@ -769,6 +943,7 @@ def init_log(cfgs, name):
     streamhandler.setLevel(logging.DEBUG)
     streamhandler.setFormatter(formatter)
     log.addHandler(streamhandler)
+    cfgs.CONSOLE_HANDLER = streamhandler
     filehandler = TimedRotatingFileHandler(
         os.path.join(log_path, "ci_test.log"), when="W6", interval=1, backupCount=60
     )
@@ -779,13 +954,26 @@ def init_log(cfgs, name):
 
 
 def parser_maple_test_config_file(cfgs: ArgConfig):
-    cfg = read_config(complete_path(os.path.join(cfgs.FILE_ROOT, "ci_test.cfg")))
+    cfg = load_cfg(complete_path(os.path.join(cfgs.FILE_ROOT, "ci_test.cfg")))
     cfgs.temp_dir = complete_path(
         os.path.join(cfgs.BASE_DIR, get_config_value(cfg, "running", "temp_dir", default="../test_temp/run")))
     cfgs.log_dir = complete_path(
         os.path.join(cfgs.BASE_DIR, get_config_value(cfg, "logging", "name", default="../test_temp/log")))
     cfgs.level = get_config_value(cfg, "logging", "level", default="INFO")
     cfgs.UPDATE_CJPM_TOML = get_config_value(cfg, "cangjie-home", "update_toml", default="false") == "true"
+    cfgs.history_db = complete_path(
+        os.path.join(cfgs.BASE_DIR, get_config_value(cfg, "history", "db", default="../test_temp/history.db")))
+    cfgs.slowest_cases = int(get_config_value(cfg, "report", "slowest", default="10") or 10)
+    build_cache_dir = get_config_value(cfg, "build-cache", "dir", default="../test_temp/build_cache")
+    cfgs.build_cache_dir = complete_path(os.path.join(cfgs.BASE_DIR, build_cache_dir)) if build_cache_dir else None
+    cfgs.build_cache_max = int(get_config_value(cfg, "build-cache", "max_entries", default="10") or 10)
+    git_mirror_dir = get_config_value(cfg, "git-config", "mirror_dir", default="../test_temp/git_mirrors")
+    cfgs.git_mirror_dir = complete_path(os.path.join(cfgs.BASE_DIR, git_mirror_dir)) if git_mirror_dir else None
+    download_cache_dir = get_config_value(cfg, "download", "cache_dir", default="../test_temp/downloads")
+    cfgs.download_cache_dir = complete_path(os.path.join(cfgs.BASE_DIR, download_cache_dir)) if download_cache_dir else None
+    download_manifest = get_config_value(cfg, "download", "manifest", default="")
+    cfgs.download_manifest = complete_path(os.path.join(cfgs.BASE_DIR, download_manifest)) if download_manifest else None
+    cfgs.download_segments = int(get_config_value(cfg, "download", "segments", default="4") or 1)
     cfgs.BUILD_CI_TEST_CFG = cfg
 
 
@@ -809,24 +997,33 @@ def build_coverage(args, cfgs):
 
 def __set_up_the_link_lib(cfgs, lib_path):
     if cfgs.OS_PLATFORM == "windows":
-        os.environ['Path'] = f"{os.getenv('Path')};{lib_path}"
+        update_env_paths('Path', [lib_path], append=True)
     else:
-        os.environ['LD_LIBRARY_PATH'] = f"{lib_path}:" + os.environ.get('LD_LIBRARY_PATH', "")
-    pass
+        update_env_paths('LD_LIBRARY_PATH', [lib_path])
+
+
+def add_import_path(cfgs, path):
+    """编译用例时的 --import-path, 同一个目录只加一次"""
+    if cfgs.IMPORT_PATH_SET.add(path):
+        cfgs.IMPORT_PATH += f" --import-path {path}"
+
+
+def add_library_path(cfgs, path):
+    """编译用例时的 -L, 同一个目录只加一次"""
+    if cfgs.LIBRARY_PATH_SET.add(path):
+        cfgs.LIBRARY_PATH += f" -L {path}"
 
 
 def __load_c_library(args, cfgs):
     ffi_lib = os.path.join(cfgs.HOME_DIR, "ci_test", f"lib_{cfgs.MODULE_NAME}")
     if not os.path.exists(ffi_lib):
-        cmd = f"git clone -b lib_{cfgs.MODULE_NAME} https://gitcode.com/Cangjie-TPC/ci_lib.git {ffi_lib} --depth 1"
-        output = subprocess.Popen(
-            cmd,
-            shell=True,
-            cwd=cfgs.HOME_DIR,
-            stderr=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-        )
-        log_output(output, output.args, cfgs)
+        ci_lib_url = get_config_value(cfgs.BUILD_CI_TEST_CFG, "git-config", "ci_lib_url") or CI_LIB_URL
+        cfgs.LOG.info(f"拉取 {ci_lib_url} lib_{cfgs.MODULE_NAME} -> {ffi_lib}")
+        code, out = fetch_branch(ci_lib_url, f"lib_{cfgs.MODULE_NAME}", ffi_lib, mirror_root=cfgs.git_mirror_dir)
+        for line in out.splitlines():
+            cfgs.LOG.info(line)
+        if code != 0:
+            cfgs.LOG.warn(f"拉取 lib_{cfgs.MODULE_NAME} 失败, 返回码 {code}")
     ffi_bin_path = os.path.join(ffi_lib, cfgs.OS_PLATFORM, 'lib', f"lib_{cfgs.MODULE_NAME}")
     if os.path.isdir(ffi_bin_path):
         entries = os.listdir(ffi_bin_path)
@@ -856,8 +1053,39 @@ def runBuild(args, cfgs):
     delete_suffix_file(cfgs.HOME_DIR, 'gcno')
     if cfgs.CUSTOM_MAP.get("ci_lib"):
         __load_c_library(args, cfgs)
+    target_dir = os.path.join(cfgs.HOME_DIR, cfgs.BUILD_BIN)
+    cache = None
+    if cfgs.build_cache_dir and not args.no_cache:
+        cache = BuildCache(cfgs.build_cache_dir, cfgs.build_cache_max)
+        # --full 要求重新构建, 不读缓存, 但构建结果仍写入缓存
+        key = build_cache_key(args, cfgs)
+        if not args.full and cache.restore(key, target_dir):
+            cfgs.LOG.info(f"构建缓存命中 {key[:12]}, 已从 {cfgs.build_cache_dir} 恢复 {cfgs.BUILD_BIN}")
+            return
     cfgs.LOG.info("Building with cjpm.....")
     cjpmbuild(args, cfgs)
+    if cache:
+        key = build_cache_key(args, cfgs)  # cjpm update/build 可能改写 cjpm.lock
+        if cache.store(key, target_dir):
+            cfgs.LOG.info(f"构建结果已写入缓存 {key[:12]}")
+
+
+def build_cache_key(args, cfgs):
+    """构建缓存键: cjpm.toml, cjpm.lock, src 和本地 path 依赖的内容, cjc 版本, 目标平台和构建选项"""
+    flags = [flag for flag in ("coverage", "release", "debug") if getattr(args, flag, None)]
+    triple = cfgs.CANGJIE_TARGET
+    if args.target and str(args.target).__contains__("ohos"):
+        triple = "aarch64-linux-ohos"
+    if cfgs.CANGJIE_STDX_DIR:
+        flags.append(f"stdx={cfgs.CANGJIE_STDX_DIR}")
+    dependencies = []
+    if cfgs.CONFIG_FILE == "cjpm.toml" and cfgs.BUILD_PARMS:
+        for section in ("dependencies", "test-dependencies"):
+            for dependency in (cfgs.BUILD_PARMS.get(section) or {}).values():
+                # BUILD_PARMS 是只读视图(MappingProxyType), 不是 dict
+                if isinstance(dependency, Mapping) and dependency.get("path"):
+                    dependencies.append(os.path.normpath(os.path.join(cfgs.HOME_DIR, str(dependency["path"]))))
+    return cache_key(cfgs.HOME_DIR, cfgs.BASE_CJC_VERSION, triple, flags, dependencies)
 
 
 def get_sublib_list(cfgs, path):
@@ -866,7 +1094,7 @@ def get_sublib_list(cfgs, path):
     global static_lib
     sub_library_libdir = os.path.join(path, 'lib')
     if os.path.exists(sub_library_libdir):
-        for path_2, dirs, files in os.walk(sub_library_libdir):
+        for path_2, dirs, files in walk_cached(sub_library_libdir):
             for file in files:
                 if dynamic_lib in str(file) or static_lib in str(file):
                     lib_list.append(str(os.path.join(path_2, file)))
@@ -875,47 +1103,33 @@ def get_sublib_list(cfgs, path):
 
 
 def get_cjc_cpm(cfgs):
-    try:
-        version = os.popen('cjc -v').readline().split('Cangjie Compiler: ')[1].split(' (')[0]
-        temp = version.split(".")
-        ver = float(temp[0])
-        if float(temp[1]) != 0:
-            ver += float(f'0.{temp[1]}')
-        if ver >= 0.38:
-            return "cjpm"
-        else:
-            return 'cpm'
-    except IndexError:
+    toolchain = probe()
+    if toolchain is None:
         cfgs.LOG.error("没有配置cangjie环境变量, 请配置后再试, ciTest.py build --cj-home=CangjiePath;")
         exit(1)
+    if toolchain["version_number"] >= 0.38:
+        return "cjpm"
+    else:
+        return 'cpm'
 
 
 def cjpmbuild(args, cfgs):
+    # 源码引用了 stdx 时构建前就配置好 path-option, 不用先失败一次再重试
+    stdx_added = False
+    if cfgs.CANGJIE_STDX_DIR and cfgs.CONFIG_FILE == "cjpm.toml" and not __stdx_path_configured(cfgs):
+        src_dir = os.path.join(cfgs.HOME_DIR, "src")
+        use_stdx, cached = uses_stdx(src_dir, os.path.join(cfgs.temp_dir, "stdx_imports.json"))
+        if use_stdx:
+            cfgs.LOG.info(f"源码中引用了stdx{'(缓存)' if cached else ''}, 构建前配置stdx路径")
+            __add_stdx_path_option(args, cfgs)
+            stdx_added = True
     output = __do_cjpm_build(args, cfgs)
     out, err = __log_output(output, output.args, cfgs, cfgs.HOME_DIR)
     # set_build_log_warnings_count(cfgs, err)
-    if "imports package 'stdx" in str(err):
+    if "imports package 'stdx" in str(err) and not stdx_added:
         cfgs.LOG.info("Trying again using STDX package.")
         if cfgs.CANGJIE_STDX_DIR:
-            stdx_lib = cfgs.CANGJIE_STDX_DIR
-            ci_test_cfg = cfgs.BUILD_PARMS
-            if "target" not in ci_test_cfg:
-                ci_test_cfg['target'] = {}
-            ci_test_cfg_target = ci_test_cfg['target']
-            if cfgs.CANGJIE_TARGET not in ci_test_cfg_target:
-                ci_test_cfg_target[cfgs.CANGJIE_TARGET] = {"bin-dependencies": {"path-option": [stdx_lib]}}
-            else:
-                if "bin-dependencies" not in ci_test_cfg_target[cfgs.CANGJIE_TARGET]:
-                    ci_test_cfg_target[cfgs.CANGJIE_TARGET]['bin-dependencies'] = {"path-option": [stdx_lib]}
-                else:
-                    if "path-option" not in ci_test_cfg_target[cfgs.CANGJIE_TARGET]['bin-dependencies']:
-                        ci_test_cfg_target[cfgs.CANGJIE_TARGET]['bin-dependencies']["path-option"] = [stdx_lib]
-                    else:
-                        ci_test_cfg_target[cfgs.CANGJIE_TARGET]['bin-dependencies']["path-option"].append(stdx_lib)
-            if cfgs.UPDATE_CJPM_TOML or args.update_toml:
-                with open(os.path.join(cfgs.HOME_DIR, "cjpm.toml"), "w", encoding='UTF-8') as toml_f:
-                    cfgs.LOG.info("正在将stdx环境写入cjpm.toml")
-                    dump_c(ci_test_cfg, toml_f)
+            __add_stdx_path_option(args, cfgs)
             output = __do_cjpm_build(args, cfgs)
             out, err = __log_output(output, output.args, cfgs, cfgs.HOME_DIR)
             # set_build_log_warnings_count(cfgs, err)
@@ -931,6 +1145,38 @@ def cjpmbuild(args, cfgs):
         exit(output.returncode)
 
 
+def __stdx_path_configured(cfgs):
+    try:
+        path_option = cfgs.BUILD_PARMS["target"][cfgs.CANGJIE_TARGET]["bin-dependencies"]["path-option"]
+    except (KeyError, TypeError):
+        return False
+    return cfgs.CANGJIE_STDX_DIR in [str(path) for path in path_option]
+
+
+def __add_stdx_path_option(args, cfgs):
+    stdx_lib = cfgs.CANGJIE_STDX_DIR
+    ci_test_cfg = load_toml_document(os.path.join(cfgs.HOME_DIR, "cjpm.toml"))
+    if "target" not in ci_test_cfg:
+        ci_test_cfg['target'] = {}
+    ci_test_cfg_target = ci_test_cfg['target']
+    if cfgs.CANGJIE_TARGET not in ci_test_cfg_target:
+        ci_test_cfg_target[cfgs.CANGJIE_TARGET] = {"bin-dependencies": {"path-option": [stdx_lib]}}
+    else:
+        if "bin-dependencies" not in ci_test_cfg_target[cfgs.CANGJIE_TARGET]:
+            ci_test_cfg_target[cfgs.CANGJIE_TARGET]['bin-dependencies'] = {"path-option": [stdx_lib]}
+        else:
+            if "path-option" not in ci_test_cfg_target[cfgs.CANGJIE_TARGET]['bin-dependencies']:
+                ci_test_cfg_target[cfgs.CANGJIE_TARGET]['bin-dependencies']["path-option"] = [stdx_lib]
+            else:
+                ci_test_cfg_target[cfgs.CANGJIE_TARGET]['bin-dependencies']["path-option"].append(stdx_lib)
+    cfgs.BUILD_PARMS = freeze(ci_test_cfg.unwrap())
+    if cfgs.UPDATE_CJPM_TOML or args.update_toml:
+        with open(os.path.join(cfgs.HOME_DIR, "cjpm.toml"), "w", encoding='UTF-8') as toml_f:
+            cfgs.LOG.info("正在将stdx环境写入cjpm.toml")
+            dump_c(ci_test_cfg, toml_f)
+        invalidate(os.path.join(cfgs.HOME_DIR, "cjpm.toml"))
+
+
 def __do_cjpm_build(args, cfgs):
     if args.full:
         cmd0 = "{} update".format(get_cjc_cpm(cfgs))
@@ -971,65 +1217,67 @@ def __do_cjpm_build(args, cfgs):
 
 
 def __loop_down_load_cjpm_librarys(cfgs, sub_librarys):
-    # sub_librarys
+    # 先收集所有依赖库需要的 ci_lib 分支, 去重后并行拉取, 再复制到各自的 lib 目录
+    ci_lib_url = get_config_value(cfgs.BUILD_CI_TEST_CFG, "git-config", "ci_lib_url") or CI_LIB_URL
+    copies = []
     for sub_library in sub_librarys:
         sub_library_config_file = os.path.join(sub_library, cfgs.CONFIG_FILE)
         if cfgs.BUILD_BIN != "build":
             if str(sub_library_config_file).endswith("toml"):
-                __cjpm_git_download_toml(cfgs, sub_library, sub_library_config_file)
+                copies.extend(__cjpm_ffi_libs_toml(cfgs, sub_library, sub_library_config_file))
             elif str(sub_library_config_file).endswith("json"):
-                __cjpm_git_download_json(cfgs, sub_library, sub_library_config_file)
+                copies.extend(__cjpm_ffi_libs_json(cfgs, sub_library, sub_library_config_file))
             else:
                 cfgs.LOG.warn("没有项目工程配置文件, 请配置module.json或者cjpm.toml配置文件")
         else:
-            __cjpm_git_download_json(cfgs, sub_library, sub_library_config_file)
+            copies.extend(__cjpm_ffi_libs_json(cfgs, sub_library, sub_library_config_file))
+    jobs = [(ci_lib_url, f"lib_{name}", os.path.join(cfgs.BASE_DIR, f"lib_{name}")) for name, _ in copies]
+    fetched = fetch_branches(jobs, mirror_root=cfgs.git_mirror_dir)
+    for (url, branch), (dest, code, out) in sorted(fetched.items()):
+        cfgs.LOG.info(f"拉取 {url} {branch} -> {dest}")
+        for line in out.splitlines():
+            cfgs.LOG.info(line)
+        if code != 0:
+            cfgs.LOG.warn(f"拉取 {branch} 失败, 返回码 {code}")
+    for name, new_dir in dict.fromkeys(copies):
+        old_dir = os.path.join(cfgs.BASE_DIR, "lib_{}".format(name), cfgs.OS_PLATFORM, "lib", f"lib_{name}")
+        if not os.path.isdir(old_dir):
+            cfgs.LOG.error(f"ci_lib 分支 lib_{name} 中没有 {old_dir}")
+            continue
+        try:
+            shutil.copytree(old_dir, new_dir)
+        except:
+            shutil.rmtree(new_dir)
+            shutil.copytree(old_dir, new_dir)
 
 
-def __cjpm_git_download_json(cfgs, sub_library, sub_library_config_file):
-    file = open(sub_library_config_file, 'r', encoding='UTF-8')
-    parm = json.load(file)
+def __cjpm_ffi_libs_json(cfgs, sub_library, sub_library_config_file):
+    """module.json 中 foreign_requires 配置了 path 时, 返回 [(库名, 复制到的目录)]"""
+    parm = load_json(sub_library_config_file)
     ffi = parm["foreign_requires"]
     name = parm['name']
-    gitee = "https://gitcode.com/Cangjie-TPC/ci_lib.git"
+    copies = []
     for ke, val in ffi.items():
         for k, v in val.items():
             if k == 'path':
-                cmd0 = f"git clone -b lib_{name} {gitee} {os.path.join(cfgs.BASE_DIR, f'lib_{name}')} --depth=1"
-                output = subprocess.Popen(cmd0, shell=True, cwd=cfgs.BASE_DIR, stderr=subprocess.PIPE,
-                                          stdout=subprocess.PIPE)
-                log_output(output, output.args, cfgs, cfgs.HOME_DIR)
-                old_dir = os.path.join(cfgs.BASE_DIR, "lib_{}".format(name), cfgs.OS_PLATFORM, "lib", f"lib_{name}")
                 str_lib = __get_cjpm_library_cjpm_lock_foreign_requires_path(cfgs, sub_library)
-                new_dir = os.path.join(sub_library, str_lib)
-                try:
-                    shutil.copytree(old_dir, new_dir)
-                except:
-                    shutil.rmtree(new_dir)
-                    shutil.copytree(old_dir, new_dir)
+                copies.append((name, os.path.join(sub_library, str_lib)))
+    return copies
 
 
-def __cjpm_git_download_toml(cfgs, sub_library, sub_library_config_file):
+def __cjpm_ffi_libs_toml(cfgs, sub_library, sub_library_config_file):
+    """cjpm.toml 中 [ffi.c] 配置了 path 时, 返回 [(库名, 复制到的目录)]"""
     cfgs.LOG.info(f"check file {sub_library_config_file}")
-    parm = parse(open(sub_library_config_file, "r", encoding='UTF-8').read())
+    parm = load_toml(sub_library_config_file)
     name = parm['package']['name']
-    gitee = "https://gitcode.com/Cangjie-TPC/ci_lib.git"
+    copies = []
     for key, value in parm['ffi'].items():
         if key == "c":
             for ke, val in value.items():
                 for k, v in val.items():
                     if k == 'path':
-                        cmd0 = f"git clone -b lib_{name} {gitee} {os.path.join(cfgs.BASE_DIR, f'lib_{name}')} --depth=1"
-                        output = subprocess.Popen(cmd0, shell=True, cwd=cfgs.BASE_DIR, stderr=subprocess.PIPE,
-                                                  stdout=subprocess.PIPE)
-                        log_output(output, output.args, cfgs, cfgs.HOME_DIR)
-                        old_dir = os.path.join(cfgs.BASE_DIR, "lib_{}".format(name), cfgs.OS_PLATFORM, "lib",
-                                               f"lib_{name}")
-                        new_dir = os.path.join(sub_library, "lib")
-                        try:
-                            shutil.copytree(old_dir, new_dir)
-                        except:
-                            shutil.rmtree(new_dir)
-                            shutil.copytree(old_dir, new_dir)
+                        copies.append((name, os.path.join(sub_library, "lib")))
+    return copies
 
 
 def envsetup(args, cfgs):
@@ -1050,8 +1298,11 @@ def envsetup(args, cfgs):
             cfgs.set_build_bin("target")
             cfgs.LIB_DIR = os.path.join(cfgs.HOME_DIR, "target")
     if h_cjc_version and master_cjc:
-        out = os.popen('{} -v'.format(master_cjc))
-        base_cjc_version = out.readline().split('Cangjie Compiler: ')[1].split(' (')[0]
+        toolchain = probe(master_cjc)
+        if toolchain is None:
+            cfgs.LOG.error(f"{master_cjc} -v 执行失败, 请检查仓颉环境")
+            exit(1)
+        base_cjc_version = toolchain["version"]
         h_cjc_version = base_cjc_version.split(".")
         if int(h_cjc_version[0]) == 0:
             if int(h_cjc_version[1]) < 49:
@@ -1108,42 +1359,34 @@ def envsetup(args, cfgs):
         return False
 
 
-def set_cangjie_home(cfgs, cjc_home):
+def set_cangjie_home(cfgs, cjc_home, env=None):
+    """把 cjc_home 设置到环境变量中, env 不为空时只修改传入的环境(用于启动子进程)"""
+    if env is None:
+        env = os.environ
     if cfgs.OS_PLATFORM == "windows":
         cfgs.LOG.info("The current environment is Windows")
         cangjie_bin = os.path.join(cjc_home, 'bin')
         cangjie_tools = os.path.join(cjc_home, 'tools', 'bin')
         cangjie_runtime = os.path.join(cjc_home, 'runtime', 'lib', 'windows_x86_64_llvm')
-        cangjie_path = ""
-        if cangjie_runtime not in os.environ['Path']:
-            cangjie_path += f'{cangjie_runtime};'
-        if cangjie_bin not in os.environ['Path']:
-            cangjie_path += f'{cangjie_bin};'
-        if cangjie_tools not in os.environ['Path']:
-            cangjie_path += f'{cangjie_tools};'
-        os.environ['Path'] = f"{cangjie_path}{os.environ['Path']}"
-        if not os.getenv('CANGJIE_HOME'):
-            os.environ['CANGJIE_HOME'] = f"{cjc_home}"
-        if not os.getenv('CANGJIE_STDX_PATH'):
-            os.environ['CANGJIE_STDX_PATH'] = f"{cjc_home}"
+        update_env_paths('Path', [cangjie_runtime, cangjie_bin, cangjie_tools], env)
+        if not env.get('CANGJIE_HOME'):
+            env['CANGJIE_HOME'] = f"{cjc_home}"
+        if not env.get('CANGJIE_STDX_PATH'):
+            env['CANGJIE_STDX_PATH'] = f"{cjc_home}"
     else:
         cfgs.LOG.info("The current environment is linux")
-        os.environ['PATH'] = f"{cjc_home}/bin:{cjc_home}/tools/bin:{cjc_home}/debugger/bin:" + os.environ['PATH']
-        os.environ['CANGJIE_HOME'] = f"{cjc_home}"
-        os.environ['CANGJIE_STDX_PATH'] = f"{cjc_home}"
-        os.environ[
-            'LD_LIBRARY_PATH'] = f"{cjc_home}/runtime/lib/linux_x86_64_llvm:{cjc_home}/debugger/third_party/lldb/lib:" + os.environ.get(
-            'LD_LIBRARY_PATH', "")
+        update_env_paths('PATH', [f"{cjc_home}/bin", f"{cjc_home}/tools/bin", f"{cjc_home}/debugger/bin"], env)
+        env['CANGJIE_HOME'] = f"{cjc_home}"
+        env['CANGJIE_STDX_PATH'] = f"{cjc_home}"
+        update_env_paths('LD_LIBRARY_PATH', [f"{cjc_home}/runtime/lib/linux_x86_64_llvm",
+                                             f"{cjc_home}/debugger/third_party/lldb/lib"], env)
 
 
 def __set_cangjie_stdx_home(cfgs, stdx_home):
     if cfgs.OS_PLATFORM == "windows":
-        cangjie_stdx_path = ""
-        if stdx_home not in os.environ['Path']:
-            cangjie_stdx_path += f'{stdx_home};'
-        os.environ['Path'] = f"{cangjie_stdx_path}{os.environ['Path']}"
+        update_env_paths('Path', [stdx_home])
     else:
-        os.environ['LD_LIBRARY_PATH'] = f"{stdx_home}:" + os.environ.get('LD_LIBRARY_PATH', "")
+        update_env_paths('LD_LIBRARY_PATH', [stdx_home])
     cfgs.LOG.info("set cangjie stdx success.")
 
 
@@ -1164,7 +1407,7 @@ def get_cjc_version(path):
 
 def copy_windows_lib(args):
     args.WINDOWS_DLLS = []
-    for root, _, files in os.walk(args.LIB_DIR):
+    for root, _, files in walk_cached(args.LIB_DIR):
         if not os.path.join(root).endswith("bin"):
             for dll in files:
                 if str(dll).endswith(".dll"):
@@ -1209,7 +1452,7 @@ def find_lib_path(lib_path, ci_lib_path):
     elif os.path.exists(ci_lib_path):
         cj_3rd_libs.add(ci_lib_path)
         if not os.path.exists(os.path.join(lib_path, "release")):
-            for root, dirs, files in os.walk(ci_lib_path):
+            for root, dirs, files in walk_cached(ci_lib_path):
                 for dir_name in dirs:
                     if os.path.join(ci_lib_path, dir_name) in cj_3rd_libs:
                         continue
@@ -1220,22 +1463,11 @@ def find_lib_path(lib_path, ci_lib_path):
 
 
 def cangjie_env_setup(lib_dir):
-    if platform.system() == "Windows":
-        for item in lib_dir:
-            if f"{item}" not in os.environ['Path']:
-                os.environ['Path'] = f"{os.getenv('Path')};{item}"
-    else:
-        for item in lib_dir:
-            if os.path.exists(item):
-                if str(item) not in os.getenv('LD_LIBRARY_PATH'):
-                    os.environ['LD_LIBRARY_PATH'] = f"{item}:{os.environ.get('LD_LIBRARY_PATH', '')}"
-
-                # if str(item) not in os.getenv('CANGJIE_HOME'):
-                #     os.environ["CANGJIE_HOME"] = f"{item}:{os.environ.get('CANGJIE_HOME', '')}"
+    update_env_paths(library_env_name(), lib_dir, append=platform.system() == "Windows")
 
 
 def do_load_library_cfg(cfg_path):
-    config = read_config(Path(cfg_path))
+    config = load_cfg(Path(cfg_path))
     return config['cangjie_library'], config['cangjie_library_branch']
 
 
@@ -1248,7 +1480,9 @@ def set_build_log_warnings_count(cfgs, err):
         else:
             cfg.add_section("build-warning")
             cfg.set("build-warning", 'warning', str(len))
-        cfg.write(open(choose_method(cfgs), 'w', encoding='UTF-8'))
+        with open(choose_method(cfgs), 'w', encoding='UTF-8') as f:
+            cfg.write(f)
+        invalidate(choose_method(cfgs))
     except:
         pass
 
@@ -1256,18 +1490,20 @@ def set_build_log_warnings_count(cfgs, err):
 def set_cjtest_path(args, cfgs, target):
     cfg = read_config(complete_path(choose_method(cfgs)))
     cfg.set("test", target, args.root)
-    cfg.write(open(choose_method(cfgs), 'w', encoding='UTF-8'))
+    with open(choose_method(cfgs), 'w', encoding='UTF-8') as f:
+        cfg.write(f)
+    invalidate(choose_method(cfgs))
 
 
 def get_cjtest_path(args, cfgs, target):
-    cfg = read_config(complete_path(choose_method(cfgs)))
+    cfg = load_cfg(complete_path(choose_method(cfgs)))
     key = '3rd_party_root' if target != 'ohos' else '3rd_party_root_ohos'
     if cfg.has_section("test"):
         return cfg.get("test", key)
 
 
 def get_cangjie_path(cfgs, p):
-    cfg = read_config(complete_path(choose_method(cfgs)))
+    cfg = load_cfg(complete_path(choose_method(cfgs)))
     if cfg.has_section("cangjie-home"):
         return cfg.get("cangjie-home", p)
     else:
@@ -1275,7 +1511,7 @@ def get_cangjie_path(cfgs, p):
 
 
 def _get_DEVECO_CANGJIE_HOME(cfgs):
-    cfg = read_config(complete_path(choose_method(cfgs)))
+    cfg = load_cfg(complete_path(choose_method(cfgs)))
     try:
         if cfg.has_section("cangjie-home"):
             compile_option = cfg.get("cangjie-home", "OHOS_compile_option")
@@ -1304,13 +1540,15 @@ def set_cangjie_path(args, cfgs):
     else:
         cfg.add_section("cangjie-home")
         cfg.set("cangjie-home", 'home', args.cj_home)
-    cfg.write(open(choose_method(cfgs), 'w', encoding='UTF-8'))
+    with open(choose_method(cfgs), 'w', encoding='UTF-8') as f:
+        cfg.write(f)
+    invalidate(choose_method(cfgs))
 
 
 def parser_run_config_file(run_config: Path):
     if not run_config or not run_config.exists() or not run_config.is_file():
         return None
-    cfg = read_config(run_config)
+    cfg = load_cfg(run_config)
     return {"shell": dict(cfg.items("shell")), "suffix": dict(cfg.items("suffix")),
             "internal_var": dict(cfg.items("internal_var"))}
 
@@ -1341,6 +1579,7 @@ def split_and_complete_path(paths):
 def read_config(file_path):
     if not file_path.exists() or not file_path.is_file():
         return None
+    import configparser
     config = configparser.ConfigParser()
     config.optionxform = str
     config.read(str(file_path), encoding="utf-8")
@@ -1464,6 +1703,52 @@ def pareFile(path):
 LIBS = []
 TOTAL_CASES = 0
 COUNT_CURRENT_CASE = 0
+CASE_RECORDS = []  # 每个用例文件一条: {"case", "status", "compile_time", "run_time"}
+BENCH_SAMPLES = {}  # {benchmark: [ns/op, ...]} bench 每次执行的样本
+BASELINE_REPEAT = 5  # 指定 --baseline 时 --repeat 的默认值, 两组各 5 个样本单侧检验的最小 p 值为 1/252
+PHASES = ["discovery", "env", "staging", "compile", "warmup", "run", "report"]
+OPTIONAL_PHASES = {"warmup"}  # 没有耗时时不打印
+PHASE_TIMES = {}  # {phase: seconds} 运行结束时打印耗时分布
+
+
+def add_phase_time(phase, seconds):
+    PHASE_TIMES[phase] = PHASE_TIMES.get(phase, 0.0) + seconds
+
+
+@contextlib.contextmanager
+def timed_phase(phase):
+    start = time.time()
+    try:
+        yield
+    finally:
+        add_phase_time(phase, time.time() - start)
+
+
+def print_time_summary(cfgs, log):
+    """
+    打印本次运行的耗时分布: 用例发现, 环境和依赖库解析, 用例准备, 编译, 性能用例预热, 执行, 报告生成,
+    按 import 链接失败后重试的用例数, 以及编译和执行耗时最长的用例
+    """
+    total = time.time() - cfgs.START_TIME
+    log.info("*" * 50)
+    log.info("Time Summary")
+    for phase in PHASES + ["other"]:
+        if phase in OPTIONAL_PHASES and phase not in PHASE_TIMES:
+            continue
+        seconds = PHASE_TIMES.get(phase, 0.0) if phase != "other" else max(total - sum(PHASE_TIMES.values()), 0.0)
+        log.info(f"{phase:<10}: {seconds:>9.2f}s  {seconds / total * 100 if total > 0 else 0:>5.1f}%")
+    log.info(f"{'total':<10}: {total:>9.2f}s")
+    if cfgs.LINK_INDEX is not None:
+        log.info(f"{'relink':<10}: {link_fallback_count:>9} 个用例按 import 链接失败, 链接全部库重试")
+    top = getattr(cfgs, "slowest_cases", 10)
+    for key, title in (("compile_time", "compile"), ("run_time", "run")):
+        records = sorted((r for r in CASE_RECORDS if r.get(key)), key=lambda r: r[key], reverse=True)[:top]
+        if not records:
+            continue
+        log.info(f"Slowest {len(records)} cases by {title} time:")
+        for record in records:
+            log.info(f"{record[key]:>9.2f}s  {record['case']}")
+    log.info("*" * 50)
 
 error_set = set()
 
@@ -1488,7 +1773,7 @@ class ProcessLogger(threading.Thread):
                     time.sleep(0.1)
                     continue
                 if not llt_check_not_start_or_end_with_target(line):
-                    self.logger.info(line.decode('UTF-8', 'ignore').strip())
+                    self.logger.info(line.decode('UTF-8', 'ignore').strip(), extra=RAW_OUTPUT)
         except ValueError as e:
             if "info->buf must not be NULL" in str(e):
                 pass
@@ -1505,6 +1790,116 @@ class ProcessLogger(threading.Thread):
         self._stop_event.set()
 
 
+PROGRESS = None
+
+
+class ProgressReporter(threading.Thread):
+    """quiet 模式下在控制台刷新一行进度: 完成数/总数, 用例/分钟, ETA, 失败数和正在运行的用例"""
+
+    def __init__(self, total, stream=sys.stdout):
+        super().__init__(daemon=True)
+        self.stream = stream
+        self.is_tty = hasattr(stream, "isatty") and stream.isatty()
+        # 非终端(CI 日志)不支持 \r 刷新, 降低频率逐行输出
+        self.interval = 1.0 if self.is_tty else 30.0
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.running = []
+        self.start_time = time.time()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def case_started(self, name):
+        with self._lock:
+            self.running.append(name)
+        if self.is_tty:
+            self.refresh()
+
+    def case_finished(self, name, ok=True):
+        with self._lock:
+            if name in self.running:
+                self.running.remove(name)
+            self.done += 1
+            if not ok:
+                self.failed += 1
+        if self.is_tty:
+            self.refresh()
+
+    def status_line(self):
+        with self._lock:
+            elapsed = max(time.time() - self.start_time, 1e-6)
+            rate = self.done / elapsed * 60
+            if self.done:
+                eta = time.strftime("%H:%M:%S", time.gmtime(elapsed / self.done * (self.total - self.done)))
+            else:
+                eta = "--:--:--"
+            running = ", ".join(self.running) if self.running else "-"
+            return f"[{self.done}/{self.total}] {rate:.1f} cases/min, ETA {eta}, FAIL: {self.failed}, RUNNING: {running}"
+
+    def clear(self):
+        if self.is_tty:
+            self.stream.write("\r\x1b[K")
+            self.stream.flush()
+
+    def refresh(self):
+        line = self.status_line()
+        if self.is_tty:
+            columns = shutil.get_terminal_size((120, 20)).columns
+            self.stream.write("\r\x1b[K" + line[:columns - 1])
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.refresh()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.clear()
+        self.stream.write(self.status_line() + "\n")
+        self.stream.flush()
+
+
+def start_progress(args, cfgs, total):
+    """quiet 模式: 控制台不再输出 INFO 日志(原始输出仍写入日志文件), 改为显示进度行"""
+    global PROGRESS
+    if not args.quiet or cfgs.CONSOLE_HANDLER is None:
+        return
+    PROGRESS = ProgressReporter(total, cfgs.CONSOLE_HANDLER.stream)
+
+    def console_filter(record):
+        if PROGRESS is None:
+            return True
+        # 用例的原始输出不论级别只写入日志文件
+        if getattr(record, "raw_output", False) or record.levelno < logging.WARNING:
+            return False
+        PROGRESS.clear()
+        return True
+
+    cfgs.CONSOLE_HANDLER.addFilter(console_filter)
+    PROGRESS.start()
+
+
+def stop_progress():
+    global PROGRESS
+    if PROGRESS is not None:
+        PROGRESS.stop()
+        PROGRESS = None
+
+
+def progress_case_started(name):
+    if PROGRESS is not None:
+        PROGRESS.case_started(name)
+
+
+def progress_case_finished(name, ok=True):
+    if PROGRESS is not None:
+        PROGRESS.case_finished(name, ok)
+
+
 def __log_output(output, cmd, cfgs, filename=None):
     """ log command output"""
     cfgs.LOG.info("CMD    : %s", str(cmd))
@@ -1516,12 +1911,12 @@ def __log_output(output, cmd, cfgs, filename=None):
         for item in re.split("\r?\n", error):
             item = re.sub(r"\x1b\[\d+m", "", item)
             if output.returncode == 0:
-                cfgs.LOG.warn(item)
+                cfgs.LOG.warning(item, extra=RAW_OUTPUT)
             else:
-                cfgs.LOG.error(item)
+                cfgs.LOG.error(item, extra=RAW_OUTPUT)
     if out:
         for item in re.split("\r?\n", out):
-            cfgs.LOG.info(re.sub(r"\x1b\[\d+m", "", item))
+            cfgs.LOG.info(re.sub(r"\x1b\[\d+m", "", item), extra=RAW_OUTPUT)
     return out, error
 
 
@@ -1546,6 +1941,30 @@ def log_output(proc, cmd, cfgs, filename=None):
         stderr_logger.join()
 
 
+def __add_build_lib_paths(cfgs):
+    """构建输出目录加入 --import-path, 其中的包目录加入 -L 和动态库搜索路径, :return: 包目录列表"""
+    find_cangjie_lib_arr = []
+    for build_lib in find_lib_path(cfgs.LIB_DIR, ''):
+        add_import_path(cfgs, build_lib)
+        # 整个构建输出目录只索引一次, 之后按包目录查询库名时取其中的子树
+        top = walk_cached(build_lib)
+        for build_lib_item in (top[0][1] + top[0][2] if top else []):
+            if build_lib_item.__contains__(".") or 'bin' in build_lib_item:
+                continue
+            if os.path.exists(os.path.join(build_lib, build_lib_item)):
+                add_library_path(cfgs, os.path.join(build_lib, build_lib_item))
+                find_cangjie_lib_arr.append(os.path.join(build_lib, build_lib_item))
+    cangjie_env_setup(find_cangjie_lib_arr)
+    return find_cangjie_lib_arr
+
+
+def __add_stdx_paths(args, cfgs):
+    if cfgs.CANGJIE_STDX_DIR and cfgs.CANGJIE_STDX_DIR not in cfgs.LIBRARY_PATH_SET:
+        add_import_path(cfgs, Path(cfgs.CANGJIE_STDX_DIR).parent)
+        add_library_path(cfgs, cfgs.CANGJIE_STDX_DIR)
+        __improt_stdx_libs([cfgs.CANGJIE_STDX_DIR], cfgs, args)
+
+
 def runAll(args, cfgs):
     subcmd = ""
     try:
@@ -1553,23 +1972,32 @@ def runAll(args, cfgs):
             subcmd = " --coverage"
     except:
         subcmd = ""
-    cj_build_libs = find_lib_path(cfgs.LIB_DIR, '')
-    find_cangjie_lib_arr = []
-    for build_lib in cj_build_libs:
-        cfgs.IMPORT_PATH += f" --import-path {build_lib}"
-        for build_lib_item in os.listdir(build_lib):
-            if build_lib_item.__contains__(".") or 'bin' in build_lib_item:
-                continue
-            if os.path.exists(os.path.join(build_lib, build_lib_item)):
-                cfgs.LIBRARY_PATH += f" -L {os.path.join(build_lib, build_lib_item)}"
-                find_cangjie_lib_arr.append(os.path.join(build_lib, build_lib_item))
-                cangjie_env_setup(find_cangjie_lib_arr)
-    if cfgs.CANGJIE_STDX_DIR:
-        cfgs.IMPORT_PATH += f" --import-path {Path(cfgs.CANGJIE_STDX_DIR).parent}"
-        cfgs.LIBRARY_PATH += f" -L {cfgs.CANGJIE_STDX_DIR}"
-        __improt_stdx_libs([cfgs.CANGJIE_STDX_DIR], cfgs, args)
+    env_start = time.time()
+    find_cangjie_lib_arr = __add_build_lib_paths(cfgs)
+    __add_stdx_paths(args, cfgs)
     __improt_libs(find_cangjie_lib_arr, cfgs)
-    loop_dir(args, cfgs, lambda file: runOne(args, file, subcmd, cfgs))
+    add_phase_time("env", time.time() - env_start)
+
+    def run_case(file):
+        name = os.path.basename(file)
+        fail_count = len(RESULT.get("FAIL"))
+        progress_case_started(name)
+        case_handler = None
+        if args.quiet:
+            # quiet 模式下每个用例的原始输出写入 log_dir 下单独的日志文件
+            create_file(cfgs.log_dir)
+            case_handler = logging.FileHandler(os.path.join(cfgs.log_dir, f"{name}.log"), encoding="utf-8")
+            case_handler.setFormatter(cfgs.CONSOLE_HANDLER.formatter)
+            cfgs.LOG.addHandler(case_handler)
+        try:
+            runOne(args, file, subcmd, cfgs)
+        finally:
+            if case_handler is not None:
+                cfgs.LOG.removeHandler(case_handler)
+                case_handler.close()
+        progress_case_finished(name, len(RESULT.get("FAIL")) == fail_count)
+
+    loop_dir(args, cfgs, run_case)
 
 
 def runOne(args, file, subcmd, cfgs):
@@ -1593,6 +2021,7 @@ def runOne(args, file, subcmd, cfgs):
         if cfgs.OS_PLATFORM and cfgs.OS_PLATFORM == "windows":
             copy_windows_lib(cfgs)
         if len(exec):
+            stage_start = time.time()
             create_file(runPath)
             source_file_path = os.path.join(cfgs.HOME_DIR, "test", "resources")
             os.environ['cangjie_test_path'] = str(source_file_path)
@@ -1629,7 +2058,9 @@ def runOne(args, file, subcmd, cfgs):
                 finally:
                     pass
             else:
+                add_phase_time("staging", time.time() - stage_start)
                 case_one_return_code = 0
+                case_record = {"case": os.path.relpath(str(path), cfgs.HOME_DIR), "compile_time": 0.0, "run_time": 0.0}
                 for item in exec:
                     cmd_temp = item
                     cmd = form_line(item, {"import-path": cfgs.IMPORT_PATH})
@@ -1645,12 +2076,16 @@ def runOne(args, file, subcmd, cfgs):
                         cmd = form_line(cmd, {"f": path.name})
                     if "cjc" in cmd:
                         cmd = cmd + subcmd + args.optimize + cfgs.Woff
+                    start = time.time()
                     output = subprocess.Popen(cmd, shell=True, cwd=runPath, stderr=subprocess.PIPE,
                                               stdout=subprocess.PIPE)
                     if platform.system() == 'Windows' and cmd != '.\\main.exe':
                         subprocess.Popen("cp {}/* {}".format(cfgs.LIB_DIR, runPath),
                                          shell=True, cwd=runPath, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
                     out, err = log_output(output, output.args, cfgs, path.name)
+                    phase = "compile" if "cjc" in cmd else "run"
+                    case_record[f"{phase}_time"] += time.time() - start
+                    add_phase_time(phase, time.time() - start)
 
                     if output.returncode != 0:
                         case_one_return_code = output.returncode
@@ -1673,35 +2108,26 @@ def runOne(args, file, subcmd, cfgs):
                     cfgs.LOG.info(" >>=============================================<<当前进度{:.2f}% ".format(
                         float(COUNT_CURRENT_CASE) / float(TOTAL_CASES) * 100))
                     cfgs.LOG.info("")
+                    case_record["status"] = "PASS" if case_one_return_code == 0 else "FAIL"
+                    CASE_RECORDS.append(case_record)
                     if case_one_return_code != 0:
                         RESULT.get("FAIL").append(str(path))
                     else:
                         RESULT.get("PASS").append(str(path))
 
 
+def __collect_link_libs(libsdir, is_recursion=True):
+    """libsdir 下的库名(去重, 保持顺序), 不递归时与 glob lib*.dll 一致总是包含 dll"""
+    LLT_Link_libs = {}
+    for sub_lib in libsdir:
+        for name in link_names(sub_lib, is_recursion, None if is_recursion else True):
+            LLT_Link_libs[name] = None
+    return list(LLT_Link_libs)
+
+
 def __improt_libs(libsdir, cfgs=None, is_recursion=True):
-    LLT_Link_libs = set()
+    LLT_Link_libs = __collect_link_libs(libsdir, is_recursion)
     str = ""
-    for sub_lib in libsdir:
-        if is_recursion:
-            for path, _, libs in os.walk(sub_lib):
-                for lib in libs:
-                    if lib.startswith("lib") and lib.endswith(".so"):
-                        LLT_Link_libs.add(lib[3:len(lib) - 3])
-                    elif lib.startswith("lib") and lib.endswith(".a"):
-                        LLT_Link_libs.add(lib[3:len(lib) - 2])
-                    elif platform.system() == 'Windows' and lib.startswith("lib") and lib.endswith(".dll"):
-                        LLT_Link_libs.add(lib[3:len(lib) - 4])
-        else:
-            for so in glob.glob(os.path.join(sub_lib, "lib*.dll")):
-                so = os.path.basename(so)
-                LLT_Link_libs.add(so[3:len(so) - 4])
-            for so in glob.glob(os.path.join(sub_lib, "lib*.so")):
-                so = os.path.basename(so)
-                LLT_Link_libs.add(so[3:len(so) - 3])
-            for so in glob.glob(os.path.join(sub_lib, "lib*.a")):
-                so = os.path.basename(so)
-                LLT_Link_libs.add(so[3:len(so) - 2])
     if cfgs and len(cfgs.LIBRARY_PRIORITY) > 0:
         for ss in LLT_Link_libs:
             if not cfgs.LIBRARY_PRIORITY.__contains__(ss):
@@ -1714,27 +2140,7 @@ def __improt_libs(libsdir, cfgs=None, is_recursion=True):
 
 
 def __improt_stdx_libs(libsdir, cfgs=None, args=None, is_recursion=True):
-    LLT_Link_libs = set()
-    for sub_lib in libsdir:
-        if is_recursion:
-            for path, _, libs in os.walk(sub_lib):
-                for lib in libs:
-                    if lib.startswith("lib") and lib.endswith(".so"):
-                        LLT_Link_libs.add(lib[3:len(lib) - 3])
-                    elif lib.startswith("lib") and lib.endswith(".a"):
-                        LLT_Link_libs.add(lib[3:len(lib) - 2])
-                    elif platform.system() == 'Windows' and lib.startswith("lib") and lib.endswith(".dll"):
-                        LLT_Link_libs.add(lib[3:len(lib) - 4])
-        else:
-            for so in glob.glob(os.path.join(sub_lib, "lib*.dll")):
-                so = os.path.basename(so)
-                LLT_Link_libs.add(so[3:len(so) - 4])
-            for so in glob.glob(os.path.join(sub_lib, "lib*.so")):
-                so = os.path.basename(so)
-                LLT_Link_libs.add(so[3:len(so) - 3])
-            for so in glob.glob(os.path.join(sub_lib, "lib*.a")):
-                so = os.path.basename(so)
-                LLT_Link_libs.add(so[3:len(so) - 2])
+    LLT_Link_libs = __collect_link_libs(libsdir, is_recursion)
     if cfgs and len(cfgs.LIBRARY_PRIORITY) > 0:
         for ss in LLT_Link_libs:
             if not cfgs.LIBRARY_PRIORITY.__contains__(ss):
@@ -1759,22 +2165,28 @@ def loop_dir(args, cfgs, callBack):
         else:
             cfgs.LOG.error("指定测试文件夹不是当前工程的子文件夹. 请重试")
             exit(1)
+    discovery_start = time.time()
+    case_files = []
     for path, dirs, files in os.walk(currentDirectory):
         for item in files:
             if Path(item).suffix == ".cj":
                 TOTAL_CASES += 1
-    for path, dirs, files in os.walk(currentDirectory):
-        for item in files:
-            if Path(item).suffix == ".cj":
                 if args.case:
                     if args.case.endswith(".cj"):
                         if args.case == str(item):
-                            callBack(os.path.join(path, item))
+                            case_files.append(os.path.join(path, item))
                     else:
                         if "{}.cj".format(args.case) == str(item):
-                            callBack(os.path.join(path, item))
+                            case_files.append(os.path.join(path, item))
                 else:
-                    callBack(os.path.join(path, item))
+                    case_files.append(os.path.join(path, item))
+    add_phase_time("discovery", time.time() - discovery_start)
+    start_progress(args, cfgs, len(case_files))
+    try:
+        for case_file in case_files:
+            callBack(case_file)
+    finally:
+        stop_progress()
 
 
 SRC_FILES = ""
@@ -1902,29 +2314,34 @@ class Logger:
         self.cfgs = cfgs
         shutil.rmtree(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "log"), ignore_errors=True)
         os.makedirs(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "log", "split_log"), exist_ok=True)
+        from logging.handlers import TimedRotatingFileHandler
         file_name = os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "log", "all.log")
         self.logger = cfgs.LOG
         self.logger.setLevel(logging.DEBUG)
         self.fmt = logging.Formatter("[%(asctime)s] %(levelname)s - %(message)s", "%m-%d %H:%M:%S")
         self.sh = logging.StreamHandler()
         self.sh.setFormatter(self.fmt)
-        self.th = handlers.TimedRotatingFileHandler(filename=file_name, encoding="utf-8", when="D")
+        self.th = TimedRotatingFileHandler(filename=file_name, encoding="utf-8", when="D")
         self.th.setFormatter(self.fmt)
         self.case_th = None
         # self.logger.addHandler(self.sh)
         self.logger.addHandler(self.th)
 
-    def info(self, msg):
-        self.logger.info(msg.encode('gbk', 'ignore').decode('gbk'))
+    def info(self, msg, extra=None):
+        self.logger.info(msg.encode('gbk', 'ignore').decode('gbk'), extra=extra)
 
-    def debug(self, msg):
-        self.logger.debug(msg.encode('gbk', 'ignore').decode('gbk'))
+    def debug(self, msg, extra=None):
+        self.logger.debug(msg.encode('gbk', 'ignore').decode('gbk'), extra=extra)
 
-    def error(self, msg):
-        self.logger.error(msg.encode('gbk', 'ignore').decode('gbk'))
+    def error(self, msg, extra=None):
+        self.logger.error(msg.encode('gbk', 'ignore').decode('gbk'), extra=extra)
 
-    def warning(self, msg):
-        self.logger.warning(msg.encode('gbk', 'ignore').decode('gbk'))
+    def warning(self, msg, extra=None):
+        self.logger.warning(msg.encode('gbk', 'ignore').decode('gbk'), extra=extra)
+
+    def flush(self):
+        if self.case_th is not None:
+            self.case_th.flush()
 
     def setStream(self, file_name):
         dirs = file_name.split(os.sep)
@@ -1934,7 +2351,8 @@ class Logger:
             os.makedirs(os.path.dirname(log_file_name))
             # os.makedirs(os.path.)
         if self.case_th is None:
-            self.case_th = handlers.TimedRotatingFileHandler(filename=log_file_name, encoding="utf-8", when="D")
+            from logging.handlers import TimedRotatingFileHandler
+            self.case_th = TimedRotatingFileHandler(filename=log_file_name, encoding="utf-8", when="D")
             self.case_th.setFormatter(self.fmt)
             self.logger.addHandler(self.case_th)
         if sys.version_info >= (3, 7):
@@ -1945,14 +2363,19 @@ class Logger:
 
 # cfgs.CJ_TEST_WORK = ""
 
-cp = configparser.ConfigParser()
-cp.read(os.path.join(os.path.dirname(__file__), "ci_test.cfg"))
 _3rd_party_root = ""
 
+
+def read_test_cfg():
+    """hlt/bench/fuzz 用到的 ci_test.cfg [test] 配置, 执行这些命令时才读取(选项名不区分大小写)"""
+    return load_cfg(os.path.join(os.path.dirname(__file__), "ci_test.cfg"), case_sensitive=False)
+
+
 platform_str = sys.platform
 ohos_dir = "/data/3rd/"
 error_count = 0
 total_count = 0
+link_fallback_count = 0  # 按 import 链接失败后链接全部库重试的用例数
 error_list = []
 
 
@@ -2067,8 +2490,12 @@ def run_one_case(args, file_path, run_option, compile_option, target, cfgs):
     global error_count
     global total_count
     global error_list
+    global link_fallback_count
     logger.setStream(f"{os.path.basename(file_path)}.log")
+    stage_start = time.time()
 
+    case_record = {"case": os.path.relpath(file_path, cfgs.HOME_DIR), "status": "SKIP"}
+    CASE_RECORDS.append(case_record)
     case_run_option, dependence, macro_cmd, is_valid_case = get_cmd_info(file_path, target, cfgs)
     if not is_valid_case:
         logger.warning(f"{file_path} is a invalid case, skip.")
@@ -2095,15 +2522,38 @@ def run_one_case(args, file_path, run_option, compile_option, target, cfgs):
     out = os.path.join(case_dir, f"{file_name}.out")
     # case_import_cmd = '" --import-path="'
     # case_library_path_L_cmd = " -L "
-    compile_cmd = f'cjc {cfgs.Woff} {args.optimize} {macro_cmd} ' \
-                  f'{cfgs.IMPORT_PATH} ' \
-                  f'{cfgs.LIBRARY_PATH} ' \
-                  f'{cfgs.LIBRARY}' \
-                  f'{cfgs.library_l_cmd} ' \
-                  f'{file_path} {dependence} -o {os.path.realpath(out)} {compile_option}'
+
+    def case_compile_cmd(library_path, library):
+        return f'cjc {cfgs.Woff} {args.optimize} {macro_cmd} ' \
+               f'{cfgs.IMPORT_PATH} ' \
+               f'{library_path} ' \
+               f'{library}' \
+               f'{cfgs.library_l_cmd} ' \
+               f'{file_path} {dependence} -o {os.path.realpath(out)} {compile_option}'
+
+    library_path, library = cfgs.LIBRARY_PATH, cfgs.LIBRARY
+    if cfgs.LINK_INDEX is not None:
+        library, library_path, selected, total = cfgs.LINK_INDEX.select(cfgs.LIBRARY, cfgs.LIBRARY_PATH,
+                                                                        [file_path] + dependence.split())
+        logger.info(f"按 import 链接 {selected}/{total} 个库")
+    compile_cmd = case_compile_cmd(library_path, library)
     logger.info(f"[Run CMD]{compile_cmd}")
-    code = cfgs.run_cmd(compile_cmd)
+    start = time.time()
+    add_phase_time("staging", start - stage_start)
+    compile_output = [] if library != cfgs.LIBRARY else None
+    code = cfgs.run_cmd(compile_cmd, output=compile_output)
+    if code != 0 and compile_output is not None:
+        from linkset import is_link_error
+        if is_link_error(compile_output):
+            # .cjo 中没有体现的依赖等情况下最小链接集合可能不够, 用全部库再编译一次
+            link_fallback_count += 1
+            compile_cmd = case_compile_cmd(cfgs.LIBRARY_PATH, cfgs.LIBRARY)
+            logger.warning(f"按 import 链接的库链接失败, 链接全部库重试: {compile_cmd}")
+            code = cfgs.run_cmd(compile_cmd)
+    case_record["compile_time"] = time.time() - start
+    add_phase_time("compile", case_record["compile_time"])
     if code != 0:
+        case_record["status"] = "ERROR"
         error_count += 1
         total_count += 1
         error_list.append(file_path)
@@ -2113,7 +2563,23 @@ def run_one_case(args, file_path, run_option, compile_option, target, cfgs):
 
     fuzz_cmd = ""
     if args.fuzz:
-        fuzz_cmd = f"-runs={args.fuzz_runs} -rss_limit_mb={args.fuzz_rss_limit_mb}"
+        fuzz_options = f"-rss_limit_mb={args.fuzz_rss_limit_mb}"
+        if args.fuzz_jobs:
+            fuzz_options += f" -jobs={args.fuzz_jobs}"
+        if args.fuzz_workers:
+            fuzz_options += f" -workers={args.fuzz_workers}"
+        # 新发现的输入写入本次的 session 目录, 持久语料只作为种子读取, 结束后再合并
+        corpus = os.path.join(args.fuzz_corpus, os.path.splitext(file_name)[0])
+        session = f"{out}.corpus"
+        # 崩溃输入单独放一个目录, 同一目录下的多个 fuzz 目标互不混淆
+        artifacts = f"{out}.artifacts"
+        os.makedirs(corpus, exist_ok=True)
+        os.makedirs(session, exist_ok=True)
+        os.makedirs(artifacts, exist_ok=True)
+        fuzz_options += f" -artifact_prefix={artifacts}{os.sep}"
+        fuzz_cmd = f"-runs={args.fuzz_runs} {fuzz_options} {session} {corpus}"
+        for job_log in glob.glob(os.path.join(out_dir, "fuzz-*.log")):
+            os.remove(job_log)
 
     if target == "ohos":
         # send test file to ohos device
@@ -2124,99 +2590,459 @@ def run_one_case(args, file_path, run_option, compile_option, target, cfgs):
         run_case_cmd = f"hdc shell cd {ohos_dir};chmod -R 777 *;export LD_LIBRARY_PATH={ohos_dir};./{out_file}"
     else:
         if platform_str == "linux":
-            run_case_cmd = f"cd {out_dir};./{out_file} {run_option} {fuzz_cmd} -timeout=10800"  # -rss_limit_mb=16384
+            run_binary = f"cd {out_dir};./{out_file}"
+            run_case_cmd = f"{run_binary} {run_option} {fuzz_cmd} -timeout=10800"  # -rss_limit_mb=16384
         else:  # windows
-            run_case_cmd = f"cd {out_dir}&{out_file} {run_option} {fuzz_cmd}"
+            run_binary = f"cd {out_dir}&{out_file}"
+            run_case_cmd = f"{run_binary} {run_option} {fuzz_cmd}"
+    if fuzz_budget(args) and target != "ohos":
+        # --budget 时这里只编译, 执行时间由 run_fuzz_budget 统一分配
+        FUZZ_TARGETS.append({"name": file_name, "file": file_path, "out_dir": out_dir, "record": case_record,
+                             "cmd": f"{run_binary} {run_option} {fuzz_options} {session} {corpus}",
+                             "binary": run_binary, "corpus": corpus, "session": session, "executable": out,
+                             "artifacts": artifacts})
+        return
     logger.info(f"[Run CMD]{run_case_cmd}")
-    return_code = cfgs.run_cmd(run_case_cmd)
+    # 等待 --serial 的锁不计入 run, 预热单独计入 warmup
+    with bench_run_controls(args, cfgs):
+        if args.main and args.warmup:
+            with timed_phase("warmup"):
+                run_bench_warmup(args, run_case_cmd)
+        with timed_phase("run"):
+            start = time.time()
+            return_code = cfgs.run_cmd(run_case_cmd)
+            case_record["run_time"] = time.time() - start
+            case_record["status"] = "PASS" if return_code == 0 else "FAIL"
+            if args.main and return_code == 0 and (args.repeat or 1) > 1:
+                run_bench_repetitions(args, cfgs, file_path, out, run_case_cmd)
+            if args.fuzz and target != "ohos":
+                log_fuzz_job_output(out_dir)
+                merge_fuzz_corpus(args, cfgs, run_binary, corpus, session)
+                triage_fuzz_crashes(args, cfgs, file_name, out, artifacts)
     if args.clean:
         for root_p, _, out_dir_files in os.walk(out_dir):
             for out_dir_files_file_name in out_dir_files:
                 os.remove(os.path.join(root_p, out_dir_files_file_name))
     if return_code != 0:
-        logger.error(f"return === {return_code}")
+        logger.error(f"return === {return_code}", extra=RAW_OUTPUT)
         total_count += 1
         error_count += 1
         error_list.append(file_path)
 
 
-def get_cases(cfgs):
-    cases = {}  # {test_class:[[case, status, case_time_elapsed, error_trace]]}
-    tcs_time = {}  # {test_class: tcs_time_elapsed}
-    for log in glob.glob(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "log", "split_log", "*.log")):
-        pkg = log[14:-7]
-        tcs = None
-        with open(log, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            log_str = "".join(lines)
-            log_str = re.sub(r"\x1b\[\d+m", "", log_str)
-            i = 0
-            while i < len(lines):
-                line = re.sub(r"\x1b\[\d+m", "", lines[i])
-                step = 1
-                tcs_match_obj = re.match(r".* TCS: (.*), time elapsed: (.*) ns, RESULT:", line)
-                if tcs_match_obj:
-                    tcs = f"{pkg}.{tcs_match_obj.group(1)}"
-                    tcs_time_elapsed = tcs_match_obj.group(2)
+FUZZ_TARGETS = []  # --budget 时已编译好等待调度的 fuzz 目标
+
+
+def fuzz_budget(args):
+    """fuzz --budget 的总秒数; hlt/cjtest 等没有 --budget 的命令返回 None"""
+    return getattr(args, "budget", None) if args.fuzz else None
+
+
+FUZZ_MIN_SLICE = 10  # 每次分配给一个目标的最短时间(秒)
+FUZZ_PLATEAU_SLICES = 2  # 连续这么多个时间片 ft 没有增长的目标提前停止
+
+
+def parse_duration(value):
+    """2h / 90m / 45s / 3600 转为秒"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([hms]?)\s*", str(value).lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"无效的时间: {value}, 例如 2h, 90m, 600s")
+    return float(match.group(1)) * {"h": 3600, "m": 60, "s": 1, "": 1}[match.group(2)]
+
+
+def run_fuzz_slice(args, cfgs, fuzz_target, seconds):
+    """执行一个时间片, 返回 (return_code, 时间片开始时的 ft, 结束时的 ft)"""
+    global total_count
+    global error_count
+    name = fuzz_target["name"]
+    logger.setStream(f"{name}.log")
+    logger.flush()
+    log = case_log_path(cfgs, f"{name}.log")
+    offset = os.path.getsize(log) if os.path.exists(log) else 0
+    for job_log in glob.glob(os.path.join(fuzz_target["out_dir"], "fuzz-*.log")):
+        os.remove(job_log)
+    cmd = f"{fuzz_target['cmd']} -max_total_time={int(seconds)}"
+    if platform_str == "linux":
+        cmd += " -timeout=10800"
+    logger.info(f"[Run CMD]{cmd}")
+    start = time.time()
+    return_code = cfgs.run_cmd(cmd)
+    log_fuzz_job_output(fuzz_target["out_dir"])
+    elapsed = time.time() - start
+    fuzz_target["spent"] += elapsed
+    fuzz_target["record"]["run_time"] = fuzz_target["spent"]
+    logger.flush()
+    with open(log, "r", encoding="utf-8", errors="replace") as f:
+        f.seek(offset)
+        series = parse_fuzz_lines(f)
+    ft_values = [point["ft"] for point in series if point["ft"] is not None]
+    ft_start = fuzz_target["ft"]
+    if ft_values:
+        fuzz_target["ft"] = max(ft_values[-1], ft_start)
+    if return_code != 0:
+        logger.error(f"return === {return_code}", extra=RAW_OUTPUT)
+        fuzz_target["record"]["status"] = "FAIL"
+        total_count += 1
+        error_count += 1
+        error_list.append(fuzz_target["file"])
+    return return_code, ft_start, fuzz_target["ft"]
+
+
+def run_fuzz_budget(args, cfgs):
+    """
+    --budget: 把总时间按时间片动态分配给各个 fuzz 目标
+    先给每个目标一个初始时间片, 之后每次把下一个时间片给上一片 ft 增长速度最快的目标;
+    连续 FUZZ_PLATEAU_SLICES 片没有新 feature 或者崩溃的目标停止, 全部停止或预算用完时结束
+    """
+    deadline = time.time() + args.budget
+    for fuzz_target in FUZZ_TARGETS:
+        fuzz_target.update({"spent": 0.0, "ft": 0, "rate": 0.0, "stale": 0, "done": False})
+        fuzz_target["record"]["status"] = "PASS"
+    first_slice = max(FUZZ_MIN_SLICE, args.budget / (4 * len(FUZZ_TARGETS))) if FUZZ_TARGETS else 0
+    pending = list(FUZZ_TARGETS)  # 还没有跑过初始时间片的目标
+    while True:
+        active = [t for t in FUZZ_TARGETS if not t["done"]]
+        remaining = deadline - time.time()
+        if not active or remaining < 1:
+            break
+        if pending:
+            fuzz_target = pending.pop(0)
+            seconds = first_slice
+            progress_case_started(fuzz_target["name"])
+        else:
+            fuzz_target = max(active, key=lambda t: (t["rate"], -t["spent"]))
+            seconds = max(FUZZ_MIN_SLICE, remaining / (2 * len(active)))
+        seconds = min(seconds, remaining)
+        with timed_phase("run"):
+            return_code, ft_start, ft_end = run_fuzz_slice(args, cfgs, fuzz_target, seconds)
+        fuzz_target["rate"] = (ft_end - ft_start) / max(seconds, 1)
+        fuzz_target["stale"] = fuzz_target["stale"] + 1 if ft_end <= ft_start else 0
+        if return_code != 0 or fuzz_target["stale"] >= FUZZ_PLATEAU_SLICES:
+            fuzz_target["done"] = True
+        cfgs.LOG.info(f"[budget] {fuzz_target['name']}: {int(seconds)}s, ft {ft_start} -> {ft_end}, "
+                      f"{'stopped' if fuzz_target['done'] else 'active'}, remaining {int(deadline - time.time())}s")
+    for fuzz_target in FUZZ_TARGETS:
+        logger.setStream(f"{fuzz_target['name']}.log")
+        with timed_phase("run"):
+            merge_fuzz_corpus(args, cfgs, fuzz_target["binary"], fuzz_target["corpus"], fuzz_target["session"])
+            triage_fuzz_crashes(args, cfgs, fuzz_target["name"], fuzz_target["executable"], fuzz_target["artifacts"])
+        progress_case_finished(fuzz_target["name"], fuzz_target["record"]["status"] == "PASS")
+    logger.info("*" * 50)
+    logger.info(f"Fuzz budget {int(args.budget)}s")
+    logger.info(f"{'time(s)':>8}  {'ft':>7}  target")
+    for fuzz_target in sorted(FUZZ_TARGETS, key=lambda t: t["spent"], reverse=True):
+        logger.info(f"{fuzz_target['spent']:>8.1f}  {fuzz_target['ft']:>7}  {fuzz_target['name']}")
+
+
+def log_fuzz_job_output(out_dir):
+    """-jobs 模式下 libFuzzer 每个 job 的输出写在 fuzz-<N>.log 中, 追加到用例日志以便统计"""
+    for job_log in sorted(glob.glob(os.path.join(out_dir, "fuzz-*.log"))):
+        job = os.path.basename(job_log)[:-len(".log")]
+        with open(job_log, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.strip():
+                    logger.info(f"[{job}] {line.rstrip()}")
+
+
+def merge_fuzz_corpus(args, cfgs, run_binary, corpus, session):
+    """
+    用 -merge=1 把持久语料和本次新发现的输入合并为最小语料, 替换原来的持久语料,
+    下次 fuzz 从已有覆盖率继续而不是从零开始
+    """
+    if not os.listdir(session):
+        return
+    merged = f"{corpus}.merge"
+    shutil.rmtree(merged, ignore_errors=True)
+    os.makedirs(merged)
+    merge_cmd = f"{run_binary} -merge=1 -rss_limit_mb={args.fuzz_rss_limit_mb} {merged} {corpus} {session}"
+    logger.info(f"[Run CMD]{merge_cmd}")
+    if cfgs.run_cmd(merge_cmd) != 0 or not os.listdir(merged):
+        logger.warning(f"语料合并失败, 本次新发现的输入直接复制到 {corpus}")
+        shutil.rmtree(merged, ignore_errors=True)
+        for name in os.listdir(session):
+            shutil.copyfile(os.path.join(session, name), os.path.join(corpus, name))
+        return
+    old = f"{corpus}.old"
+    shutil.rmtree(old, ignore_errors=True)
+    os.rename(corpus, old)
+    os.rename(merged, corpus)
+    shutil.rmtree(old, ignore_errors=True)
+    logger.info(f"语料合并完成: {corpus} 共 {len(os.listdir(corpus))} 个输入")
+
+
+FUZZ_CRASHES = {}  # {目标: {"crashes": [唯一崩溃], "untriaged": 未复现的输入数}}
+FUZZ_MAX_REPRODUCE = 50  # 每个目标最多复现这么多个崩溃输入, 其余只计数
+FUZZ_REPRODUCE_TIMEOUT = 60  # 复现一个输入的超时时间(秒)
+FUZZ_MINIMIZE_TIME = 60  # -minimize_crash 的时间(秒)
+
+
+def fuzz_binary_output(cmd, out_dir, timeout):
+    """直接执行 fuzz 目标(不经过 shell, 超时时能结束进程), 返回输出行, 不写入用例日志"""
+    try:
+        result = subprocess.run(cmd, cwd=out_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+        return result.returncode, result.stdout.decode("utf-8", "replace").splitlines()
+    except subprocess.TimeoutExpired as e:
+        return None, (e.stdout or b"").decode("utf-8", "replace").splitlines()
+    except OSError as e:
+        return None, [str(e)]
+
+
+def triage_fuzz_crashes(args, cfgs, name, executable, artifacts):
+    """
+    收集 fuzz 目标的 crash-/oom-/timeout-/leak- 输入, 逐个复现并按栈顶签名去重;
+    每个唯一崩溃用最小的输入执行 -minimize_crash, 结果复制到 report/fuzz_crashes/<目标>/<类型>-<签名>
+    """
+    inputs = [os.path.join(artifacts, f) for f in os.listdir(artifacts) if artifact_kind(f)]
+    if not inputs:
+        return
+    inputs.sort(key=os.path.getsize)
+    out_dir = os.path.dirname(executable)
+    report_dir = os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", "fuzz_crashes", os.path.splitext(name)[0])
+    os.makedirs(report_dir, exist_ok=True)
+    groups = {}
+    for path in inputs[:FUZZ_MAX_REPRODUCE]:
+        kind = artifact_kind(os.path.basename(path))
+        _, lines = fuzz_binary_output(
+            [executable, f"-rss_limit_mb={args.fuzz_rss_limit_mb}", f"-timeout={FUZZ_REPRODUCE_TIMEOUT // 2}", path],
+            out_dir, FUZZ_REPRODUCE_TIMEOUT)
+        signature, title, frames = crash_signature(kind, lines)
+        if signature not in groups:
+            groups[signature] = {"kind": kind, "signature": signature, "title": title, "frames": frames,
+                                 "count": 0, "inputs": [], "reproducer": None, "minimized": False}
+        groups[signature]["count"] += 1
+        groups[signature]["inputs"].append(os.path.basename(path))
+    for crash in groups.values():
+        smallest = os.path.join(artifacts, crash["inputs"][0])
+        reproducer = os.path.join(report_dir, f"{crash['kind']}-{crash['signature']}")
+        if crash["kind"] == "crash":
+            minimized = f"{reproducer}.min"
+            fuzz_binary_output([executable, "-minimize_crash=1", f"-max_total_time={FUZZ_MINIMIZE_TIME}",
+                                f"-rss_limit_mb={args.fuzz_rss_limit_mb}", f"-exact_artifact_path={minimized}",
+                                smallest], out_dir, FUZZ_MINIMIZE_TIME * 2)
+            crash["minimized"] = os.path.exists(minimized)
+            if crash["minimized"]:
+                os.replace(minimized, reproducer)
+        if not crash["minimized"]:
+            shutil.copyfile(smallest, reproducer)
+        crash["reproducer"] = os.path.relpath(reproducer, cfgs.HOME_DIR)
+        logger.info(f"[crash] {crash['signature']} x{crash['count']} {crash['title']} -> {crash['reproducer']}")
+    untriaged = max(0, len(inputs) - FUZZ_MAX_REPRODUCE)
+    if untriaged:
+        logger.warning(f"[crash] 另有 {untriaged} 个崩溃输入没有复现, 见 {artifacts}")
+    FUZZ_CRASHES[os.path.splitext(name)[0]] = {
+        "crashes": sorted(groups.values(), key=lambda c: c["count"], reverse=True), "untriaged": untriaged}
+
+
+BENCH_LOCK_FILE = os.path.join(tempfile.gettempdir(), "cangjie_ci_test_bench.lock")
+
+
+@contextlib.contextmanager
+def bench_run_controls(args, cfgs):
+    """
+    性能用例执行阶段(不含编译): --cpu 时把当前线程绑定到指定CPU, 子进程继承;
+    --serial 时持有本机文件锁, 保证同一时间只有一个 bench 在计时
+    """
+    if not args.main:
+        yield
+        return
+    lock = None
+    if args.serial:
+        try:
+            import fcntl
+            lock = open(BENCH_LOCK_FILE, "w")
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.info(f"等待其他 bench 任务释放 {BENCH_LOCK_FILE}")
+                fcntl.flock(lock, fcntl.LOCK_EX)
+        except ImportError:
+            logger.warning("当前平台不支持文件锁, 忽略 --serial")
+    old_affinity = None
+    if args.cpus:
+        old_affinity = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, args.cpus)
+    try:
+        yield
+    finally:
+        if old_affinity is not None:
+            os.sched_setaffinity(0, old_affinity)
+        if lock is not None:
+            lock.close()
+
+
+def run_bench_warmup(args, run_case_cmd):
+    for i in range(args.warmup):
+        code = subprocess.run(run_case_cmd, shell=True, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL).returncode
+        if code != 0:
+            logger.warning(f"第 {i + 1} 次预热执行失败, return === {code}")
+            return
+
+
+def run_bench_repetitions(args, cfgs, file_path, out, run_case_cmd):
+    """性能用例第一次执行的结果进入报告, 其余 repeat-1 次只采集 ns/op 样本"""
+    for i in range(1, args.repeat):
+        rep_log = f"{out}.run{i}.log"
+        proc = subprocess.run(run_case_cmd, shell=True, stdout=PIPE, stderr=subprocess.STDOUT)
+        with open(rep_log, "w", encoding="utf-8") as f:
+            for line in proc.stdout.decode("utf-8", errors="replace").splitlines():
+                f.write(f"[run {i}] {line}\n")
+        if proc.returncode != 0:
+            logger.warning(f"第 {i + 1} 次执行失败, return === {proc.returncode}, 输出见 {rep_log}")
+            continue
+        cases = {}
+        parse_case_log(rep_log, os.path.splitext(os.path.basename(file_path))[0], cases, {})
+        add_bench_samples(cases)
+
 
-                    cases[tcs] = []
-                    tcs_time[tcs] = float(tcs_time_elapsed)
-                case_match_obj = re.match(r".* \[(.*)\] CASE: (\w*)( \((\d+) ns(, (\d+\.\d+|\d*) ns/op)?\))?", line)
+def add_bench_samples(cases):
+    for tcs, tcs_cases in cases.items():
+        for case_name, _, _, _, case_time_per_op in tcs_cases:
+            if case_time_per_op:
+                BENCH_SAMPLES.setdefault(bench_key(tcs, case_name), []).append(float(case_time_per_op))
+
+
+ANSI_COLOR_PATTERN = re.compile(r"\x1b\[\d+m")
+TCS_PATTERN = re.compile(r".* TCS: (.*), time elapsed: (.*) ns, RESULT:")
+CASE_PATTERN = re.compile(r".* \[(.*)\] CASE: (\w*)( \((\d+) ns(, (\d+\.\d+|\d*) ns/op)?\))?")
+CASE_END_PATTERN = re.compile(r".* \[(.*)\] CASE: (.*) \((.*) ns\)")
+TEST_FUNC_PATTERN = re.compile(r".*func (.*)\(\)")
+TEST_CLASS_PATTERN = re.compile(r".*public class (.*){")
+
+
+def parse_case_log(log, pkg, cases, tcs_time, offset=0):
+    """
+    单遍流式解析一个 cjtest 日志, 结果增量写入 cases/tcs_time
+    失败用例的 trace 在读到下一个 TCS/CASE/Summary 行时结束, 不再回头扫描
+    :param offset: 从日志的该位置开始解析, 同名用例追加到同一个日志时只解析本次运行的内容
+    :return: (最后一个 TCS, 日志中没有 TCS 时的完整日志内容用于编译错误)
+    """
+    tcs = None
+    head = []  # 出现第一个 TCS 前的日志, 之后丢弃
+    trace = None  # 正在收集的失败用例 trace
+    with open(log, "r", encoding="utf-8") as f:
+        f.seek(offset)
+        for line in f:
+            if "\x1b" in line:
+                line = ANSI_COLOR_PATTERN.sub("", line)
+            if head is not None:
+                head.append(line)
+            # 先用子串判断过滤掉绝大多数行, 再做正则匹配
+            maybe_tcs = " TCS: " in line
+            maybe_case = " CASE: " in line
+            if trace is not None:
+                tcs_end = maybe_tcs and TCS_PATTERN.match(line) is not None
+                case_end = maybe_case and CASE_END_PATTERN.match(line) is not None
+                if not tcs_end and not case_end and "Summary: TOTAL" not in line:
+                    trace[1].append(line[33:])
+                    continue
+                trace[0][3] = "".join(trace[1])
+                trace = None
+            tcs_match_obj = TCS_PATTERN.match(line) if maybe_tcs else None
+            if tcs_match_obj:
+                tcs = f"{pkg}.{tcs_match_obj.group(1)}"
+                cases[tcs] = []
+                tcs_time[tcs] = float(tcs_match_obj.group(2))
+                head = None
+            case_match_obj = CASE_PATTERN.match(line) if maybe_case else None
+            if case_match_obj:
+                status = case_match_obj.group(1)
+                case_time_elapsed = case_match_obj.group(4) if case_match_obj.group(4) is not None else 0
+                case = [case_match_obj.group(2), status, float(case_time_elapsed), "", case_match_obj.group(6)]
+                if tcs:
+                    cases[tcs].append(case)
+                if "FAILED" in status or "ERROR" in status:
+                    trace = (case, [])
+    if trace is not None:
+        trace[0][3] = "".join(trace[1])
+    return tcs, "".join(head) if head is not None else ""
+
+
+def parse_case_result(log, pkg, cases, tcs_time, offset=0):
+    """解析一个用例日志; 编译失败(日志中没有 TCS)时根据用例源码把所有用例记为 ERROR"""
+    tcs, log_str = parse_case_log(log, pkg, cases, tcs_time, offset)
+    # compile error： get testcase count, and set Error
+    if tcs is None:
+        case_file = f"{pkg.replace('.', '/')}.cj"
+        if not os.path.exists(case_file):
+            return
+        with open(f"{pkg.replace('.', '/')}.cj", "r", encoding="utf-8") as cf:
+            try:
+                lines = cf.readlines()
+            except UnicodeDecodeError:
+                logger.error("'utf-8' codec can't decode byte 0xff in position 0: invalid start byte:>>")
+                lines = []
+            error_trace = log_str
+        for i, line in enumerate(lines):
+            if i == len(lines) - 1:
+                break
+            next_line = lines[i + 1]
+            if "@TestCase" in line and line.strip().startswith("@"):
+                case_match_obj = TEST_FUNC_PATTERN.match(next_line)
                 if case_match_obj:
-                    status = case_match_obj.group(1)
-                    case = case_match_obj.group(2)
-                    case_time_elapsed = case_match_obj.group(4) if case_match_obj.group(4) is not None else 0
-                    case_time_per_op = case_match_obj.group(6)
-                    error_trace = ""
-
-                    if "FAILED" in status or "ERROR" in status:
-                        for j in range(i + 1, len(lines)):
-                            next_line = re.sub(r"\x1b\[\d+m", "", lines[j])
-                            tcs_mo = re.match(r".* TCS: (.*), time elapsed: (.*) ns, RESULT:", next_line)
-                            case_mo = re.match(r".* \[(.*)\] CASE: (.*) \((.*) ns\)", next_line)
-                            not_summary = "Summary: TOTAL" not in next_line
-                            if tcs_mo is None and case_mo is None and not_summary:
-                                step += 1
-                                error_trace += next_line[33:]
-                            else:
-                                break
-                    if tcs:
-                        cases[tcs].append([case, status, float(case_time_elapsed), error_trace, case_time_per_op])
-                i += step
-        # compile error： get testcase count, and set Error
-        if tcs is None:
-            case_file = f"{pkg.replace('.', '/')}.cj"
-            if not os.path.exists(case_file):
+                    case_name = case_match_obj.group(1)
+                    cases[tcs].append([case_name, "ERROR", 0.0, error_trace, 0.0])
+            elif "@Test" in line and line.strip().startswith("@"):
+                tcs_match_obj = TEST_CLASS_PATTERN.match(next_line)
+                tcs_func_match_obj = TEST_FUNC_PATTERN.match(next_line)
+                if tcs_match_obj:
+                    tcs = f"{pkg}.{tcs_match_obj.group(1)}"
+                    if tcs not in cases.keys():
+                        cases[tcs] = []
+                    tcs_time[tcs] = 0.0
+                # Top-Level @Test func
+                elif tcs_func_match_obj:
+                    tcs = f"{pkg}.{tcs_func_match_obj.group(1)}"
+                    cases[tcs] = [[tcs, "ERROR", 0.0, error_trace, 0.0]]
+                    tcs_time[tcs] = 0.0
+
+
+# 每个用例跑完立即解析日志并追加到结果文件, 报告由结果文件生成, 任务中途被杀时也有部分报告
+RESULT_STORE = "results.jsonl"
+PARTIAL_REPORT_INTERVAL = 10
+last_partial_report = 0.0
+
+
+def case_log_path(cfgs, log_name):
+    return os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "log", "split_log", log_name)
+
+
+def append_case_result(cfgs, case_file, offset=0):
+    log_name = f"{os.path.basename(case_file)}.log"
+    log = case_log_path(cfgs, log_name)
+    if not os.path.exists(log):
+        return {}
+    cases = {}
+    tcs_time = {}
+    parse_case_result(log, log[14:-7], cases, tcs_time, offset)
+    record = {"case": os.path.relpath(case_file, cfgs.HOME_DIR), "log": log_name, "cases": cases,
+              "tcs_time": tcs_time}
+    with open(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", RESULT_STORE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    gen_perf_csv(cases, cfgs)
+    report_writer.add_results(cases, tcs_time)
+    return cases
+
+
+def iter_case_results(cfgs):
+    store = os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", RESULT_STORE)
+    if not os.path.exists(store):
+        return
+    with open(store, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # 进程被杀时最后一行可能不完整
                 continue
-            with open(f"{pkg.replace('.', '/')}.cj", "r", encoding="utf-8") as cf:
-                try:
-                    lines = cf.readlines()
-                except UnicodeDecodeError:
-                    logger.error("'utf-8' codec can't decode byte 0xff in position 0: invalid start byte:>>")
-                error_trace = log_str
-            for i, line in enumerate(lines):
-                if i == len(lines) - 1:
-                    break
-                next_line = lines[i + 1]
-                if "@TestCase" in line and line.strip().startswith("@"):
-                    case_match_obj = re.match(r".*func (.*)\(\)", next_line)
-                    if case_match_obj:
-                        case_name = case_match_obj.group(1)
-                        cases[tcs].append([case_name, "ERROR", 0.0, error_trace, 0.0])
-                elif "@Test" in line and line.strip().startswith("@"):
-                    tcs_match_obj = re.match(r".*public class (.*){", next_line)
-                    tcs_func_match_obj = re.match(r".*func (.*)\(\)", next_line)
-                    if tcs_match_obj:
-                        tcs = f"{pkg}.{tcs_match_obj.group(1)}"
-                        if tcs not in cases.keys():
-                            cases[tcs] = []
-                        tcs_time[tcs] = 0.0
-                    # Top-Level @Test func
-                    elif tcs_func_match_obj:
-                        tcs = f"{pkg}.{tcs_func_match_obj.group(1)}"
-                        cases[tcs] = [[tcs, "ERROR", 0.0, error_trace, 0.0]]
-                        tcs_time[tcs] = 0.0
-    return cases, tcs_time
+
+
+def write_partial_report(cfgs, force=False):
+    global last_partial_report
+    if not force and time.time() - last_partial_report < PARTIAL_REPORT_INTERVAL:
+        return
+    last_partial_report = time.time()
+    gen_junit_report(cfgs, report_writer, partial=True)
 
 
 def get_fuzz_cases(cfgs):
@@ -2227,14 +3053,19 @@ def get_fuzz_cases(cfgs):
     pass_count = 0
     fail_list = []
     global error_list
+    fuzz_stats = {}
     for log in glob.glob(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "log", "split_log", "*.log")):
         pkg = log[14:-7]
         tcs = None
         with open(log, "r", encoding="utf-8") as f:
             lines = f.readlines()
+        series = parse_fuzz_lines(lines)
+        fuzz_stats[os.path.basename(log)[:-len(".cj.log")]] = {"summary": summarize(series), "series": series}
+        # --budget 时一个目标分多个时间片执行, 任意一片崩溃都算失败
+        aborted = any('Aborted (core dumped)' in line for line in lines)
         for line_one in lines:
             rem = re.match(r".*Done \d+ runs in \d+ second", line_one)
-            if rem:
+            if rem and not aborted:
                 '''success'''
                 total_count += 1
                 pass_count += 1
@@ -2244,7 +3075,7 @@ def get_fuzz_cases(cfgs):
                 fail_count += 1
                 for line in lines:
                     if 'Start to run case file: ' in line:
-                        fail_list.append(line.split('Start to run case file: ')[-1].split('************************'))
+                        fail_list.append(line.split('Start to run case file: ')[-1].split('************************')[0])
                 break
         else:
             for line in lines:
@@ -2265,6 +3096,8 @@ def get_fuzz_cases(cfgs):
     logger.info(f"Ratio  : {round((pass_count + skip_count) / total_count * 100, 2) if total_count > 0 else 0}%")
     show_case_list(fail_list, "Failed")
     show_case_list(error_list, "Error")
+    report_fuzz_stats(cfgs, fuzz_stats)
+    report_fuzz_crashes(cfgs)
     logger.info("*" * 50)
     logger.info("View the full log in log/all.log, or view the log of each case under log/split_log")
     if fail_count == 0 and error_count == 0:
@@ -2273,61 +3106,170 @@ def get_fuzz_cases(cfgs):
         return 1
 
 
-def gen_junit_report(cfgs, cases, tcs_time):
-    global total_count
-    fail_count = 0
-    global error_count
-    skip_count = 0
-    pass_count = 0
-    fail_list = []
-    global error_list
-    skip_list = []
-    testsuites = Et.Element("testsuites")
-    tcs_info = {}  # {test_class:[total, passed, failed, error, skipped]}
-    for tcs in cases.keys():
-        class_name = tcs
-        testsuite = Et.SubElement(testsuites, "testsuite", name=class_name,
-                                  time=str(tcs_time[tcs] / 1000 / 1000 / 1000))
-        tcs_info[tcs] = [0, 0, 0, 0, 0]
-        for case in cases[tcs]:
-            case_name, status, case_time_elapsed, error_trace, case_time_per_op = case
-            testcase = Et.SubElement(testsuite, "testcase", class_name=class_name, name=case_name,
-                                     time=str(case_time_elapsed / 1000 / 1000 / 1000))
+def report_fuzz_stats(cfgs, fuzz_stats):
+    """
+    每个 fuzz 目标的 libFuzzer 状态行时间序列写入 report/fuzz_stats/<目标>.csv, 全部写入 fuzz_stats.json,
+    汇总打印最终 exec/s, 覆盖率和峰值 RSS
+    """
+    stats_dir = os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", "fuzz_stats")
+    os.makedirs(stats_dir, exist_ok=True)
+    for target, stats in fuzz_stats.items():
+        write_series_csv(os.path.join(stats_dir, f"{target}.csv"), stats["series"])
+    write_stats_json(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", "fuzz_stats.json"), fuzz_stats)
+    if not fuzz_stats:
+        return
+    logger.info("*" * 50)
+    logger.info("Fuzz Statistics")
+    logger.info(f"{'runs':>12}  {'exec/s':>8}  {'cov':>7}  {'ft':>7}  {'corp':>6}  {'rss(Mb)':>7}  target")
+    for target, stats in sorted(fuzz_stats.items()):
+        summary = stats["summary"]
+        logger.info(f"{summary['runs']:>12}  {_fmt_int(summary['exec_s']):>8}  {_fmt_int(summary['cov']):>7}  "
+                    f"{_fmt_int(summary['ft']):>7}  {_fmt_int(summary['corp_units']):>6}  "
+                    f"{_fmt_int(summary['peak_rss_mb']):>7}  {target}")
+
+
+def report_fuzz_crashes(cfgs):
+    """去重后的唯一崩溃写入 report/fuzz_crashes.json, 汇总中每个唯一崩溃打印一行"""
+    if not FUZZ_CRASHES:
+        return
+    write_crashes_json(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", "fuzz_crashes.json"), FUZZ_CRASHES)
+    logger.info("*" * 50)
+    logger.info("Unique Crashes")
+    logger.info(f"{'count':>6}  {'signature':<12}  {'min':<3}  target: title")
+    for target, triage in sorted(FUZZ_CRASHES.items()):
+        for crash in triage["crashes"]:
+            logger.info(f"{crash['count']:>6}  {crash['signature']:<12}  {'yes' if crash['minimized'] else 'no':<3}  "
+                        f"{target}: {crash['title']}")
+        if triage["untriaged"]:
+            logger.info(f"{triage['untriaged']:>6}  {'-':<12}  {'-':<3}  {target}: (未复现)")
+    logger.info(f"复现输入见 {os.path.join(cfgs.CJ_TEST_WORK, 'report', 'fuzz_crashes')}")
+
+
+def _fmt_int(value):
+    return "-" if value is None else str(value)
+
+
+XML_INVALID_CHAR_PATTERN = re.compile(r'[^\x0A\x20-\x7e]')
+
+
+class JUnitStreamWriter:
+    """
+    流式写 JUnit XML, 内存占用与用例数无关
+    testsuite 在结果到达时逐个写入正文临时文件; write() 时再补上带总数的 testsuites 根节点
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.body_path = path + ".body"
+        self.body = open(self.body_path, "w", encoding="UTF-8")
+        from xml.sax.saxutils import XMLGenerator
+        self.xml = XMLGenerator(self.body, encoding="UTF-8", short_empty_elements=True)
+        self.total = 0
+        self.passed = 0
+        self.failures = 0
+        self.errors = 0
+        self.skipped = 0
+        self.fail_list = []
+        self.error_list = []
+        self.skip_list = []
+
+    @staticmethod
+    def _attrs(**attrs):
+        return {key: XML_INVALID_CHAR_PATTERN.sub("", str(value)) for key, value in attrs.items()}
+
+    def add_suite(self, tcs, tcs_time, cases):
+        tcs_info = [len(cases), 0, 0, 0, 0]  # [total, passed, failed, error, skipped]
+        for case in cases:
+            status = case[1]
             if "FAILED" in status:
-                fail_info = Et.SubElement(testcase, "failure")
-                fail_info.text = error_trace
-                fail_count += 1
-                tcs_info[tcs][2] += 1
-                fail_list.append(f"{tcs}.{case_name}")
+                tcs_info[2] += 1
             elif "ERROR" in status:
-                error_info = Et.SubElement(testcase, "error")
-                error_info.text = error_trace
-                error_count += 1
-                tcs_info[tcs][3] += 1
-                error_list.append(f"{tcs}.{case_name}")
+                tcs_info[3] += 1
             elif "SKIP" in status:
-                Et.SubElement(testcase, "skipped")
-                skip_count += 1
-                tcs_info[tcs][4] += 1
-                skip_list.append(f"{tcs}.{case_name}")
+                tcs_info[4] += 1
             else:
-                pass_count += 1
-                tcs_info[tcs][1] += 1
-            total_count += 1
-            tcs_info[tcs][0] += 1
-        testsuite.set("tests", str(tcs_info[tcs][0]))
-        testsuite.set("failures", str(tcs_info[tcs][2]))
-        testsuite.set("errors", str(tcs_info[tcs][3]))
-        testsuite.set("skipped", str(tcs_info[tcs][4]))
-    testsuites.set("tests", str(total_count))
-    testsuites.set("failures", str(fail_count))
-    testsuites.set("errors", str(error_count))
-    testsuites.set("skipped", str(skip_count))
-    xml_str = Et.tostring(testsuites).decode()
-    xml_str = re.sub(r'[^\x0A\x20-\x7e]', r'', xml_str)
-    result_pretty = minidom.parseString(xml_str).toprettyxml(indent="    ")
-    with open(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", "result.xml"), "w+", encoding='UTF-8') as f:
-        f.write(result_pretty)
+                tcs_info[1] += 1
+        self.xml.ignorableWhitespace("    ")
+        self.xml.startElement("testsuite", self._attrs(name=tcs, time=tcs_time / 1000 / 1000 / 1000,
+                                                       tests=tcs_info[0], failures=tcs_info[2],
+                                                       errors=tcs_info[3], skipped=tcs_info[4]))
+        for case_name, status, case_time_elapsed, error_trace, _ in cases:
+            self.xml.ignorableWhitespace("\n        ")
+            self.xml.startElement("testcase", self._attrs(class_name=tcs, name=case_name,
+                                                          time=case_time_elapsed / 1000 / 1000 / 1000))
+            if "FAILED" in status or "ERROR" in status or "SKIP" in status:
+                if "FAILED" in status:
+                    tag = "failure"
+                    self.fail_list.append(f"{tcs}.{case_name}")
+                elif "ERROR" in status:
+                    tag = "error"
+                    self.error_list.append(f"{tcs}.{case_name}")
+                else:
+                    tag = "skipped"
+                    self.skip_list.append(f"{tcs}.{case_name}")
+                self.xml.ignorableWhitespace("\n            ")
+                self.xml.startElement(tag, {})
+                if tag != "skipped":
+                    self.xml.characters(XML_INVALID_CHAR_PATTERN.sub("", error_trace))
+                self.xml.endElement(tag)
+                self.xml.ignorableWhitespace("\n        ")
+            self.xml.endElement("testcase")
+        if cases:
+            self.xml.ignorableWhitespace("\n    ")
+        self.xml.endElement("testsuite")
+        self.xml.ignorableWhitespace("\n")
+        self.total += tcs_info[0]
+        self.passed += tcs_info[1]
+        self.failures += tcs_info[2]
+        self.errors += tcs_info[3]
+        self.skipped += tcs_info[4]
+
+    def add_results(self, cases, tcs_time):
+        for tcs in cases.keys():
+            self.add_suite(tcs, tcs_time[tcs], cases[tcs])
+
+    def write(self, tests, failures, errors, skipped):
+        """把当前内容写成完整的 result.xml, 之后仍可以继续追加 testsuite"""
+        self.body.flush()
+        with open(self.path + ".tmp", "w", encoding="UTF-8") as f:
+            from xml.sax.saxutils import XMLGenerator
+            root = XMLGenerator(f, encoding="UTF-8")
+            f.write('<?xml version="1.0" ?>\n')
+            root.startElement("testsuites", self._attrs(tests=tests, failures=failures, errors=errors,
+                                                        skipped=skipped))
+            f.write("\n")
+            with open(self.body_path, "r", encoding="UTF-8") as body:
+                shutil.copyfileobj(body, f)
+            root.endElement("testsuites")
+            f.write("\n")
+        os.replace(self.path + ".tmp", self.path)
+
+    def close(self):
+        self.body.close()
+        if os.path.exists(self.body_path):
+            os.remove(self.body_path)
+
+
+report_writer = None
+
+
+def gen_junit_report(cfgs, writer, partial=False):
+    """partial=True 时只写出当前的 result.xml, 不修改全局计数也不打印汇总"""
+    global total_count
+    global error_count
+    global error_list
+    all_count = total_count + writer.total
+    all_error_count = error_count + writer.errors
+    writer.write(all_count, writer.failures, all_error_count, writer.skipped)
+    if partial:
+        return None
+    writer.close()
+    total_count = all_count
+    error_count = all_error_count
+    error_list.extend(writer.error_list)
+    fail_count = writer.failures
+    skip_count = writer.skipped
+    pass_count = writer.passed
 
     logger.info("*" * 50)
     logger.info("Test Summary")
@@ -2338,9 +3280,9 @@ def gen_junit_report(cfgs, cases, tcs_time):
     logger.info(f"Skipped: {skip_count}")
     logger.info(f"Ratio  : {round((pass_count + skip_count) / total_count * 100, 2) if total_count > 0 else 0}%")
 
-    show_case_list(fail_list, "Failed")
+    show_case_list(writer.fail_list, "Failed")
     show_case_list(error_list, "Error")
-    show_case_list(skip_list, "Skipped")
+    show_case_list(writer.skip_list, "Skipped")
     logger.info("*" * 50)
     logger.info("View the full log in log/all.log, or view the log of each case under log/split_log")
     if fail_count == 0 and error_count == 0:
@@ -2358,33 +3300,176 @@ def show_case_list(case_list, status):
 
 
 def gen_perf_csv(cases, cfgs):
-    with open(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", "perf.csv"), "w+", encoding='UTF-8') as f:
+    """结果到达时追加写入 perf.csv, 文件不存在时先写表头"""
+    import csv
+    perf_csv = os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", "perf.csv")
+    write_header = not os.path.exists(perf_csv)
+    with open(perf_csv, "a", encoding='UTF-8') as f:
         writer = csv.writer(f)
-        writer.writerow(["class", "case_name", "status", "case_time_elapsed(ns)", "case_time_per_op(ns/op)"])
+        if write_header:
+            writer.writerow(["class", "case_name", "status", "case_time_elapsed(ns)", "case_time_per_op(ns/op)"])
         for tcs in cases.keys():
             for case in cases[tcs]:
                 case_name, status, case_time_elapsed, error_trace, case_time_per_op = case
                 writer.writerow([tcs, case_name, status, case_time_elapsed, case_time_per_op])
 
 
+def record_history(args, cfgs, kind):
+    """把本次运行每个用例的结果和编译/运行耗时写入本地历史数据库"""
+    import sqlite3
+    from history import HistoryDB, git_revision
+    testcases = []
+    if kind in ("hlt", "bench"):
+        for record in iter_case_results(cfgs):
+            for tcs, cases in record["cases"].items():
+                for case_name, status, case_time_elapsed, _, case_time_per_op in cases:
+                    testcases.append((record.get("case"), tcs, case_name, status, case_time_elapsed,
+                                      case_time_per_op))
+    try:
+        db = HistoryDB(cfgs.history_db)
+        try:
+            db.record_run(kind, cfgs.MODULE_NAME, cfgs.START_TIME, cfgs.BASE_CJC_VERSION,
+                          git_revision(cfgs.HOME_DIR), CASE_RECORDS, testcases, BENCH_SAMPLES)
+        finally:
+            db.close()
+    except (sqlite3.Error, OSError) as e:
+        cfgs.LOG.warn(f"写入历史数据库失败: {e}")
+
+
+def load_bench_baseline(args, cfgs):
+    """读取 --baseline 指定的 perf.csv/bench_samples.csv 或历史数据库中最近的 bench 样本"""
+    if not args.baseline:
+        return None
+    if args.baseline == "history":
+        if not os.path.exists(cfgs.history_db):
+            cfgs.LOG.error(f"历史数据库不存在: {cfgs.history_db}")
+            exit(1)
+        from history import HistoryDB
+        db = HistoryDB(cfgs.history_db)
+        try:
+            baseline = db.bench_baseline(args.baseline_last)
+        finally:
+            db.close()
+    else:
+        baseline_file = os.path.join(cfgs.HOME_DIR, args.baseline)
+        if not os.path.exists(baseline_file):
+            cfgs.LOG.error(f"基线文件不存在: {baseline_file}")
+            exit(1)
+        baseline = load_perf_csv(baseline_file)
+    if not baseline:
+        cfgs.LOG.error(f"基线 {args.baseline} 中没有 ns/op 数据")
+        exit(1)
+    return baseline
+
+
+def report_bench_stats(cfgs):
+    """每个 benchmark 的 ns/op 中位数, p95 和变异系数, 写入 bench_stats.csv"""
+    if not BENCH_SAMPLES:
+        return
+    rows = [(key, len(values), median(values), percentile(values, 95), cv(values))
+            for key, values in sorted(BENCH_SAMPLES.items())]
+    import csv
+    with open(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", "bench_stats.csv"), "w",
+              encoding="UTF-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["benchmark", "runs", "median(ns/op)", "p95(ns/op)", "cv"])
+        writer.writerows(rows)
+    logger.info("*" * 50)
+    logger.info("Benchmark Statistics")
+    logger.info(f"{'runs':>5}  {'median':>12}  {'p95':>12}  {'cv':>7}  benchmark")
+    for key, runs, med, p95, var in rows:
+        logger.info(f"{runs:>5}  {med:>12.3f}  {p95:>12.3f}  {var * 100:>6.2f}%  {key}")
+
+
+def log_bench_compare(log, rows, title, base_label="base", current_label="current"):
+    log.info("*" * 50)
+    log.info(title)
+    log.info(f"{'verdict':<12}  {base_label:>12}  {current_label:>12}  {'change':>8}  {'95% CI':>17}  {'p':>6}  "
+             f"benchmark")
+    for row in rows:
+        if row["change"] is None:
+            log.info(f"{row['verdict']:<12}  {_fmt(row['base_median']):>12}  {_fmt(row['current_median']):>12}  "
+                     f"{'-':>8}  {'-':>17}  {'-':>6}  {row['benchmark']}")
+            continue
+        ci = f"[{row['ci_low'] * 100:+.1f}%, {row['ci_high'] * 100:+.1f}%]"
+        log.info(f"{row['verdict']:<12}  {row['base_median']:>12.3f}  {row['current_median']:>12.3f}  "
+                 f"{row['change'] * 100:>+7.1f}%  {ci:>17}  {row['p']:>6.3f}  {row['benchmark']}")
+    log.info("*" * 50)
+    insufficient = [f"{row['benchmark']}({row['base_n']}/{row['current_n']})" for row in rows
+                    if row["verdict"] == "insufficient"]
+    if insufficient:
+        log.warning(f"{len(insufficient)} 个性能用例 {base_label}/{current_label} 样本数不足, p 值达不到显著性水平, "
+                    f"无法判定是否回退, 请增加 --repeat(建议两边各至少 {BASELINE_REPEAT} 次), "
+                    f"perf.csv 每个用例只有一个样本, 基线请用 bench_samples.csv: {', '.join(insufficient)}")
+
+
+def check_bench_regression(args, cfgs, baseline):
+    """
+    写出每次执行的样本 bench_samples.csv(可作为下次的基线); 有基线时逐个比较 ns/op 分布,
+    结果写入 bench_compare.csv, 存在显著变慢超过 --threshold 的用例时返回 2
+    """
+    report_dir = os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report")
+    write_samples_csv(os.path.join(report_dir, "bench_samples.csv"), BENCH_SAMPLES)
+    report_bench_stats(cfgs)
+    if baseline is None:
+        return 0
+    rows = compare(baseline, BENCH_SAMPLES, args.threshold, args.alpha)
+    write_compare_csv(os.path.join(report_dir, "bench_compare.csv"), rows)
+    log_bench_compare(logger, rows, f"Benchmark Compare (baseline: {args.baseline}, threshold: {args.threshold}%, "
+                                    f"alpha: {args.alpha})")
+    regressions = [row["benchmark"] for row in rows if row["verdict"] == "regression"]
+    if regressions:
+        logger.error(f"{len(regressions)} 个性能用例显著变慢超过 {args.threshold}%: {', '.join(regressions)}")
+        return 2
+    return 0
+
+
+def history(args):
+    cfgs = args.CANGJIE_CI_TEST_CFGS
+    if not os.path.exists(cfgs.history_db):
+        cfgs.LOG.error(f"历史数据库不存在: {cfgs.history_db}")
+        exit(1)
+    from history import HistoryDB
+    db = HistoryDB(cfgs.history_db)
+    try:
+        if args.trend:
+            cfgs.LOG.info(f"{'run':>5}  {'time':<19}  {'git':<10}  {'cjc':<10}  {'status':<8}  "
+                          f"{'compile(s)':>10}  {'run(s)':>10}  {'time(ns)':>12}  {'ns/op':>12}  case")
+            for run_id, started, git_rev, cjc_version, case, status, compile_time, run_time, time_ns, per_op \
+                    in db.trend(args.trend, args.kind, args.last):
+                cfgs.LOG.info(f"{run_id:>5}  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))}  "
+                              f"{(git_rev or '-')[:10]:<10}  {cjc_version or '-':<10}  {status:<8}  "
+                              f"{_fmt(compile_time):>10}  {_fmt(run_time):>10}  {_fmt(time_ns):>12}  "
+                              f"{_fmt(per_op):>12}  {case}")
+        elif args.flaky:
+            cfgs.LOG.info(f"{'runs':>5}  {'fails':>5}  {'flips':>5}  {'fail rate':>9}  case")
+            for case, runs, fails, flips in db.flaky(args.kind, args.last):
+                cfgs.LOG.info(f"{runs:>5}  {fails:>5}  {flips:>5}  {fails / runs * 100:>8.1f}%  {case}")
+        else:
+            cfgs.LOG.info(f"{'runs':>5}  {'avg ' + args.by + '(s)':>14}  {'max(s)':>10}  case")
+            for case, runs, avg, max_time in db.slowest(args.by, args.kind, args.last, args.slowest or 10):
+                cfgs.LOG.info(f"{runs:>5}  {avg:>14.3f}  {max_time:>10.3f}  {case}")
+    finally:
+        db.close()
+
+
+def _fmt(value):
+    return "-" if value is None else f"{value:.3f}"
+
+
 def gen_report(args, cfgs):
     if args.fuzz:
         """"""
         return get_fuzz_cases(cfgs)
     else:
-        cases, tcs_time = get_cases(cfgs)
-        gen_perf_csv(cases, cfgs)
-        is_succ = gen_junit_report(cfgs, cases, tcs_time)
-        return is_succ
+        return gen_junit_report(cfgs, report_writer)
 
 
 def HLTtest(args, cfgs):
     global _3rd_party_root
     global logger
-    if cfgs.CANGJIE_STDX_DIR:
-        cfgs.IMPORT_PATH += f" --import-path {Path(cfgs.CANGJIE_STDX_DIR).parent}"
-        cfgs.LIBRARY_PATH += f" -L {cfgs.CANGJIE_STDX_DIR}"
-        __improt_stdx_libs([cfgs.CANGJIE_STDX_DIR], cfgs, args)
+    global report_writer
+    cp = read_test_cfg()
     # if cfgs.BUILD_TYPE == "ci_test" and os.path.exists(
     #         os.path.join(os.path.dirname(cfgs.HOME), "ci_bin", "libclang_rt.fuzzer_no_main.a")):
     #     fuzz_lib = os.path.join(os.path.dirname(cfgs.HOME), "ci_bin", "libclang_rt.fuzzer_no_main.a")
@@ -2429,6 +3514,10 @@ def HLTtest(args, cfgs):
             args.fuzz_rss_limit_mb = fuzz_rss_limit_mb
         else:
             args.fuzz_rss_limit_mb = 4096
+        args.fuzz_jobs = cp.get("test", "fuzz_jobs", fallback="")
+        args.fuzz_workers = cp.get("test", "fuzz_workers", fallback="")
+        args.fuzz_corpus = os.path.join(cfgs.HOME_DIR, cp.get("test", "fuzz_corpus", fallback="") or
+                                        os.path.join(cfgs.CJ_TEST_WORK, "fuzz_corpus"))
         fuzz_dir = os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "fuzz")
         if args.path and str(args.path).startswith(str(fuzz_dir)) and os.path.exists(args.path):
             cfgs.LOG.info(f"指定测试路径：{args.path}")
@@ -2445,14 +3534,21 @@ def HLTtest(args, cfgs):
     # else:
     #     run_options += f"{arg}"
 
+    # 基线文件可能就是上次的 test/report/perf.csv, 需要在清理报告目录前读取
+    baseline = load_bench_baseline(args, cfgs) if args.main else None
+    stage_start = time.time()
     shutil.rmtree(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "tmp"), ignore_errors=True)
     shutil.rmtree(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "log"), ignore_errors=True)
     shutil.rmtree(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report"), ignore_errors=True)
     os.makedirs(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "tmp"), exist_ok=True)
     os.makedirs(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report"), exist_ok=True)
+    if not args.fuzz:
+        report_writer = JUnitStreamWriter(os.path.join(cfgs.HOME_DIR, cfgs.CJ_TEST_WORK, "report", "result.xml"))
 
     if cfgs.OS_PLATFORM and cfgs.OS_PLATFORM == "windows":
         copy_windows_lib(cfgs)
+    add_phase_time("staging", time.time() - stage_start)
+    env_start = time.time()
     if target == "ohos":
         cfgs.run_cmd(f"hdc shell rm -rf {ohos_dir};mkdir {ohos_dir};chmod -R 777 {ohos_dir}")
         if cfgs.BUILD_PARMS.get("target") is not None and cfgs.BUILD_PARMS["target"].get("aarch64-linux-ohos") \
@@ -2464,39 +3560,77 @@ def HLTtest(args, cfgs):
     cfgs.library_path_L_cmd = []
     cfgs.library_l_cmd = ""
     __find_cjpm_home_librarys(args, cfgs)
-    cj_build_libs = find_lib_path(cfgs.LIB_DIR, '')
-    find_cangjie_lib_arr = []
-    for build_lib in cj_build_libs:
-        cfgs.IMPORT_PATH += f" --import-path {build_lib}"
-        for build_lib_item in os.listdir(build_lib):
-            if build_lib_item.__contains__(".") or 'bin' in build_lib_item:
-                continue
-            if os.path.exists(os.path.join(build_lib, build_lib_item)):
-                cfgs.LIBRARY_PATH += f" -L {os.path.join(build_lib, build_lib_item)}"
-                find_cangjie_lib_arr.append(os.path.join(build_lib, build_lib_item))
-                cangjie_env_setup(find_cangjie_lib_arr)
-    if cfgs.CANGJIE_STDX_DIR:
-        cfgs.IMPORT_PATH += f" --import-path {Path(cfgs.CANGJIE_STDX_DIR).parent}"
-        cfgs.LIBRARY_PATH += f" -L {cfgs.CANGJIE_STDX_DIR}"
-        __improt_stdx_libs([cfgs.CANGJIE_STDX_DIR], cfgs, args)
+    find_cangjie_lib_arr = __add_build_lib_paths(cfgs)
+    __add_stdx_paths(args, cfgs)
     __improt_libs(find_cangjie_lib_arr, cfgs)
+    if cp.get("test", "minimal_link", fallback="true") == "true":
+        from linkset import LinkIndex
+        cfgs.LINK_INDEX = LinkIndex(cfgs.LIBRARY_PATH_SET)
+    add_phase_time("env", time.time() - env_start)
 
+    discovery_start = time.time()
+    case_files = []
     for root, _, files in os.walk(dirs):
         for f in files:
             if f.endswith(".cj"):
                 if args.case:
                     if args.case.endswith(".cj"):
                         if args.case == str(f):
-                            run_one_case(args, os.path.join(root, f), run_options, compile_options, target, cfgs)
+                            case_files.append(os.path.join(root, f))
                     else:
                         if "{}.cj".format(args.case) == str(f):
-                            run_one_case(args, os.path.join(root, f), run_options, compile_options, target, cfgs)
+                            case_files.append(os.path.join(root, f))
                 else:
-                    run_one_case(args, os.path.join(root, f), run_options, compile_options, target, cfgs)
+                    case_files.append(os.path.join(root, f))
+    add_phase_time("discovery", time.time() - discovery_start)
+    start_progress(args, cfgs, len(case_files))
+    # CI 超时一般先发 SIGTERM, 转成 SystemExit 以便写出部分报告
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
     try:
-        if args.HLT:
-            gen_report(args, cfgs)
+        for case_file in case_files:
+            name = os.path.basename(case_file)
+            fail_count = error_count
+            if fuzz_budget(args):
+                # 先全部编译, 编译失败的目标不参与调度
+                compiled = len(FUZZ_TARGETS)
+                run_one_case(args, case_file, run_options, compile_options, target, cfgs)
+                if len(FUZZ_TARGETS) == compiled:
+                    progress_case_finished(name, error_count == fail_count)
+                continue
+            progress_case_started(name)
+            log_offset = os.path.getsize(case_log_path(cfgs, f"{name}.log")) \
+                if os.path.exists(case_log_path(cfgs, f"{name}.log")) else 0
+            run_one_case(args, case_file, run_options, compile_options, target, cfgs)
+            if not args.fuzz:
+                with timed_phase("report"):
+                    logger.flush()
+                    cases = append_case_result(cfgs, case_file, log_offset)
+                    if args.main:
+                        add_bench_samples(cases)
+                    write_partial_report(cfgs)
+            progress_case_finished(name, error_count == fail_count)
+        if fuzz_budget(args):
+            run_fuzz_budget(args, cfgs)
+    except BaseException:
+        if not args.fuzz:
+            try:
+                write_partial_report(cfgs, force=True)
+                logger.warning("用例未全部执行完成, 已生成部分测试报告")
+            finally:
+                report_writer.close()
+        raise
+    finally:
+        stop_progress()
+    with timed_phase("report"):
+        return_code = gen_report(args, cfgs)
+        if args.main:
+            return_code = check_bench_regression(args, cfgs, baseline) or return_code
+        if args.fuzz:
+            record_history(args, cfgs, "fuzz")
+        elif args.main:
+            record_history(args, cfgs, "bench")
         else:
-            exit(gen_report(args, cfgs))
-    except AttributeError:
-        exit(gen_report(args, cfgs))
+            record_history(args, cfgs, "hlt")
+    print_time_summary(cfgs, logger)
+    if not getattr(args, "HLT", None):
+        exit(return_code)
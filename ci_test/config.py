@@ -1,17 +1,19 @@
 # @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
 # Licensed under the Apache-2.0 License. See LICENSE file for details.
 
-import json
 import os
 import re
-import shutil
 import platform
 import subprocess
-from tomlkit import parse
+from configcache import load_json, load_toml, read_text
+from envpaths import PathSet
+from toolchain import probe
 
 str_head_1 = [233, 166, 131, 208, 152, 32, 116, 101, 115, 116, 32]
 str_head_2 = [27, 91, 52, 70, 27, 55, 27, 91, 57, 57, 57, 57, 69, 27, 91, 51, 70, 233, 166, 131, 230, 145, 157, 32, 103, 114, 111, 117, 112, 32, 100, 101, 102, 97, 117, 108, 116]
 str_tail_1 = [41, 32, 27, 56, 27, 91, 48, 74, 27, 55, 27, 91, 59, 114, 27, 56] # 尾
+# 编译和执行用例等命令的原始输出, quiet 模式下只写入日志文件, 不输出到控制台
+RAW_OUTPUT = {"raw_output": True}
 
 class ArgConfig:
     CANGJIE_STDX_DOWNLOAD_MAP = {
@@ -50,6 +52,7 @@ class ArgConfig:
     }
     BUILD_TYPE = None
     LOG = None
+    CONSOLE_HANDLER = None
     Woff = ""
     CANGJIE_SOURCE_DIR = ""
     CI_TEST_DIR = ""
@@ -76,7 +79,10 @@ class ArgConfig:
     BUILD_CJPM_PATH = None
     IMPORT_PATH = ""  # --import-path
     LIBRARY_PATH = ""  # -L
+    IMPORT_PATH_SET = PathSet()  # 已经加入 IMPORT_PATH 的目录
+    LIBRARY_PATH_SET = PathSet()  # 已经加入 LIBRARY_PATH 的目录
     LIBRARY = ""  # -l
+    LINK_INDEX = None  # HLT 用例按 import 选择 -l/-L 的索引(linkset.LinkIndex)
     MODULE_FOREIGN_REQUIRES = None
     WINDOWS_C_LIB_ARR = set()
     CUSTOM_MAP = {}
@@ -94,10 +100,9 @@ class ArgConfig:
     GIT_PASSWORD = None
 
     def __init__(self):
-        master_cjc = shutil.which("cjc")
-        if master_cjc:
-            out = os.popen('{} -v'.format(master_cjc))
-            self.REALLY_CJC_VERSION = out.readline().split('Cangjie Compiler: ')[1].split(' (')[0]
+        toolchain = probe()
+        if toolchain:
+            self.REALLY_CJC_VERSION = toolchain["version"]
         if platform.system() == 'Linux':
             if platform.uname().processor == "x86_64" or platform.uname().machine == "x86_64":
                 self.OS_PLATFORM = 'linux_x86_64'
@@ -145,7 +150,7 @@ class ArgConfig:
     def __handle_toml(self):
         self.CONFIG_FILE = "cjpm.toml"
         cfg_file = os.path.join(self.HOME_DIR, self.CONFIG_FILE)
-        self.BUILD_PARMS = parse(open(cfg_file, "r", encoding='UTF-8').read())
+        self.BUILD_PARMS = load_toml(cfg_file)
         try:
             self.MODULE_NAME = self.BUILD_PARMS['package']['name']
         except:
@@ -158,19 +163,16 @@ class ArgConfig:
         except:
             pass
         try:
-            file = open(cfg_file, "r", encoding='UTF-8')
-            for line in file.readlines():
+            for line in read_text(cfg_file).splitlines():
                 if line.startswith("#"):
                     self.CUSTOM_MAP[re.search(r"\[.*?\]", line).group()[1:-1]] = re.search(r"\{.*?\}", line).group()[
                                                                                  1:-1]
-            file.close()
         except:
             self.LOG.warn("toml 配置文件定义出错, 格式 # [key]={value}, 请检查")
 
     def __handle_json(self):
         try:
-            file = open(os.path.join(self.HOME_DIR, self.CONFIG_FILE), "r", encoding='UTF-8')
-            self.BUILD_PARMS = json.load(file)
+            self.BUILD_PARMS = load_json(os.path.join(self.HOME_DIR, self.CONFIG_FILE))
             try:
                 self.MODULE_NAME = self.BUILD_PARMS['name']
                 self.EXPECT_CJC_VERSION = self.BUILD_PARMS['cjc-version']
@@ -180,7 +182,8 @@ class ArgConfig:
         except FileNotFoundError:
             self.LOG.warn("未发现module.json文件")
 
-    def run_cmd(self, cmd, file_dir="./"):
+    def run_cmd(self, cmd, file_dir="./", output=None):
+        """:param output: 传入列表时, 输出的每一行同时追加到列表中"""
         encode = 'gbk' if self.OS_PLATFORM == "windows" else "utf-8"
         res = subprocess.Popen(cmd, shell=True, cwd=file_dir, stderr=subprocess.STDOUT, stdout=subprocess.PIPE)
         try:
@@ -188,8 +191,10 @@ class ArgConfig:
                 for msg in iter(res.stdout.readline, b''):
                     msg = str(msg, encode, errors='ignore').strip()
                     if msg != "":
+                        if output is not None:
+                            output.append(msg)
                         if not llt_check_not_start_or_end_with_target(msg):
-                            self.LOG.info(msg)
+                            self.LOG.info(msg, extra=RAW_OUTPUT)
                 res.kill()
         finally:
             if res.poll():
@@ -0,0 +1,182 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""
+解析后的配置文件缓存(cjpm.toml, cjpm.lock, module.json, ci_test.cfg)
+同一个文件在一个进程中只解析一次, 文件修改时间或大小变化后重新解析
+toml 的解析结果另外按文件路径, 修改时间和大小缓存在系统临时目录中, 其他进程命中时不需要导入 tomlkit
+返回的都是只读视图(dict -> MappingProxyType, list -> tuple), 需要修改并写回文件时用 load_toml_document
+"""
+
+import errno
+import json
+import os
+import tempfile
+import threading
+from types import MappingProxyType
+
+DISK_CACHE_FILE = os.path.join(tempfile.gettempdir(), "cangjie_ci_test_configs.json")
+_CACHE = {}  # {(类型, 真实路径): (文件标识, 解析结果)}
+_LOCK = threading.Lock()
+_UNSET = object()
+
+
+def file_stamp(path):
+    """:return: (修改时间, 大小), 文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ConfigView:
+    """ci_test.cfg 等 ini 文件的只读视图, 读取接口与 ConfigParser 一致"""
+
+    def __init__(self, sections, case_sensitive=True):
+        self._case_sensitive = case_sensitive
+        self._sections = MappingProxyType({name: MappingProxyType({self._key(k): v for k, v in options.items()})
+                                           for name, options in sections.items()})
+
+    def _key(self, option):
+        return option if self._case_sensitive else option.lower()
+
+    def sections(self):
+        return list(self._sections)
+
+    def has_section(self, section):
+        return section in self._sections
+
+    def has_option(self, section, option):
+        return self._key(option) in self._sections.get(section, {})
+
+    def get(self, section, option, *, fallback=_UNSET):
+        if section not in self._sections:
+            if fallback is _UNSET:
+                import configparser
+                raise configparser.NoSectionError(section)
+            return fallback
+        options = self._sections[section]
+        if self._key(option) not in options:
+            if fallback is _UNSET:
+                import configparser
+                raise configparser.NoOptionError(option, section)
+            return fallback
+        return options[self._key(option)]
+
+    def items(self, section):
+        return list(self[section].items())
+
+    def __getitem__(self, section):
+        return self._sections[section]
+
+    def __contains__(self, section):
+        return section in self._sections
+
+
+def _cached(kind, path, loader):
+    real = os.path.realpath(str(path))
+    stamp = file_stamp(real)
+    if stamp is None:
+        return None
+    key = (kind, real)
+    with _LOCK:
+        entry = _CACHE.get(key)
+        if entry and entry[0] == stamp:
+            return entry[1]
+    value = loader(real, stamp)
+    with _LOCK:
+        _CACHE[key] = (stamp, value)
+    return value
+
+
+def invalidate(path):
+    """写回配置文件后调用, 修改时间精度较低的文件系统上同一时刻的修改也不会读到旧内容"""
+    real = os.path.realpath(str(path))
+    with _LOCK:
+        for key in [key for key in _CACHE if key[1] == real]:
+            del _CACHE[key]
+
+
+def read_text(path):
+    """:return: 文件内容, 文件不存在时返回 None"""
+    def loader(real, _):
+        with open(real, "r", encoding="UTF-8") as f:
+            return f.read()
+    return _cached("text", path, loader)
+
+
+def _load_disk_cache():
+    try:
+        with open(DISK_CACHE_FILE, "r", encoding="UTF-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_disk_cache(real, stamp, data):
+    cache = {path: entry for path, entry in _load_disk_cache().items() if os.path.exists(path)}
+    cache[real] = {"stamp": list(stamp), "data": data}
+    temp = f"{DISK_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "w", encoding="UTF-8") as f:
+            json.dump(cache, f)
+        os.replace(temp, DISK_CACHE_FILE)
+    except (OSError, TypeError, ValueError):
+        # 含有日期等不能写成 json 的值时只在进程内缓存
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def load_toml_document(path):
+    """重新解析得到可修改的 tomlkit 文档, 用于修改后写回文件"""
+    from tomlkit import parse
+    with open(path, "r", encoding="UTF-8") as f:
+        return parse(f.read())
+
+
+def _require(value, path):
+    """与直接 open 一致, 文件不存在时抛出 FileNotFoundError"""
+    if value is None:
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), str(path))
+    return value
+
+
+def load_toml(path, disk_cache=True):
+    """:return: 只读的解析结果, 格式错误时抛出 tomlkit 的异常"""
+    def loader(real, stamp):
+        entry = _load_disk_cache().get(real) if disk_cache else None
+        if entry and tuple(entry["stamp"]) == stamp:
+            return freeze(entry["data"])
+        data = load_toml_document(real).unwrap()
+        if disk_cache:
+            _save_disk_cache(real, stamp, data)
+        return freeze(data)
+    return _require(_cached("toml", path, loader), path)
+
+
+def load_json(path):
+    """:return: 只读的解析结果"""
+    return _require(_cached("json", path, lambda real, _: freeze(json.loads(read_text(real)))), path)
+
+
+def load_cfg(path, case_sensitive=True):
+    """
+    :param case_sensitive: False 时选项名不区分大小写(与默认的 ConfigParser 一致)
+    :return: ConfigView, 文件不存在时返回 None
+    """
+    def loader(real, _):
+        import configparser
+        config = configparser.ConfigParser()
+        if case_sensitive:
+            config.optionxform = str
+        config.read(real, encoding="utf-8")
+        return ConfigView({section: dict(config.items(section)) for section in config.sections()}, case_sensitive)
+    return _cached(f"cfg:{case_sensitive}", path, loader)
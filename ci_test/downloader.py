@@ -0,0 +1,204 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""
+大文件下载(stdx 压缩包等): 断点续传, 可选分段并行下载, sha256 校验, 写完后再重命名
+配置了缓存目录时按 url 缓存, 不同工程和不同仓颉环境共用同一份下载
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = 30
+DOWNLOAD_RETRIES = 3
+MIN_SEGMENT_SIZE = 8 * 1024 * 1024  # 小于这个大小的分段不值得单独开连接
+
+
+class DownloadError(Exception):
+    pass
+
+
+def sha256_file(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def load_manifest(path):
+    """
+    sha256 清单, 支持 json({url 或文件名: sha256}) 和 sha256sum 的输出格式("<sha256>  <文件名>")
+    :return: {url 或文件名: sha256}
+    """
+    if not path or not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="UTF-8") as f:
+        text = f.read()
+    try:
+        return {key: value.lower() for key, value in json.loads(text).items()}
+    except ValueError:
+        pass
+    manifest = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            manifest[parts[1].lstrip("*")] = parts[0].lower()
+    return manifest
+
+
+def expected_sha256(manifest, url):
+    return manifest.get(url) or manifest.get(os.path.basename(url.split("?")[0]))
+
+
+def cache_path(cache_dir, url):
+    name = os.path.basename(url.split("?")[0]) or "download"
+    return os.path.join(cache_dir, f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]}-{name}")
+
+
+def remote_info(url):
+    """:return: (文件大小, 是否支持 Range), 服务器不支持 HEAD 时返回 (0, False)"""
+    try:
+        request = urllib.request.Request(url, method="HEAD")
+        with urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response:
+            size = int(response.headers.get("Content-Length") or 0)
+            return size, response.headers.get("Accept-Ranges", "").lower() == "bytes"
+    except (urllib.error.URLError, OSError, ValueError):
+        return 0, False
+
+
+def _fetch_range(url, part, start=0, end=None, progress=None):
+    """
+    把 [start, end] 追加到 part, part 中已有的内容不再下载
+    服务器忽略 Range 返回完整内容时从头重写
+    """
+    for attempt in range(DOWNLOAD_RETRIES):
+        have = os.path.getsize(part) if os.path.exists(part) else 0
+        if end is not None and start + have > end:
+            return
+        request = urllib.request.Request(url)
+        if start + have > 0 or end is not None:
+            request.add_header("Range", f"bytes={start + have}-{'' if end is None else end}")
+        try:
+            with urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response:
+                mode = "ab" if response.status == 206 else "wb"
+                if mode == "wb" and start > 0:
+                    raise DownloadError(f"服务器不支持分段下载: {url}")
+                length = int(response.headers.get("Content-Length") or -1)
+                received = 0
+                with open(part, mode) as f:
+                    for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                        f.write(chunk)
+                        received += len(chunk)
+                        if progress:
+                            progress(len(chunk))
+                # 连接中途断开时 read 不一定报错, 按 Content-Length 判断是否完整
+                if 0 <= length != received:
+                    raise OSError(f"连接断开, 收到 {received}/{length} bytes")
+            return
+        except urllib.error.HTTPError as e:
+            if e.code == 416:  # 请求的范围已经超出文件大小, part 已经完整
+                return
+            if attempt == DOWNLOAD_RETRIES - 1:
+                raise DownloadError(f"下载失败: {url}: {e}") from e
+        except (urllib.error.URLError, OSError) as e:
+            if attempt == DOWNLOAD_RETRIES - 1:
+                raise DownloadError(f"下载失败: {url}: {e}") from e
+
+
+def _fetch_segments(url, partial, size, segments, progress):
+    step = -(-size // segments)
+    ranges = [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+    parts = [f"{partial}.{index}" for index in range(len(ranges))]
+    with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [pool.submit(_fetch_range, url, part, start, end, progress)
+                   for part, (start, end) in zip(parts, ranges)]
+    for future in futures:
+        future.result()
+    with open(partial, "wb") as out:
+        for part in parts:
+            with open(part, "rb") as f:
+                shutil.copyfileobj(f, out, CHUNK_SIZE)
+    for part in parts:
+        os.remove(part)
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """多个进程下载同一个缓存文件时排队(仅linux), 后面的进程直接使用下载好的文件"""
+    with open(f"{path}.lock", "w") as lock_file:
+        try:
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        except ImportError:
+            pass
+        yield
+
+
+class _Progress:
+    """每完成 10% 记录一次日志"""
+
+    def __init__(self, url, total, done, log):
+        self.url, self.total, self.done, self.log = url, total, done, log
+        self.reported = done * 10 // total if total else 0
+
+    def __call__(self, size):
+        self.done += size
+        step = self.done * 10 // self.total if self.total else 0
+        if step > self.reported and self.log:
+            self.reported = step
+            self.log(f"下载进度: {self.done}/{self.total} bytes ({min(step * 10, 100)}%) {self.url}")
+
+
+def download_file(url, dest, cache_dir=None, sha256=None, segments=1, log=None):
+    """
+    下载 url, 中断后再次调用从已下载的位置继续
+    :param dest: 不使用缓存时的保存路径
+    :param cache_dir: 缓存目录, 配置后文件保存在缓存目录中, dest 不使用
+    :param sha256: 期望的 sha256, 为空时使用缓存中第一次下载时记录的 sha256
+    :param segments: 服务器支持 Range 时分段并行下载的段数
+    :return: 校验通过的文件路径
+    """
+    target = cache_path(cache_dir, url) if cache_dir else dest
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    with _file_lock(target):
+        return _download(url, target, sha256, segments, log)
+
+
+def _download(url, target, sha256, segments, log):
+    record = f"{target}.sha256"
+    if os.path.isfile(target):
+        actual = sha256_file(target)
+        if not sha256 and os.path.isfile(record):
+            with open(record, "r", encoding="UTF-8") as f:
+                sha256 = f.read().strip()
+        if not sha256 or actual == sha256.lower():
+            return target
+        if log:
+            log(f"{target} sha256 校验失败, 重新下载")
+        os.remove(target)
+    partial = f"{target}.part"
+    size, ranges = remote_info(url)
+    segments = min(segments, size // MIN_SEGMENT_SIZE) if ranges else 1
+    have = os.path.getsize(partial) if os.path.exists(partial) else 0
+    progress = _Progress(url, size, have, log)
+    if segments > 1 and have == 0:
+        _fetch_segments(url, partial, size, segments, progress)
+    else:
+        _fetch_range(url, partial, progress=progress)
+    if size and os.path.getsize(partial) != size:
+        raise DownloadError(f"下载不完整: {url} {os.path.getsize(partial)}/{size} bytes, 再次执行时继续下载")
+    actual = sha256_file(partial)
+    if sha256 and actual != sha256.lower():
+        os.remove(partial)
+        raise DownloadError(f"sha256 校验失败: {url} 期望 {sha256} 实际 {actual}")
+    os.replace(partial, target)
+    with open(record, "w", encoding="UTF-8") as f:
+        f.write(actual)
+    return target
@@ -0,0 +1,65 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""
+动态库搜索目录和 --import-path 目录: 有序去重, 不存在的目录不加入
+子进程继承的 LD_LIBRARY_PATH(windows 为 Path) 中没有重复项和空项(空项表示当前目录)
+"""
+
+import os
+import platform
+
+
+def library_env_name():
+    return "Path" if platform.system() == "Windows" else "LD_LIBRARY_PATH"
+
+
+def normalize(path):
+    return os.path.normpath(os.path.abspath(str(path)))
+
+
+class PathSet:
+    """按加入顺序保存的目录集合, 保存为绝对路径, 同一个目录的不同写法(./a, a/)只保存一次"""
+
+    def __init__(self, paths=()):
+        self._paths = []
+        self._seen = set()
+        for path in paths:
+            self.add(path)
+
+    def add(self, path):
+        """:return: 是否新加入, 目录不存在或已经加入过时返回 False"""
+        if not path or not os.path.isdir(path):
+            return False
+        key = normalize(path)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self._paths.append(key)
+        return True
+
+    def __contains__(self, path):
+        return normalize(path) in self._seen
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+
+def merge_paths(paths, current="", append=False, sep=os.pathsep):
+    """
+    把 paths 和环境变量原来的值 current 合并, 结果中去掉重复项, 空项和不存在的目录
+    :param append: paths 放在 current 之后, 默认放在前面
+    """
+    existing = [p for p in (current or "").split(sep) if p]
+    merged = PathSet(existing + list(paths) if append else list(paths) + existing)
+    return sep.join(merged)
+
+
+def update_env_paths(name, paths, env=None, append=False):
+    """把 paths 合并进环境变量 name, env 为空时修改 os.environ, 之后启动的子进程都会继承"""
+    if env is None:
+        env = os.environ
+    env[name] = merge_paths(paths, env.get(name, ""), append)
+    return env[name]
@@ -0,0 +1,167 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""
+拉取 git 仓库的分支(ci_lib 的 lib_<name> 分支, test4tpc 等)
+配置了镜像目录时, 每个远端仓库在本地有一个裸仓库缓存, 只从远端拉取增量, 工作目录从本地缓存检出
+"""
+
+import contextlib
+import os
+import subprocess
+import threading
+
+CI_LIB_URL = "https://gitcode.com/Cangjie-TPC/ci_lib.git"
+FETCH_WORKERS = 4
+GIT_TIMEOUT = 600
+
+_MIRROR_LOCKS = {}
+_MIRROR_LOCKS_GUARD = threading.Lock()
+
+
+def run_git(args, cwd=None, timeout=GIT_TIMEOUT):
+    """:return: (returncode, 合并后的 stdout/stderr)"""
+    try:
+        result = subprocess.run(["git"] + args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                timeout=timeout)
+        return result.returncode, result.stdout.decode("utf-8", "replace")
+    except subprocess.TimeoutExpired:
+        return 124, f"git {args[0]} timed out after {timeout}s"
+    except OSError as e:
+        return 127, str(e)
+
+
+def strip_credentials(url):
+    """去掉 url 中的账号密码, 镜像目录名和日志中不保存密码"""
+    import urllib.parse
+    parts = urllib.parse.urlsplit(url)
+    if not parts.username and not parts.password:
+        return url
+    netloc = parts.hostname or ""
+    if parts.port:
+        netloc += f":{parts.port}"
+    return urllib.parse.urlunsplit((parts.scheme, netloc, parts.path, parts.query, parts.fragment))
+
+
+def mirror_path(mirror_root, url):
+    import hashlib
+    clean = strip_credentials(url).rstrip("/")
+    name = os.path.basename(clean) or "repo"
+    if not name.endswith(".git"):
+        name += ".git"
+    return os.path.join(mirror_root, f"{hashlib.sha1(clean.encode('utf-8')).hexdigest()[:12]}-{name}")
+
+
+@contextlib.contextmanager
+def _mirror_lock(mirror):
+    """同一个镜像同一时间只有一个 fetch, 线程之间用锁, 进程之间用文件锁(仅linux)"""
+    with _MIRROR_LOCKS_GUARD:
+        lock = _MIRROR_LOCKS.setdefault(mirror, threading.Lock())
+    with lock:
+        os.makedirs(os.path.dirname(mirror), exist_ok=True)
+        with open(f"{mirror}.lock", "w") as lock_file:
+            try:
+                import fcntl
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            except ImportError:
+                pass
+            yield
+
+
+def has_branch(mirror, branch):
+    return run_git(["--git-dir", mirror, "rev-parse", "--verify", "-q", f"refs/heads/{branch}"])[0] == 0
+
+
+def update_mirror(mirror_root, url, branches, depth=1):
+    """
+    把 branches 从 url 拉取到本地镜像(裸仓库), 镜像中已有的对象不会重复传输
+    多个分支一次 fetch 失败时(例如其中一个分支不存在)逐个分支重试
+    :return: (镜像路径, returncode, output)
+    """
+    mirror = mirror_path(mirror_root, url)
+    with _mirror_lock(mirror):
+        if not os.path.isdir(mirror):
+            code, out = run_git(["init", "-q", "--bare", mirror])
+            if code != 0:
+                return mirror, code, out
+        fetch = ["--git-dir", mirror, "fetch", "--no-tags"] + ([f"--depth={depth}"] if depth else []) + [url]
+        code, out = run_git(fetch + [f"+refs/heads/{b}:refs/heads/{b}" for b in branches])
+        if code != 0 and len(branches) > 1:
+            code = 0
+            for branch in branches:
+                branch_code, branch_out = run_git(fetch + [f"+refs/heads/{branch}:refs/heads/{branch}"])
+                code = code or branch_code
+                out += branch_out
+    return mirror, code, out
+
+
+def checkout_branch(mirror, branch, dest, sparse_paths=None):
+    """
+    从本地镜像检出 branch 到 dest, dest 已经是 git checkout 时只更新到镜像中的最新提交
+    :param sparse_paths: 只检出这些目录(git sparse-checkout), 不支持时检出全部
+    """
+    if os.path.isdir(os.path.join(dest, ".git")):
+        # 镜像是浅克隆时新提交的父提交不在镜像中, 需要 --update-shallow 才能接受
+        code, out = run_git(["fetch", "-q", "--no-tags", "--update-shallow", mirror, branch], cwd=dest)
+        if code != 0:
+            return code, out
+        code, checkout_out = run_git(["checkout", "-q", "-f", "FETCH_HEAD"], cwd=dest)
+        return code, out + checkout_out
+    code, out = run_git(["clone", "-q", "--no-checkout", "-b", branch, mirror, dest])
+    if code != 0:
+        return code, out
+    if sparse_paths:
+        out += run_git(["sparse-checkout", "set"] + list(sparse_paths), cwd=dest)[1]
+    code, checkout_out = run_git(["reset", "-q", "--hard"], cwd=dest)
+    return code, out + checkout_out
+
+
+def fetch_branch(url, branch, dest, depth=1, mirror_root=None, sparse_paths=None):
+    """
+    把 url 的 branch 拉取到 dest; dest 已经是 git checkout 时只 fetch 该分支并切换过去
+    fetch 失败(例如离线)时保留原有内容, 由调用方决定是否继续使用
+    """
+    if mirror_root:
+        mirror, code, out = update_mirror(mirror_root, url, [branch], depth)
+        if code != 0 and not has_branch(mirror, branch):
+            return code, out
+        checkout_code, checkout_out = checkout_branch(mirror, branch, dest, sparse_paths)
+        return checkout_code, out + checkout_out
+    if os.path.isdir(os.path.join(dest, ".git")):
+        code, out = run_git(["fetch", f"--depth={depth}", url, branch], cwd=dest)
+        if code != 0:
+            return code, out
+        code, checkout_out = run_git(["checkout", "-q", "-f", "FETCH_HEAD"], cwd=dest)
+        return code, out + checkout_out
+    return run_git(["clone", "-b", branch, f"--depth={depth}", url, dest])
+
+
+def fetch_branches(jobs, workers=FETCH_WORKERS, mirror_root=None):
+    """
+    并行拉取多个分支, 相同的 (url, branch) 只拉取一次
+    使用镜像时同一个仓库的分支先一次 fetch 到镜像, 再并行检出
+    :param jobs: [(url, branch, dest)]
+    :return: {(url, branch): (dest, returncode, output)}
+    """
+    unique = {}
+    for url, branch, dest in jobs:
+        unique.setdefault((url, branch), dest)
+    if not unique:
+        return {}
+    mirrors = {}
+    if mirror_root:
+        for url in dict.fromkeys(url for url, _ in unique):
+            mirrors[url] = update_mirror(mirror_root, url, [b for u, b in unique if u == url])
+
+    def fetch(key):
+        url, branch = key
+        if not mirror_root:
+            return fetch_branch(url, branch, unique[key])
+        mirror, code, out = mirrors[url]
+        if code != 0 and not has_branch(mirror, branch):
+            return code, out
+        return checkout_branch(mirror, branch, unique[key])
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(unique)))) as pool:
+        futures = {key: pool.submit(fetch, key) for key in unique}
+    return {key: (unique[key],) + future.result() for key, future in futures.items()}
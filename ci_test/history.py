@@ -0,0 +1,172 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""本地 SQLite 历史数据库, 记录每次 llt/hlt/bench/fuzz 运行的用例结果和耗时"""
+
+import os
+import socket
+import sqlite3
+import subprocess
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    project TEXT,
+    started REAL,
+    duration REAL,
+    cjc_version TEXT,
+    git_rev TEXT,
+    host TEXT
+);
+CREATE TABLE IF NOT EXISTS cases (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    case_file TEXT NOT NULL,
+    status TEXT,
+    compile_time REAL,
+    run_time REAL
+);
+CREATE TABLE IF NOT EXISTS testcases (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    case_file TEXT,
+    suite TEXT,
+    name TEXT,
+    status TEXT,
+    time_ns REAL,
+    ns_per_op REAL
+);
+CREATE TABLE IF NOT EXISTS bench_samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    benchmark TEXT NOT NULL,
+    ns_per_op REAL
+);
+CREATE INDEX IF NOT EXISTS cases_file ON cases(case_file);
+CREATE INDEX IF NOT EXISTS testcases_name ON testcases(name);
+"""
+FAILED_STATUSES = ("FAIL", "ERROR")
+
+
+def git_revision(path):
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=path, stdout=subprocess.PIPE,
+                             stderr=subprocess.DEVNULL, text=True, timeout=10)
+        return out.stdout.strip() if out.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _float_or_none(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class HistoryDB:
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(str(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path), timeout=30)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, kind, project, started, cjc_version, git_rev, case_records, testcases, bench_samples=None):
+        """
+        :param case_records: [{"case", "status", "compile_time", "run_time"}] 每个用例文件一条
+        :param testcases: [(case_file, suite, name, status, time_ns, ns_per_op)] 来自 cjtest 日志的用例结果
+        :param bench_samples: {benchmark: [ns/op, ...]} bench 多次执行的样本
+        """
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs(kind, project, started, duration, cjc_version, git_rev, host) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, project, started, time.time() - started, cjc_version, git_rev, socket.gethostname()))
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO cases(run_id, case_file, status, compile_time, run_time) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, r["case"], r["status"], r.get("compile_time"), r.get("run_time")) for r in case_records])
+            self.conn.executemany(
+                "INSERT INTO testcases(run_id, case_file, suite, name, status, time_ns, ns_per_op) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, case_file, suite, name, status.strip(), _float_or_none(time_ns), _float_or_none(per_op))
+                 for case_file, suite, name, status, time_ns, per_op in testcases])
+            self.conn.executemany(
+                "INSERT INTO bench_samples(run_id, benchmark, ns_per_op) VALUES (?, ?, ?)",
+                [(run_id, benchmark, value) for benchmark, values in (bench_samples or {}).items() for value in values])
+        return run_id
+
+    def _recent_runs(self, kind, last):
+        sql = "SELECT id FROM runs"
+        params = []
+        if kind:
+            sql += " WHERE kind = ?"
+            params.append(kind)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(last)
+        return [row[0] for row in self.conn.execute(sql, params)]
+
+    def slowest(self, by="run", kind=None, last=20, limit=10):
+        """最近 last 次运行中按平均编译/运行耗时排序的用例"""
+        column = "compile_time" if by == "compile" else "run_time"
+        run_ids = self._recent_runs(kind, last)
+        if not run_ids:
+            return []
+        marks = ",".join("?" * len(run_ids))
+        return self.conn.execute(
+            f"SELECT case_file, COUNT(*), AVG({column}), MAX({column}) FROM cases "
+            f"WHERE run_id IN ({marks}) AND {column} IS NOT NULL "
+            f"GROUP BY case_file ORDER BY AVG({column}) DESC LIMIT ?", run_ids + [limit]).fetchall()
+
+    def trend(self, case, kind=None, last=20):
+        """用例(文件名或 testcase 名)在最近 last 次运行中的结果和耗时"""
+        run_ids = self._recent_runs(kind, last)
+        if not run_ids:
+            return []
+        marks = ",".join("?" * len(run_ids))
+        pattern = f"%{case}%"
+        return self.conn.execute(
+            f"SELECT r.id, r.started, r.git_rev, r.cjc_version, c.case_file, c.status, c.compile_time, c.run_time, "
+            f"NULL, NULL FROM cases c JOIN runs r ON r.id = c.run_id "
+            f"WHERE c.run_id IN ({marks}) AND c.case_file LIKE ? "
+            f"UNION ALL "
+            f"SELECT r.id, r.started, r.git_rev, r.cjc_version, t.suite || '.' || t.name, t.status, NULL, NULL, "
+            f"t.time_ns, t.ns_per_op FROM testcases t JOIN runs r ON r.id = t.run_id "
+            f"WHERE t.run_id IN ({marks}) AND (t.name = ? OR t.suite || '.' || t.name LIKE ?) "
+            f"ORDER BY 1, 5", run_ids + [pattern] + run_ids + [case, pattern]).fetchall()
+
+    def flaky(self, kind=None, last=20, limit=20):
+        """
+        最近 last 次运行中结果既有通过又有失败(FAIL/ERROR)的用例, SKIP 的运行不计入
+        :return: [(case_file, runs, fails, flips)] flips 为相邻两次运行结果发生变化的次数
+        """
+        run_ids = self._recent_runs(kind, last)
+        if not run_ids:
+            return []
+        marks = ",".join("?" * len(run_ids))
+        history = {}
+        for case_file, status in self.conn.execute(
+                f"SELECT case_file, status FROM cases WHERE run_id IN ({marks}) ORDER BY run_id", run_ids):
+            if status == "PASS" or status in FAILED_STATUSES:
+                history.setdefault(case_file, []).append(status != "PASS")
+        rows = []
+        for case_file, fails in history.items():
+            fail_count = sum(fails)
+            if 0 < fail_count < len(fails):
+                flips = sum(1 for a, b in zip(fails, fails[1:]) if a != b)
+                rows.append((case_file, len(fails), fail_count, flips))
+        rows.sort(key=lambda row: (row[3] / row[1], row[2] / row[1]), reverse=True)
+        return rows[:limit]
+
+    def bench_baseline(self, last=5):
+        """最近 last 次 bench 运行的 ns/op 样本: {benchmark: [ns/op, ...]}"""
+        run_ids = self._recent_runs("bench", last)
+        if not run_ids:
+            return {}
+        marks = ",".join("?" * len(run_ids))
+        samples = {}
+        for benchmark, value in self.conn.execute(
+                f"SELECT benchmark, ns_per_op FROM bench_samples WHERE run_id IN ({marks}) AND ns_per_op IS NOT NULL",
+                run_ids):
+            samples.setdefault(benchmark, []).append(value)
+        return samples
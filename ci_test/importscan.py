@@ -0,0 +1,112 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""扫描源码的 import 语句: 构建前判断工程是否依赖 stdx, HLT 用例按 import 确定需要链接的库"""
+
+import json
+import os
+import re
+
+COMMENT_PATTERN = re.compile(r"/\*.*?\*/|//[^\n]*", re.S)
+# import stdx.encoding.json.*    public import {std.io.*, stdx.net.http.*}    import std.collection.{ArrayList, HashMap}
+# {} 中的内容可以跨行
+IMPORT_PATTERN = re.compile(r"^\s*(?:(?:public|protected|internal|private)\s+)?import\s+([^\n{]*(?:\{[^}]*\}[^\n]*)?)",
+                            re.M)
+# import 语句中逗号分隔的一项: prefix.{a, b} 或 a.b
+IMPORT_ITEM_PATTERN = re.compile(r"([^,{}]*)\{([^}]*)\}|[^,{}]+")
+STDX_PATTERN = re.compile(r"(?:^|[\s{,])stdx\.")
+
+
+def file_imports_stdx(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = COMMENT_PATTERN.sub("", f.read())
+    return any(STDX_PATTERN.search(imports) for imports in IMPORT_PATTERN.findall(text))
+
+
+def import_items(imports):
+    """import 后面的内容按逗号拆开, prefix.{a, b.*} 展开为 prefix.a, prefix.b.*"""
+    items = []
+    for match in IMPORT_ITEM_PATTERN.finditer(imports):
+        if match.group(2) is None:
+            items.append(match.group(0))
+            continue
+        prefix = match.group(1).strip().rstrip(".")
+        for item in match.group(2).split(","):
+            item = item.strip()
+            if item:
+                items.append(f"{prefix}.{item}" if prefix else item)
+    return items
+
+
+def parse_imports(text):
+    """
+    :return: import 语句中的名字, 去掉 .* 和别名
+    import a.b.*    import a.b.C as D    import {a.b.*, c.d}    import a.{b.*, C} -> [a.b, a.b.C, c.d, a.b, a.C]
+    """
+    names = []
+    for imports in IMPORT_PATTERN.findall(COMMENT_PATTERN.sub("", text)):
+        for item in import_items(imports):
+            words = item.split()
+            name = words[0].rstrip(";").rstrip(".*") if words else ""
+            if name:
+                names.append(name)
+    return names
+
+
+def file_imports(path):
+    """:return: 文件中 import 的名字, 文件不存在时返回空列表"""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return parse_imports(f.read())
+    except OSError:
+        return []
+
+
+def source_files(src_dir):
+    files = []
+    for dir_path, _, names in os.walk(src_dir):
+        files.extend(os.path.join(dir_path, name) for name in names if name.endswith(".cj"))
+    return sorted(files)
+
+
+def source_fingerprint(files):
+    """文件路径, 大小和修改时间的哈希, 不读文件内容"""
+    import hashlib
+    hasher = hashlib.sha256()
+    for path in files:
+        stat = os.stat(path)
+        hasher.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def scan_stdx_imports(files, workers=None):
+    """并行扫描, 任意一个文件引用了 stdx 就返回 True"""
+    from concurrent.futures import ThreadPoolExecutor
+    if not files:
+        return False
+    with ThreadPoolExecutor(max_workers=workers or min(8, len(files))) as pool:
+        return any(pool.map(file_imports_stdx, files))
+
+
+def uses_stdx(src_dir, cache_file=None):
+    """
+    src 下的 .cj 文件是否引用 stdx, 结果按源码指纹缓存在 cache_file 中
+    :return: (是否引用 stdx, 是否来自缓存)
+    """
+    files = source_files(src_dir)
+    fingerprint = source_fingerprint(files)
+    cache = {}
+    if cache_file and os.path.isfile(cache_file):
+        try:
+            with open(cache_file, "r", encoding="UTF-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        if cache.get(src_dir, {}).get("fingerprint") == fingerprint:
+            return cache[src_dir]["stdx"], True
+    result = scan_stdx_imports(files)
+    if cache_file:
+        cache[src_dir] = {"fingerprint": fingerprint, "stdx": result}
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, "w", encoding="UTF-8") as f:
+            json.dump(cache, f, indent=2)
+    return result, False
@@ -0,0 +1,172 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""解析 libFuzzer 输出的状态行, 生成每个 fuzz 目标的吞吐量/覆盖率时间序列; 按调用栈给崩溃输入分类"""
+
+import json
+import re
+import time
+
+# #1234	NEW    cov: 120 ft: 300 corp: 25/1042b lim: 16 exec/s: 617 rss: 48Mb L: 9/16 MS: 1 ChangeBit-
+STATUS_PATTERN = re.compile(r"#(\d+)\s+(\w+)\s+(.*)")
+STATUS_FIELD_PATTERN = re.compile(r"(cov|ft|corp|exec/s|rss): (\d+)(?:/(\d+)(b|Kb|Mb))?")
+LOG_TIME_PATTERN = re.compile(r"^\[(\d\d-\d\d \d\d:\d\d:\d\d)]")
+# 日志时间没有年份, 补上年份再解析, 否则按 1900 年解析时 02-29 无效
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# 时间倒退超过这个秒数时认为日志跨年(12-31 -> 01-01)
+YEAR_WRAP_SECONDS = 180 * 24 * 3600
+SIZE_UNITS = {"b": 1, "Kb": 1024, "Mb": 1024 * 1024}
+
+# libFuzzer 写出的问题输入前缀, slow-unit 只是慢不算崩溃
+ARTIFACT_KINDS = ("crash", "oom", "timeout", "leak")
+#	 at pkg.Type.func(/src/file.cj:42)
+CJ_FRAME_PATTERN = re.compile(r"^\s*at (\S+?)\(")
+#     #3 0x55d1c2 in pkg::func(int) /src/file.cpp:12:3
+NATIVE_FRAME_PATTERN = re.compile(r"#\d+ 0x[0-9a-fA-F]+ in (\S+)")
+EXCEPTION_PATTERN = re.compile(r"^\s*(\w+(?:Exception|Error))\b")
+# 运行时, 标准库和 libFuzzer 自身的栈帧对区分崩溃没有帮助
+IGNORED_FRAMES = ("std.", "fuzzer::", "__sanitizer", "__asan", "__libc", "_start", "abort", "raise", "libc.")
+STACK_DEPTH = 3
+
+SERIES_FIELDS = ["elapsed", "runs", "event", "cov", "ft", "corp_units", "corp_bytes", "exec_s", "rss_mb"]
+
+
+def parse_status_line(line):
+    """
+    解析一行 libFuzzer 状态输出, 行首可以带日志前缀
+    :return: dict(runs, event, cov, ft, corp_units, corp_bytes, exec_s, rss_mb), 不是状态行时返回 None
+    """
+    index = line.find("#")
+    if index < 0 or " cov: " not in line and "exec/s: " not in line:
+        return None
+    match = STATUS_PATTERN.match(line, index)
+    if not match:
+        return None
+    point = {"runs": int(match.group(1)), "event": match.group(2), "cov": None, "ft": None, "corp_units": None,
+             "corp_bytes": None, "exec_s": None, "rss_mb": None}
+    for name, value, size, unit in STATUS_FIELD_PATTERN.findall(match.group(3)):
+        if name == "corp":
+            point["corp_units"] = int(value)
+            point["corp_bytes"] = int(size) * SIZE_UNITS[unit] if size else None
+        elif name == "exec/s":
+            point["exec_s"] = int(value)
+        elif name == "rss":
+            point["rss_mb"] = int(value)
+        else:
+            point[name] = int(value)
+    return point
+
+
+def _log_time(line, year):
+    match = LOG_TIME_PATTERN.match(line)
+    if not match:
+        return None
+    import calendar
+    try:
+        return calendar.timegm(time.strptime(f"{year}-{match.group(1)}", LOG_TIME_FORMAT))
+    except ValueError:
+        return None
+
+
+def parse_fuzz_lines(lines, year=None):
+    """
+    从一个用例日志中提取所有状态行
+    elapsed 为日志时间相对第一条状态行的秒数, 日志没有时间前缀时为 None
+    :param year: 第一条状态行的年份, 默认为当前年份
+    """
+    series = []
+    start = None
+    previous = None
+    year = time.localtime().tm_year if year is None else year
+    for line in lines:
+        point = parse_status_line(line)
+        if point is None:
+            continue
+        log_time = _log_time(line, year)
+        if log_time is not None and previous is not None and log_time < previous - YEAR_WRAP_SECONDS:
+            year += 1
+            log_time = _log_time(line, year)
+        if log_time is not None:
+            previous = log_time
+            if start is None:
+                start = log_time
+        point["elapsed"] = log_time - start if log_time is not None else None
+        series.append(point)
+    return series
+
+
+def summarize(series):
+    """最终 exec/s, 覆盖率(cov/ft), 语料规模和峰值 RSS"""
+    summary = {"runs": 0, "exec_s": None, "cov": None, "ft": None, "corp_units": None, "peak_rss_mb": None,
+               "points": len(series)}
+    for point in series:
+        summary["runs"] = max(summary["runs"], point["runs"])
+        for key in ("cov", "ft", "corp_units"):
+            if point[key] is not None:
+                summary[key] = point[key]
+        if point["exec_s"]:
+            summary["exec_s"] = point["exec_s"]
+        if point["rss_mb"] is not None:
+            summary["peak_rss_mb"] = max(summary["peak_rss_mb"] or 0, point["rss_mb"])
+    return summary
+
+
+def write_series_csv(path, series):
+    import csv
+    with open(path, "w", encoding="UTF-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SERIES_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(series)
+
+
+def write_stats_json(path, stats):
+    """:param stats: {target: {"summary": {...}, "series": [...]}}"""
+    with open(path, "w", encoding="UTF-8") as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+
+
+def artifact_kind(name):
+    """crash-<sha1> 等问题输入的类型, 不是问题输入时返回 None"""
+    for kind in ARTIFACT_KINDS:
+        if name.startswith(f"{kind}-"):
+            return kind
+    return None
+
+
+def stack_frames(lines, depth=STACK_DEPTH):
+    """复现输出中栈顶 depth 个业务栈帧的函数名, 不含行号和地址"""
+    frames = []
+    for line in lines:
+        match = CJ_FRAME_PATTERN.match(line) or NATIVE_FRAME_PATTERN.search(line)
+        if not match:
+            continue
+        frame = match.group(1).split("(")[0]
+        if frame.startswith(IGNORED_FRAMES):
+            continue
+        frames.append(frame)
+        if len(frames) >= depth:
+            break
+    return frames
+
+
+def crash_signature(kind, lines):
+    """
+    崩溃签名: 类型 + 异常名 + 栈顶栈帧, 行号/地址/输入内容不同的同一个问题得到相同签名
+    :return: (signature, title, frames)
+    """
+    import hashlib
+    exception = ""
+    for line in lines:
+        match = EXCEPTION_PATTERN.match(line)
+        if match:
+            exception = match.group(1)
+            break
+    frames = stack_frames(lines)
+    signature = hashlib.sha1("|".join([kind, exception] + frames).encode("utf-8")).hexdigest()[:12]
+    title = " ".join(item for item in (kind, exception, frames[0] if frames else "") if item)
+    return signature, title, frames
+
+
+def write_crashes_json(path, crashes):
+    """:param crashes: {target: {"crashes": [...], "untriaged": N}}"""
+    with open(path, "w", encoding="UTF-8") as f:
+        json.dump(crashes, f, ensure_ascii=False, indent=2)
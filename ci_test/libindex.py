@@ -0,0 +1,188 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""
+库目录索引: target, stdx, cjpm git 依赖等目录下的文件列表, 代替反复的 os.walk
+索引按目录修改时间缓存在系统临时目录中, 之后只重新读取修改时间变化的目录
+一个进程中每个根目录只校验一次, 之后的查询直接返回; 进程内修改了目录(如构建)后调用 reset_index
+"""
+
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+
+INDEX_CACHE_FILE = os.path.join(tempfile.gettempdir(), "cangjie_ci_test_libindex.json")
+# 修改时间离扫描时刻太近的目录下次仍重新读取, 避免同一时刻的后续修改因修改时间精度丢失
+RACY_SECONDS = 2
+_TREES = {}  # 进程内缓存 {根目录真实路径: [(目录, 子目录名, 文件名)]}
+_LINK_NAMES = {}  # {(根目录真实路径, 是否递归, 是否包含 dll): (库名, ...)}
+_LOCK = threading.Lock()
+
+
+def _scan_dir(path, racy_before):
+    """:return: 目录索引项 {mtime, dirs, links, files}, 目录不存在时返回 None"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        entries = list(os.scandir(path))
+    except OSError:
+        return None
+    dirs, links, files = [], [], []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            dirs.append(entry.name)
+            if entry.is_symlink():
+                links.append(entry.name)  # 与 os.walk 一致, 不进入符号链接的目录
+        else:
+            files.append(entry.name)
+    return {"mtime": mtime if mtime < racy_before else None, "dirs": dirs, "links": links, "files": files}
+
+
+def _refresh(root, cached):
+    """按修改时间复用 cached 中的目录项, :return: (新的目录索引, 是否有变化)"""
+    index = {}
+    changed = False
+    racy_before = time.time_ns() - RACY_SECONDS * 1000000000
+    pending = [root]
+    while pending:
+        path = pending.pop()
+        entry = cached.get(path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            changed = True
+            continue
+        if entry is None or entry["mtime"] != mtime:
+            entry = _scan_dir(path, racy_before)
+            changed = True
+            if entry is None:
+                continue
+        index[path] = entry
+        pending.extend(os.path.join(path, name) for name in reversed(entry["dirs"]) if name not in entry["links"])
+    return index, changed or len(index) != len(cached)
+
+
+def _load_cache():
+    try:
+        with open(INDEX_CACHE_FILE, "r", encoding="UTF-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(root, index):
+    # 多个进程同时写时各自写临时文件再重命名, 不会读到写了一半的文件
+    cache = {path: tree for path, tree in _load_cache().items() if os.path.isdir(path)}
+    cache[root] = index
+    temp = f"{INDEX_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "w", encoding="UTF-8") as f:
+            json.dump(cache, f)
+        os.replace(temp, INDEX_CACHE_FILE)
+    except OSError:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def _subtree(real):
+    """已经索引过的上级目录中 real 目录的部分, runAll 等对构建输出目录的每个包目录查询时不再重复校验"""
+    for parent, tree in _TREES.items():
+        if real.startswith(parent + os.sep):
+            subtree = [item for item in tree if item[0] == real or item[0].startswith(real + os.sep)]
+            if subtree:
+                return subtree
+    return None
+
+
+def _tree(root):
+    real = os.path.realpath(str(root))
+    with _LOCK:
+        tree = _TREES.get(real)
+        if tree is not None:
+            return real, tree
+        tree = _subtree(real)
+        if tree:
+            _TREES[real] = tree
+            return real, tree
+        index, changed = _refresh(real, _load_cache().get(real, {}))
+        if changed and index:
+            _save_cache(real, index)
+        # 按 os.walk 自顶向下的顺序保存
+        tree = []
+        pending = [real]
+        while pending:
+            path = pending.pop()
+            entry = index.get(path)
+            if entry is None:
+                continue
+            tree.append((path, entry["dirs"], entry["files"]))
+            pending.extend(os.path.join(path, name) for name in reversed(entry["dirs"]) if name not in entry["links"])
+        _TREES[real] = tree
+        return real, tree
+
+
+def walk_cached(root):
+    """与 os.walk(root) 的结果一致: [(目录, 子目录名, 文件名)], 目录中的路径以 root 开头"""
+    real, tree = _tree(root)
+    prefix = str(root)
+    if real == prefix:
+        return list(tree)
+    return [(prefix if path == real else os.path.join(prefix, path[len(real) + 1:]), dirs, names)
+            for path, dirs, names in tree]
+
+
+def files(root, recursive=True):
+    """:return: root 下的文件路径列表, recursive 为 False 时只包含 root 目录中的文件"""
+    result = []
+    for path, _, names in walk_cached(root):
+        result.extend(os.path.join(path, name) for name in names)
+        if not recursive:
+            break
+    return result
+
+
+def link_name(file_name, dll=None):
+    """libfoo.so / libfoo.a / libfoo.dll -> foo, 不是库文件时返回 None"""
+    if dll is None:
+        dll = platform.system() == "Windows"
+    if not file_name.startswith("lib"):
+        return None
+    if file_name.endswith(".so"):
+        return file_name[3:-3]
+    if file_name.endswith(".a"):
+        return file_name[3:-2]
+    if dll and file_name.endswith(".dll"):
+        return file_name[3:-4]
+    return None
+
+
+def link_names(root, recursive=True, dll=None):
+    """:return: root 下的库名(-l 参数), 按 os.walk 顺序去重"""
+    if dll is None:
+        dll = platform.system() == "Windows"
+    key = (os.path.realpath(str(root)), recursive, dll)
+    with _LOCK:
+        names = _LINK_NAMES.get(key)
+    if names is None:
+        names = tuple(dict.fromkeys(name for name in (link_name(os.path.basename(f), dll)
+                                                      for f in files(root, recursive)) if name))
+        with _LOCK:
+            _LINK_NAMES[key] = names
+    return names
+
+
+def link_flags(root, recursive=True, dll=None):
+    """:return: root 下所有库的链接参数 "-l a -l b " """
+    return "".join(f"-l {name} " for name in link_names(root, recursive, dll))
+
+
+def reset_index():
+    """进程内构建, 解压等修改了库目录后调用, 之后的查询重新按修改时间校验"""
+    with _LOCK:
+        _TREES.clear()
+        _LINK_NAMES.clear()
@@ -0,0 +1,143 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""
+HLT 用例的最小链接集合: 只链接用例和 dependence 文件 import 的仓颉包的库, 以及这些包依赖的包的库
+仓颉包的库是与 <包名>.cjo 在同一目录的 lib<包名>.a/.so, 包之间的依赖从 .cjo 中出现的包名得到
+其他库(ffi 的 C 库等)无法判断是否用到, 总是链接
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+from envpaths import normalize
+from importscan import file_imports
+from libindex import link_name, walk_cached
+
+CJO_DEPS_CACHE_FILE = os.path.join(tempfile.gettempdir(), "cangjie_ci_test_cjo_deps.json")
+QUALIFIED_NAME_PATTERN = re.compile(rb"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)+")
+LINK_FLAG_PATTERN = re.compile(r"-l\s*(\S+)")
+LIBRARY_PATH_PATTERN = re.compile(r"-L\s*(\S+)")
+# 链接阶段找不到符号或库, 只有这类错误才可能是最小链接集合不够
+LINK_ERROR_PATTERN = re.compile(r"undefined (?:symbol|reference)|cannot find -l|unable to find library|"
+                                r"ld(?:\.lld)?: error|lld-link: error|linker command failed|collect2: error")
+
+
+def _load_cache():
+    try:
+        with open(CJO_DEPS_CACHE_FILE, "r", encoding="UTF-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache):
+    # 多个进程同时写时各自写临时文件再重命名, 不会读到写了一半的文件
+    temp = f"{CJO_DEPS_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "w", encoding="UTF-8") as f:
+            json.dump(cache, f)
+        os.replace(temp, CJO_DEPS_CACHE_FILE)
+    except OSError:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def is_link_error(output):
+    """:param output: 编译输出的行"""
+    return any(LINK_ERROR_PATTERN.search(line) for line in output)
+
+
+class LinkIndex:
+    """-L 目录下的库: 包名 -> 库, 包 -> 依赖的包, 每个用例按 import 从中选出需要的 -l 和 -L"""
+
+    def __init__(self, lib_dirs, dll=None):
+        self.packages = {}  # {包名: .cjo 路径}, 包名即库名
+        self.dir_libs = {}  # {-L 目录: 其中(递归)的库名}
+        for root in lib_dirs:
+            libs = self.dir_libs.setdefault(normalize(root), set())
+            for path, _, names in walk_cached(root):
+                cjo_names = {name[:-4] for name in names if name.endswith(".cjo")}
+                for name in names:
+                    lib = link_name(name, dll)
+                    if lib is None:
+                        continue
+                    libs.add(lib)
+                    if lib in cjo_names and lib not in self.packages:
+                        self.packages[lib] = os.path.join(path, f"{lib}.cjo")
+        # 包集合变化时 .cjo 中的名字解析结果可能不同, 作为依赖缓存的一部分
+        self._packages_key = hashlib.sha1("\n".join(sorted(self.packages)).encode("utf-8")).hexdigest()
+        self._deps = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, name):
+        """a.b.C -> 已知包中最长的前缀 a.b, 不是已知包(std 等)时返回 None"""
+        parts = name.split(".")
+        for end in range(len(parts), 0, -1):
+            package = ".".join(parts[:end])
+            if package in self.packages:
+                return package
+        return None
+
+    def _scan_cjo(self, package):
+        path = self.packages[package]
+        stat = os.stat(path)
+        stamp = [stat.st_mtime_ns, stat.st_size, self._packages_key]
+        cache = _load_cache()
+        entry = cache.get(path)
+        if entry and entry["stamp"] == stamp:
+            return entry["deps"]
+        with open(path, "rb") as f:
+            names = set(QUALIFIED_NAME_PATTERN.findall(f.read()))
+        deps = sorted({dep for dep in (self.resolve(name.decode("ascii")) for name in names) if dep} - {package})
+        cache[path] = {"stamp": stamp, "deps": deps}
+        _save_cache(cache)
+        return deps
+
+    def package_deps(self, package):
+        with self._lock:
+            deps = self._deps.get(package)
+            if deps is None:
+                try:
+                    deps = self._scan_cjo(package)
+                except OSError:
+                    deps = []
+                self._deps[package] = deps
+            return deps
+
+    def closure(self, names):
+        """:return: names 用到的包以及它们直接或间接依赖的包"""
+        needed = set()
+        pending = [package for package in map(self.resolve, names) if package]
+        while pending:
+            package = pending.pop()
+            if package in needed:
+                continue
+            needed.add(package)
+            pending.extend(self.package_deps(package))
+        return needed
+
+    def select(self, library, library_path, source_files):
+        """
+        :param library: 全部库的 -l 参数(cfgs.LIBRARY)
+        :param library_path: 全部 -L 参数(cfgs.LIBRARY_PATH)
+        :param source_files: 用例文件和 dependence 文件
+        :return: (-l 参数, -L 参数, 选中的库个数, 全部库个数)
+        """
+        names = []
+        for source in source_files:
+            names.extend(file_imports(source))
+        needed = self.closure(names)
+        libs = LINK_FLAG_PATTERN.findall(library)
+        kept = [lib for lib in libs if lib not in self.packages or lib in needed]
+        kept_set = set(kept)
+        paths = []
+        for path in LIBRARY_PATH_PATTERN.findall(library_path):
+            libs_in_dir = self.dir_libs.get(normalize(path))
+            # 只包含没有用到的包的目录不再加入 -L
+            if not libs_in_dir or libs_in_dir & kept_set or any(lib not in self.packages for lib in libs_in_dir):
+                paths.append(path)
+        return "".join(f"-l {lib} " for lib in kept), "".join(f" -L {path}" for path in paths), len(kept), len(libs)
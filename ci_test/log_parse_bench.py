@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+# encoding= utf-8
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""
+cjtest 日志解析(parse_case_log)性能检查: 生成指定大小的合成日志, 统计解析耗时和 tracemalloc 内存峰值
+内存峰值超过 --max-peak-mb 时返回 1
+用法: python3 ci_test/log_parse_bench.py [--size-mb 100] [--fail-ratio 0.3] [--trace-lines 5] [--max-peak-mb 256]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+LOG_PREFIX = "[01-01 00:00:00] INFO - "
+
+
+def write_synthetic_log(path, size_mb, cases_per_suite=50, fail_ratio=0.3, trace_lines=5, noise_lines=0):
+    """
+    写入 cjtest 格式的合成日志(至少一个 TCS), 每个 TCS 有 cases_per_suite 个用例, 其中 fail_ratio 比例失败并带 trace_lines 行 trace
+    :param noise_lines: 每个用例前额外的普通输出行数(用例自己的打印)
+    :return: (TCS 个数, 失败用例个数)
+    """
+    limit = size_mb * 1024 * 1024
+    fail_every = max(1, round(1 / fail_ratio)) if fail_ratio > 0 else 0
+    suites = failures = written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while suites == 0 or written < limit:
+            lines = [f"{LOG_PREFIX}TCS: Suite{suites}, time elapsed: 123456 ns, RESULT:\n"]
+            for case in range(cases_per_suite):
+                lines.extend(f"{LOG_PREFIX}output line {n} of case{case}\n" for n in range(noise_lines))
+                if fail_every and case % fail_every == 0:
+                    failures += 1
+                    lines.append(f"{LOG_PREFIX}[ FAILED ] CASE: case{case} (2345 ns)\n")
+                    lines.extend(f"{LOG_PREFIX}    Expect Failed: `(a == b)` at line {n}\n" for n in range(trace_lines))
+                else:
+                    lines.append(f"{LOG_PREFIX}[ PASSED ] CASE: case{case} (1234 ns)\n")
+            lines.append(f"{LOG_PREFIX}Summary: TOTAL: {cases_per_suite}\n")
+            chunk = "".join(lines)
+            f.write(chunk)
+            written += len(chunk)
+            suites += 1
+    return suites, failures
+
+
+def measure(path, pkg="bench"):
+    """:return: (耗时秒, 内存峰值字节, cases)"""
+    from ci import parse_case_log
+    cases, tcs_time = {}, {}
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        parse_case_log(path, pkg, cases, tcs_time)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="cjtest 日志解析性能检查")
+    parser.add_argument("--size-mb", type=int, default=100, help="合成日志大小(MB)")
+    parser.add_argument("--fail-ratio", type=float, default=0.3, help="失败用例比例")
+    parser.add_argument("--trace-lines", type=int, default=5, help="每个失败用例的 trace 行数")
+    parser.add_argument("--max-peak-mb", type=float, default=256, help="解析时内存峰值上限(MB)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log = os.path.join(temp_dir, "bench.cj.log")
+        suites, failures = write_synthetic_log(log, args.size_mb, fail_ratio=args.fail_ratio,
+                                               trace_lines=args.trace_lines)
+        size = os.path.getsize(log) / 1024 / 1024
+        elapsed, peak, cases = measure(log)
+    parsed = sum(len(items) for items in cases.values())
+    print(f"日志 {size:.1f} MB, TCS {suites}, 用例 {parsed}, 失败 {failures}")
+    print(f"解析耗时 {elapsed:.2f} s ({size / max(elapsed, 1e-9):.1f} MB/s), 内存峰值 {peak / 1024 / 1024:.1f} MB, "
+          f"上限 {args.max_peak_mb:.0f} MB")
+    if len(cases) != suites:
+        print(f"解析结果不完整: TCS {len(cases)} != {suites}")
+        return 1
+    if peak / 1024 / 1024 > args.max_peak_mb:
+        print(f"内存峰值超过上限: {peak / 1024 / 1024:.1f} MB > {args.max_peak_mb:.0f} MB")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+# encoding= utf-8
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""
+ciTest.py 启动耗时检查: 多次在新进程中用 -X importtime 执行 ciTest.py --help
+取耗时中位数, 超过预算时返回 1, 并打印自身导入耗时最多的模块
+用法: python3 ci_test/startup_bench.py [--budget-ms 150] [--runs 5] [--top 10]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+STARTUP_BUDGET_MS = 150
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_import_time(stderr):
+    """:return: [(模块, 自身耗时us, 累计耗时us, 层级)]"""
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2)), (len(match.group(3)) - 1) // 2))
+    return modules
+
+
+def measure(script, args):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", script] + args, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE)
+    elapsed = (time.perf_counter() - start) * 1000
+    modules = parse_import_time(result.stderr.decode("utf-8", "replace"))
+    return elapsed, modules, result.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ciTest.py --help 启动耗时检查")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="启动耗时预算(毫秒)")
+    parser.add_argument("--runs", type=int, default=5, help="执行次数, 取中位数")
+    parser.add_argument("--top", type=int, default=10, help="打印自身导入耗时最多的模块个数")
+    args = parser.parse_args()
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ciTest.py")
+    samples = sorted((measure(script, ["--help"]) for _ in range(max(1, args.runs))), key=lambda s: s[0])
+    elapsed, modules, code = samples[len(samples) // 2]
+    if code != 0:
+        print(f"ciTest.py --help 执行失败, 返回值 {code}")
+        return 1
+    imports = sum(cumulative for _, _, cumulative, level in modules if level == 0) / 1000
+    print(f"ciTest.py --help: {elapsed:.1f} ms (中位数, {len(samples)} 次), 导入 {imports:.1f} ms, 预算 {args.budget_ms:.0f} ms")
+    for name, self_us, cumulative, _ in sorted(modules, key=lambda m: m[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.2f} ms  {cumulative / 1000:8.2f} ms  {name}")
+    if elapsed > args.budget_ms:
+        print(f"启动耗时超过预算: {elapsed:.1f} ms > {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
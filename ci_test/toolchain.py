@@ -0,0 +1,102 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""cjc -v 探测结果的缓存, 同一个 cjc 只执行一次 cjc -v"""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+PROBE_CACHE_FILE = os.path.join(tempfile.gettempdir(), "cangjie_ci_test_toolchain.json")
+_PROBES = {}  # 进程内缓存 {cache key: probe}
+
+# cjc 的 Target 与 stdx 包解压目录的对应关系, 按顺序匹配
+STDX_PLATFORM_DIRS = [
+    (lambda t: t == "aarch64-linux-ohos", "linux_ohos_aarch64_llvm"),
+    (lambda t: t == "x86_64-linux-ohos", "linux_ohos_x86_64_llvm"),
+    (lambda t: t == "x86_64-unknown-linux-gnu", "linux_x86_64_llvm"),
+    (lambda t: "windows" in t, "windows_x86_64_llvm"),
+    (lambda t: "mingw32" in t, "windows_x86_64_llvm"),
+    (lambda t: "aarch64" in t, "linux_aarch64_llvm"),
+]
+
+
+def version_number(version):
+    """0.53.18 -> 0.53, 1.0.3 -> 1.0, 与脚本中比较版本的方式一致"""
+    parts = version.split(".")
+    number = float(parts[0])
+    if float(parts[1]) != 0:
+        number += float(f"0.{parts[1]}")
+    return number
+
+
+def stdx_platform_dir(target):
+    for match, name in STDX_PLATFORM_DIRS:
+        if match(target):
+            return name
+    return "stdx"
+
+
+def parse_version_output(output):
+    """:return: dict(version, target), 输出不是 cjc -v 的格式时返回 None"""
+    if "Cangjie Compiler: " not in output:
+        return None
+    version = output.split("Cangjie Compiler: ")[1].split(" (")[0].strip()
+    target = output.split("Target: ")[1].splitlines()[0].strip() if "Target: " in output else ""
+    return {"version": version, "target": target}
+
+
+def _load_cache(cache_file):
+    try:
+        with open(cache_file, "r", encoding="UTF-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_file, cache):
+    # 多个进程同时写时各自写临时文件再重命名, 不会读到写了一半的文件
+    temp = f"{cache_file}.{os.getpid()}.tmp"
+    cache = {key: info for key, info in cache.items() if os.path.exists(info.get("path", ""))}
+    try:
+        with open(temp, "w", encoding="UTF-8") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(temp, cache_file)
+    except OSError:
+        pass
+
+
+def probe(cjc=None, cache_file=PROBE_CACHE_FILE):
+    """
+    cjc 的版本和目标平台, 以 cjc 真实路径, 修改时间和大小为键缓存在 cache_file 中
+    :param cjc: cjc 路径, 默认 PATH 中的 cjc
+    :return: dict(path, version, target, version_number, build_bin, stdx_platform, output), 没有 cjc 或执行失败时返回 None
+    """
+    cjc = cjc or shutil.which("cjc")
+    if not cjc or not os.path.exists(cjc):
+        return None
+    real = os.path.realpath(cjc)
+    stat = os.stat(real)
+    key = f"{real}|{stat.st_mtime_ns}|{stat.st_size}"
+    if key in _PROBES:
+        return _PROBES[key]
+    cache = _load_cache(cache_file) if cache_file else {}
+    info = cache.get(key)
+    if info is None:
+        try:
+            result = subprocess.run([cjc, "-v"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=60)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        output = result.stdout.decode("utf-8", "replace")
+        info = parse_version_output(output)
+        if info is None:
+            return None
+        number = version_number(info["version"])
+        info.update({"path": real, "version_number": number, "build_bin": "build" if number < 0.49 else "target",
+                     "stdx_platform": stdx_platform_dir(info["target"]), "output": output})
+        if cache_file:
+            cache[key] = info
+            _save_cache(cache_file, cache)
+    _PROBES[key] = info
+    return info
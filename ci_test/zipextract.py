@@ -0,0 +1,122 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+"""
+增量解压 zip(stdx 压缩包等): 磁盘上大小和 CRC 一致的文件跳过, 其余文件多线程解压, 保留可执行权限
+解压完成后写入完成标记, 标记缺失(上次解压被中断)时逐个文件校验 CRC 并补齐
+"""
+
+import json
+import os
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 1024 * 1024
+EXTRACT_WORKERS = 8
+
+
+def marker_path(zip_path, extract_dir):
+    return os.path.join(extract_dir, f".{os.path.basename(zip_path)}.extracted")
+
+
+def _zip_fingerprint(zip_path):
+    stat = os.stat(zip_path)
+    return {"zip": os.path.abspath(zip_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_marker(marker):
+    try:
+        with open(marker, "r", encoding="UTF-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def file_crc(path):
+    crc = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def member_path(extract_dir, info):
+    """zip 中的路径转换为 extract_dir 下的路径, 指向 extract_dir 之外的条目返回 None"""
+    root = os.path.abspath(extract_dir)
+    path = os.path.abspath(os.path.join(root, *[p for p in info.filename.split("/") if p not in ("", ".")]))
+    return path if path.startswith(root + os.sep) else None
+
+
+def up_to_date(info, path, check_crc=True):
+    if not os.path.isfile(path) or os.path.getsize(path) != info.file_size:
+        return False
+    return not check_crc or file_crc(path) == info.CRC
+
+
+def _unix_mode(info):
+    """zip 中记录的 unix 权限, 不是在 unix 上打包时返回 None"""
+    mode = (info.external_attr >> 16) & 0o777
+    return mode if info.create_system == 3 and mode else None
+
+
+def restore_mode(info, path):
+    """跳过的文件内容一致但权限可能被改过(如丢失可执行权限), 与 zip 中记录的不同时恢复"""
+    mode = _unix_mode(info)
+    if mode is not None and os.stat(path).st_mode & 0o777 != mode:
+        os.chmod(path, mode)
+
+
+def extract_zip(zip_path, extract_dir, workers=EXTRACT_WORKERS):
+    """
+    :return: (解压的文件数, 跳过的文件数)
+    """
+    os.makedirs(extract_dir, exist_ok=True)
+    marker = marker_path(zip_path, extract_dir)
+    fingerprint = _zip_fingerprint(zip_path)
+    # 同一个 zip 已经完整解压过时只比较文件大小, 否则逐个校验 CRC
+    check_crc = _read_marker(marker) != fingerprint
+    if check_crc and os.path.exists(marker):
+        os.remove(marker)
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        members = []
+        for info in zip_ref.infolist():
+            path = member_path(extract_dir, info)
+            if path is None:
+                continue
+            if info.is_dir():
+                os.makedirs(path, exist_ok=True)
+            else:
+                members.append((info, path))
+    local = threading.local()
+    handles = []
+
+    def extract(member):
+        info, path = member
+        if up_to_date(info, path, check_crc):
+            restore_mode(info, path)
+            return False
+        if not hasattr(local, "zip_ref"):
+            local.zip_ref = zipfile.ZipFile(zip_path, "r")  # ZipFile 对象不在线程间共享
+            handles.append(local.zip_ref)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{threading.get_ident()}.tmp"
+        with local.zip_ref.open(info) as source, open(temp, "wb") as target:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                target.write(chunk)
+        mode = _unix_mode(info)
+        if mode is not None:
+            os.chmod(temp, mode)
+        os.replace(temp, path)
+        return True
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(members)))) as pool:
+            results = list(pool.map(extract, members))
+    finally:
+        for handle in handles:
+            handle.close()
+    with open(marker, "w", encoding="UTF-8") as f:
+        json.dump(fingerprint, f)
+    extracted = sum(results)
+    return extracted, len(results) - extracted
@@ -0,0 +1,69 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+import logging
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "ci_test"))
+
+import ci  # noqa: E402
+from benchstat import compare, min_p_value  # noqa: E402
+
+BASE = [100.0, 101.0, 99.0, 102.0, 98.0]
+SLOWER = [200.0, 202.0, 198.0, 204.0, 196.0]
+
+
+def bench_defaults(*argv):
+    """执行 bench 子命令(HLTtest 不执行), :return: HLTtest 收到的 --repeat/--threshold/--alpha"""
+    args = ci.create_parser().parse_args(["bench"] + list(argv))
+    args.CANGJIE_CI_TEST_CFGS = types.SimpleNamespace(LOG=logging.getLogger("ci_test"), HOME_DIR=os.getcwd())
+    with mock.patch.object(ci, "HLTtest") as hlt_test, \
+            mock.patch.object(ci, "get_cjtest_path", return_value="/cangjie/third_party"):
+        args.func(args)
+    hlt_args = hlt_test.call_args[0][0]
+    return hlt_args.repeat, hlt_args.threshold, hlt_args.alpha
+
+
+class CompareTest(unittest.TestCase):
+    def test_min_p_value(self):
+        self.assertEqual(min_p_value(1, 1), 0.5)
+        self.assertAlmostEqual(min_p_value(1, 5), 1 / 6)
+        self.assertAlmostEqual(min_p_value(3, 3), 0.05)
+        self.assertAlmostEqual(min_p_value(5, 5), 1 / 252)
+
+    def test_slowdown_caught_at_default_settings(self):
+        repeat, threshold, alpha = bench_defaults("--baseline", "base/bench_samples.csv")
+        self.assertGreaterEqual(repeat, 5)
+        rows = compare({"a.cj.T.b": BASE[:repeat]}, {"a.cj.T.b": SLOWER[:repeat]}, threshold, alpha)
+        self.assertEqual(rows[0]["verdict"], "regression")
+        rows = compare({"a.cj.T.b": SLOWER[:repeat]}, {"a.cj.T.b": BASE[:repeat]}, threshold, alpha)
+        self.assertEqual(rows[0]["verdict"], "improvement")
+
+    def test_single_sample_baseline_is_insufficient(self):
+        # perf.csv 每个用例只有一个 ns/op, 本次再多样本也判定不了回退, 不能报告为 same
+        _, threshold, alpha = bench_defaults("--baseline", "test/report/perf.csv")
+        for current in ([200.0], SLOWER):
+            with self.subTest(current_n=len(current)):
+                row = compare({"a.cj.T.b": [100.0]}, {"a.cj.T.b": current}, threshold, alpha)[0]
+                self.assertEqual(row["verdict"], "insufficient")
+                self.assertAlmostEqual(row["change"], 1.0, delta=0.05)
+
+    def test_three_against_three_is_insufficient(self):
+        row = compare({"a.cj.T.b": BASE[:3]}, {"a.cj.T.b": SLOWER[:3]})[0]
+        self.assertEqual(row["verdict"], "insufficient")
+
+    def test_same_new_missing(self):
+        rows = compare({"same": BASE, "gone": BASE}, {"same": list(reversed(BASE)), "added": BASE})
+        self.assertEqual({row["benchmark"]: row["verdict"] for row in rows},
+                         {"same": "same", "gone": "missing", "added": "new"})
+
+    def test_repeat_without_baseline(self):
+        self.assertEqual(bench_defaults()[0], 1)
+        self.assertEqual(bench_defaults("--repeat", "3", "--baseline", "history")[0], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "ci_test"))
+
+import ci  # noqa: E402
+from configcache import load_toml  # noqa: E402
+
+
+class BuildCacheKeyTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.home = os.path.join(self.temp_dir.name, "proj")
+        self.dep = os.path.join(self.temp_dir.name, "dep")
+        for root in (self.home, self.dep):
+            os.makedirs(os.path.join(root, "src"))
+        self.write(os.path.join(self.home, "cjpm.toml"),
+                   '[package]\nname = "proj"\n\n[dependencies]\ndep = { path = "../dep" }\n')
+        self.write(os.path.join(self.dep, "src", "dep.cj"), "package dep\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def key(self):
+        cfgs = types.SimpleNamespace(HOME_DIR=self.home, CONFIG_FILE="cjpm.toml", CANGJIE_TARGET="x86_64-linux-gnu",
+                                     CANGJIE_STDX_DIR=None, BASE_CJC_VERSION="1.0.0",
+                                     BUILD_PARMS=load_toml(os.path.join(self.home, "cjpm.toml")))
+        return ci.build_cache_key(types.SimpleNamespace(target=None), cfgs)
+
+    def test_path_dependency_changes_key(self):
+        before = self.key()
+        self.write(os.path.join(self.dep, "src", "dep.cj"), "package dep\nfunc f() {}\n")
+        self.assertNotEqual(self.key(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
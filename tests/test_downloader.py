@@ -0,0 +1,138 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+import hashlib
+import http.server
+import os
+import re
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "ci_test"))
+
+import downloader  # noqa: E402
+from downloader import DownloadError, cache_path, download_file  # noqa: E402
+
+PAYLOAD = bytes(range(256)) * 256  # 64 KB
+RANGE_PATTERN = re.compile(r"bytes=(\d+)-(\d*)")
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """按 server.payload 响应, server.ranges 为 False 时忽略 Range, 每个请求记录在 server.requests 中"""
+
+    def log_message(self, *args):
+        pass
+
+    def _headers(self, status, length, extra=()):
+        self.send_response(status)
+        self.send_header("Content-Length", str(length))
+        if self.server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        for name, value in extra:
+            self.send_header(name, value)
+        self.end_headers()
+
+    def do_HEAD(self):
+        self.server.requests.append(("HEAD", None))
+        self._headers(200, len(self.server.payload))
+
+    def do_GET(self):
+        payload = self.server.payload
+        requested = self.headers.get("Range")
+        self.server.requests.append(("GET", requested))
+        match = RANGE_PATTERN.fullmatch(requested or "")
+        if not self.server.ranges or not match:
+            self._headers(200, len(payload))
+            self.wfile.write(payload)
+            return
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else len(payload) - 1
+        if start >= len(payload):
+            self._headers(416, 0)
+            return
+        self._headers(206, end - start + 1, [("Content-Range", f"bytes {start}-{end}/{len(payload)}")])
+        self.wfile.write(payload[start:end + 1])
+
+
+class DownloadFileTest(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        self.server.payload = PAYLOAD
+        self.server.ranges = True
+        self.server.requests = []
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/stdx.zip"
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.temp_dir.name, "stdx.zip")
+        self.sha256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def gets(self):
+        return [header for method, header in self.server.requests if method == "GET"]
+
+    def test_download(self):
+        self.assertEqual(download_file(self.url, self.dest, sha256=self.sha256), self.dest)
+        self.assertEqual(self.read(self.dest), PAYLOAD)
+        self.assertEqual(self.read(f"{self.dest}.sha256").decode(), self.sha256)
+        self.assertFalse(os.path.exists(f"{self.dest}.part"))
+
+    def test_range_resume(self):
+        with open(f"{self.dest}.part", "wb") as f:
+            f.write(PAYLOAD[:1000])
+        download_file(self.url, self.dest, sha256=self.sha256)
+        self.assertEqual(self.gets(), ["bytes=1000-"])
+        self.assertEqual(self.read(self.dest), PAYLOAD)
+
+    def test_resume_without_range_support(self):
+        self.server.ranges = False
+        with open(f"{self.dest}.part", "wb") as f:
+            f.write(b"x" * 1000)
+        download_file(self.url, self.dest, sha256=self.sha256)
+        self.assertEqual(self.read(self.dest), PAYLOAD)
+
+    def test_segmented_download(self):
+        with mock.patch.object(downloader, "MIN_SEGMENT_SIZE", 4096):
+            download_file(self.url, self.dest, sha256=self.sha256, segments=4)
+        step = len(PAYLOAD) // 4
+        self.assertEqual(sorted(self.gets()), sorted(f"bytes={start}-{start + step - 1}"
+                                                     for start in range(0, len(PAYLOAD), step)))
+        self.assertEqual(self.read(self.dest), PAYLOAD)
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ["stdx.zip", "stdx.zip.lock", "stdx.zip.sha256"])
+
+    def test_sha256_mismatch(self):
+        with self.assertRaises(DownloadError):
+            download_file(self.url, self.dest, sha256="0" * 64)
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertFalse(os.path.exists(f"{self.dest}.part"))
+
+    def test_cache_hit(self):
+        cache_dir = os.path.join(self.temp_dir.name, "cache")
+        path = download_file(self.url, None, cache_dir=cache_dir)
+        self.assertEqual(path, cache_path(cache_dir, self.url))
+        requests = len(self.server.requests)
+        self.assertEqual(download_file(self.url, None, cache_dir=cache_dir, sha256=self.sha256), path)
+        self.assertEqual(download_file(self.url, None, cache_dir=cache_dir), path)
+        self.assertEqual(len(self.server.requests), requests)
+
+    def test_corrupted_cache_is_downloaded_again(self):
+        cache_dir = os.path.join(self.temp_dir.name, "cache")
+        path = download_file(self.url, None, cache_dir=cache_dir)
+        with open(path, "wb") as f:
+            f.write(b"broken")
+        self.assertEqual(download_file(self.url, None, cache_dir=cache_dir), path)
+        self.assertEqual(self.read(path), PAYLOAD)
+
+
+if __name__ == '__main__':
+    unittest.main()
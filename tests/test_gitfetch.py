@@ -0,0 +1,116 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "ci_test"))
+
+from gitfetch import fetch_branch, fetch_branches, has_branch, mirror_path  # noqa: E402
+
+
+def git(*args, cwd=None):
+    return subprocess.run(["git", "-c", "user.name=ci", "-c", "user.email=ci@example.com"] + list(args), cwd=cwd,
+                          check=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT).stdout.decode("utf-8")
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class GitFetchTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.work = os.path.join(root, "work")
+        self.remote = os.path.join(root, "remote.git")
+        self.url = f"file://{self.remote}"
+        self.mirror_root = os.path.join(root, "mirrors")
+        git("init", "-q", "--bare", self.remote)
+        git("init", "-q", self.work)
+        for branch in ("lib_a", "lib_b"):
+            git("checkout", "-q", "--orphan", branch, cwd=self.work)
+            write(os.path.join(self.work, "src", "main.cj"), f"// {branch}\n")
+            write(os.path.join(self.work, "test", "case.cj"), f"// {branch} v1\n")
+            git("add", "-A", cwd=self.work)
+            git("commit", "-q", "-m", branch, cwd=self.work)
+            git("push", "-q", self.remote, branch, cwd=self.work)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def dest(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def push_change(self, branch, text):
+        git("checkout", "-q", branch, cwd=self.work)
+        write(os.path.join(self.work, "test", "case.cj"), text)
+        git("commit", "-q", "-am", text, cwd=self.work)
+        git("push", "-q", self.remote, branch, cwd=self.work)
+
+    def test_mirror_fetch(self):
+        dest = self.dest("lib_a")
+        code, out = fetch_branch(self.url, "lib_a", dest, mirror_root=self.mirror_root)
+        self.assertEqual(code, 0, out)
+        self.assertEqual(read(os.path.join(dest, "src", "main.cj")), "// lib_a\n")
+        mirror = mirror_path(self.mirror_root, self.url)
+        self.assertTrue(has_branch(mirror, "lib_a"))
+        self.assertFalse(has_branch(mirror, "lib_b"))
+
+    def test_incremental_fetch(self):
+        dest = self.dest("lib_a")
+        self.assertEqual(fetch_branch(self.url, "lib_a", dest, mirror_root=self.mirror_root)[0], 0)
+        self.push_change("lib_a", "// lib_a v2\n")
+        code, out = fetch_branch(self.url, "lib_a", dest, mirror_root=self.mirror_root)
+        self.assertEqual(code, 0, out)
+        self.assertEqual(read(os.path.join(dest, "test", "case.cj")), "// lib_a v2\n")
+        self.assertEqual(git("rev-parse", "HEAD", cwd=dest), git("rev-parse", "lib_a", cwd=self.work))
+
+    def test_incremental_fetch_without_mirror(self):
+        dest = self.dest("lib_a")
+        self.assertEqual(fetch_branch(self.url, "lib_a", dest)[0], 0)
+        self.push_change("lib_a", "// lib_a v2\n")
+        code, out = fetch_branch(self.url, "lib_a", dest)
+        self.assertEqual(code, 0, out)
+        self.assertEqual(read(os.path.join(dest, "test", "case.cj")), "// lib_a v2\n")
+
+    def test_offline_keeps_mirror_branch(self):
+        dest = self.dest("lib_a")
+        self.assertEqual(fetch_branch(self.url, "lib_a", dest, mirror_root=self.mirror_root)[0], 0)
+        shutil.rmtree(dest)
+        shutil.rmtree(self.remote)
+        code, out = fetch_branch(self.url, "lib_a", dest, mirror_root=self.mirror_root)
+        self.assertEqual(code, 0, out)
+        self.assertEqual(read(os.path.join(dest, "test", "case.cj")), "// lib_a v1\n")
+
+    def test_sparse_checkout(self):
+        dest = self.dest("sparse")
+        code, out = fetch_branch(self.url, "lib_b", dest, mirror_root=self.mirror_root, sparse_paths=["test"])
+        self.assertEqual(code, 0, out)
+        self.assertTrue(os.path.isfile(os.path.join(dest, "test", "case.cj")))
+        self.assertFalse(os.path.exists(os.path.join(dest, "src")))
+
+    def test_fetch_branches(self):
+        jobs = [(self.url, "lib_a", self.dest("a")), (self.url, "lib_b", self.dest("b")),
+                (self.url, "lib_a", self.dest("a2")), (self.url, "lib_missing", self.dest("missing"))]
+        results = fetch_branches(jobs, mirror_root=self.mirror_root)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[(self.url, "lib_a")][:2], (self.dest("a"), 0))
+        self.assertEqual(results[(self.url, "lib_b")][:2], (self.dest("b"), 0))
+        self.assertNotEqual(results[(self.url, "lib_missing")][1], 0)
+        self.assertEqual(read(os.path.join(self.dest("b"), "src", "main.cj")), "// lib_b\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "ci_test"))
+
+from history import HistoryDB  # noqa: E402
+
+
+class FlakyTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = HistoryDB(os.path.join(self.temp_dir.name, "history.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def record(self, statuses):
+        for case, status in statuses.items():
+            self.db.record_run("hlt", "proj", time.time(), None, None, [{"case": case, "status": status}], [])
+
+    def test_skip_is_not_a_failure(self):
+        for status in ("PASS", "SKIP", "PASS", "SKIP"):
+            self.record({"skipped.cj": status})
+        self.assertEqual(self.db.flaky(), [])
+
+    def test_fail_and_error_count(self):
+        for status in ("PASS", "FAIL", "SKIP", "ERROR", "PASS"):
+            self.record({"flaky.cj": status})
+        self.assertEqual(self.db.flaky(), [("flaky.cj", 4, 2, 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
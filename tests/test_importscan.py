@@ -0,0 +1,50 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "ci_test"))
+
+from importscan import file_imports_stdx, parse_imports  # noqa: E402
+
+
+class ParseImportsTest(unittest.TestCase):
+    def test_single(self):
+        self.assertEqual(parse_imports("import a.b.*\nimport a.b.C as D\npublic import e.f\n"), ["a.b", "a.b.C", "e.f"])
+
+    def test_braces(self):
+        self.assertEqual(parse_imports("import {a.b.*, c.d}"), ["a.b", "c.d"])
+
+    def test_prefix_group(self):
+        self.assertEqual(parse_imports("import std.collection.{ArrayList, HashMap}"),
+                         ["std.collection.ArrayList", "std.collection.HashMap"])
+        self.assertEqual(parse_imports("import stdx.{encoding.json.*, net.http.*}"),
+                         ["stdx.encoding.json", "stdx.net.http"])
+
+    def test_prefix_group_alias_and_lines(self):
+        text = "internal import pkg.sub.{\n    Foo as Bar,\n    inner.*, // 注释\n}\nimport x.y\n"
+        self.assertEqual(parse_imports(text), ["pkg.sub.Foo", "pkg.sub.inner", "x.y"])
+
+    def test_comma_separated(self):
+        self.assertEqual(parse_imports("import a.b, c.{d, e}"), ["a.b", "c.d", "c.e"])
+
+    def test_comments_and_code(self):
+        text = "// import skipped.a\n/* import skipped.b */\npackage p\nimport kept.a\nmain() { let s = \"import no\" }\n"
+        self.assertEqual(parse_imports(text), ["kept.a"])
+
+
+class FileImportsStdxTest(unittest.TestCase):
+    def test_prefix_group(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "a.cj")
+            for text, expected in (("import stdx.{encoding.json.*}\n", True), ("import {std.io.*,\n stdx.log.*}\n", True),
+                                   ("import std.{io.*}\n", False)):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                self.assertEqual(file_imports_stdx(path), expected, text)
+
+
+if __name__ == '__main__':
+    unittest.main()
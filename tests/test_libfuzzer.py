@@ -0,0 +1,38 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "ci_test"))
+
+from libfuzzer import parse_fuzz_lines  # noqa: E402
+
+STATUS = "#{runs}\tpulse  cov: 12 ft: 30 corp: 5/100b exec/s: 600 rss: 40Mb"
+
+
+def status_lines(*times):
+    return [f"[{log_time}] INFO - {STATUS.format(runs=2 ** n)}" for n, log_time in enumerate(times)]
+
+
+class ParseFuzzLinesTest(unittest.TestCase):
+    def test_elapsed(self):
+        series = parse_fuzz_lines(status_lines("06-01 10:00:00", "06-01 10:00:30"), year=2026)
+        self.assertEqual([point["elapsed"] for point in series], [0, 30])
+
+    def test_across_new_year(self):
+        series = parse_fuzz_lines(status_lines("12-31 23:59:50", "01-01 00:00:10"), year=2026)
+        self.assertEqual([point["elapsed"] for point in series], [0, 20])
+
+    def test_leap_day(self):
+        series = parse_fuzz_lines(status_lines("02-28 23:59:00", "02-29 00:01:00", "03-01 00:00:00"), year=2028)
+        self.assertEqual([point["elapsed"] for point in series], [0, 120, 86460])
+
+    def test_without_log_prefix(self):
+        series = parse_fuzz_lines([STATUS.format(runs=1)])
+        self.assertEqual(len(series), 1)
+        self.assertIsNone(series[0]["elapsed"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "ci_test"))
+
+from linkset import is_link_error  # noqa: E402
+
+
+class LinkErrorTest(unittest.TestCase):
+    def test_link_errors(self):
+        for line in ("ld.lld: error: undefined symbol: other_init",
+                     "/usr/bin/ld: main.o: undefined reference to `foo'",
+                     "ld: cannot find -lother",
+                     "ld.lld: error: unable to find library -lother",
+                     "lld-link: error: undefined symbol: foo",
+                     "error: linker command failed with exit code 1"):
+            with self.subTest(line=line):
+                self.assertTrue(is_link_error(["compiling...", line]))
+
+    def test_compile_errors(self):
+        self.assertFalse(is_link_error(["error: undeclared identifier 'foo'", "==> here",
+                                        "1 error generated, 1 error printed."]))
+        self.assertFalse(is_link_error([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
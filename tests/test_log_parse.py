@@ -0,0 +1,45 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "ci_test"))
+
+from log_parse_bench import measure, write_synthetic_log  # noqa: E402
+
+
+class ParseCaseLogTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def log_path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_cases_and_failures(self):
+        log = self.log_path("small.cj.log")
+        suites, failures = write_synthetic_log(log, 1, cases_per_suite=10, fail_ratio=0.5, trace_lines=3)
+        _, _, cases = measure(log, "small")
+        self.assertEqual(len(cases), suites)
+        self.assertEqual(sum(len(items) for items in cases.values()), suites * 10)
+        failed = [case for items in cases.values() for case in items if "FAILED" in case[1]]
+        self.assertEqual(len(failed), failures)
+        self.assertTrue(all(case[3].count("\n") == 3 for case in failed))
+
+    def test_memory_does_not_grow_with_raw_output(self):
+        # 用例自己的大量输出(不属于失败 trace)只流过解析器, 内存峰值与日志大小无关
+        quiet = self.log_path("quiet.cj.log")
+        noisy = self.log_path("noisy.cj.log")
+        write_synthetic_log(quiet, 0, cases_per_suite=20, fail_ratio=0)
+        write_synthetic_log(noisy, 0, cases_per_suite=20, fail_ratio=0, noise_lines=20000)
+        self.assertGreater(os.path.getsize(noisy), 10 * 1024 * 1024)
+        _, quiet_peak, quiet_cases = measure(quiet)
+        _, noisy_peak, noisy_cases = measure(noisy)
+        self.assertEqual(quiet_cases, noisy_cases)
+        self.assertLess(noisy_peak, quiet_peak + 1024 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+import logging
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "ci_test"))
+
+import ci  # noqa: E402
+
+
+def run_subcommand(argv, hlt_test):
+    """解析 argv 并执行子命令, HLTtest 换成 hlt_test, :return: hlt_test 收到的 args"""
+    args = ci.create_parser().parse_args(argv)
+    args.CANGJIE_CI_TEST_CFGS = types.SimpleNamespace(LOG=logging.getLogger("ci_test"), HOME_DIR=os.getcwd())
+    received = []
+
+    def fake_hlt_test(hlt_args, cfgs):
+        received.append(hlt_args)
+        hlt_test(hlt_args, cfgs)
+
+    with mock.patch.object(ci, "HLTtest", fake_hlt_test), \
+            mock.patch.object(ci, "get_cjtest_path", return_value="/cangjie/third_party"):
+        args.func(args)
+    return received[0]
+
+
+class HltArgumentsTest(unittest.TestCase):
+    def test_main_reads_baseline(self):
+        def hlt_test(args, cfgs):
+            self.assertIsNone(ci.load_bench_baseline(args, cfgs) if args.main else None)
+
+        args = run_subcommand(["hlt", "--main"], hlt_test)
+        self.assertTrue(args.main)
+
+    def test_main_bench_run_controls(self):
+        # hlt --main 没有 --warmup/--repeat/--cpu/--serial, 按默认值执行一次, 不绑定 CPU 也不加锁
+        def hlt_test(args, cfgs):
+            with mock.patch.object(ci.os, "sched_setaffinity", create=True) as set_affinity, \
+                    ci.bench_run_controls(args, cfgs):
+                self.assertFalse(args.main and args.warmup)
+                self.assertEqual(args.repeat or 1, 1)
+            set_affinity.assert_not_called()
+
+        run_subcommand(["hlt", "--main"], hlt_test)
+
+    def test_subcommands_get_past_arguments(self):
+        # HLTtest 和 run_one_case 按 --main/--fuzz 读取的参数, 每个子命令都要有
+        def hlt_test(args, cfgs):
+            if args.main:
+                ci.load_bench_baseline(args, cfgs)
+            ci.fuzz_budget(args)
+            with ci.bench_run_controls(args, cfgs):
+                pass
+
+        for argv, main, fuzz, budget in ((["hlt"], False, False, None),
+                                         (["hlt", "--main"], True, False, None),
+                                         (["hlt", "--fuzz"], False, True, None),
+                                         (["cjtest"], False, False, None),
+                                         (["fuzz", "--budget", "10m"], None, True, 600)):
+            with self.subTest(argv=argv):
+                args = run_subcommand(argv, hlt_test)
+                self.assertEqual((args.main, bool(args.fuzz), ci.fuzz_budget(args)), (main, fuzz, budget))
+
+
+if __name__ == '__main__':
+    unittest.main()
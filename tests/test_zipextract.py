@@ -0,0 +1,64 @@
+# @Copyright (c) Huawei Technologies Co., Ltd. 2024-2025. All rights reserved.
+# Licensed under the Apache-2.0 License. See LICENSE file for details.
+import os
+import stat
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "ci_test"))
+
+from zipextract import extract_zip  # noqa: E402
+
+
+def add_file(zip_ref, name, data, mode):
+    info = zipfile.ZipInfo(name)
+    info.create_system = 3
+    info.external_attr = (stat.S_IFREG | mode) << 16
+    zip_ref.writestr(info, data)
+
+
+class ExtractZipTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.zip_path = os.path.join(self.temp_dir.name, "stdx.zip")
+        self.extract_dir = os.path.join(self.temp_dir.name, "out")
+        with zipfile.ZipFile(self.zip_path, "w") as zip_ref:
+            add_file(zip_ref, "stdx/bin/tool", b"#!/bin/sh\n", 0o755)
+            add_file(zip_ref, "stdx/lib/libstdx.a", b"archive", 0o644)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.extract_dir, *name.split("/"))
+
+    def mode(self, name):
+        return os.stat(self.path(name)).st_mode & 0o777
+
+    def test_extract_and_skip(self):
+        self.assertEqual(extract_zip(self.zip_path, self.extract_dir), (2, 0))
+        self.assertEqual(self.mode("stdx/bin/tool"), 0o755)
+        self.assertEqual(extract_zip(self.zip_path, self.extract_dir), (0, 2))
+
+    def test_changed_file_is_extracted_again(self):
+        extract_zip(self.zip_path, self.extract_dir)
+        with open(self.path("stdx/lib/libstdx.a"), "wb") as f:
+            f.write(b"ARCHIVE")
+        os.remove(os.path.join(self.extract_dir, ".stdx.zip.extracted"))
+        self.assertEqual(extract_zip(self.zip_path, self.extract_dir), (1, 1))
+        with open(self.path("stdx/lib/libstdx.a"), "rb") as f:
+            self.assertEqual(f.read(), b"archive")
+
+    @unittest.skipIf(os.name == "nt", "unix file modes")
+    def test_skipped_file_gets_exec_bit_back(self):
+        extract_zip(self.zip_path, self.extract_dir)
+        os.chmod(self.path("stdx/bin/tool"), 0o644)
+        self.assertEqual(extract_zip(self.zip_path, self.extract_dir), (0, 2))
+        self.assertEqual(self.mode("stdx/bin/tool"), 0o755)
+        self.assertEqual(self.mode("stdx/lib/libstdx.a"), 0o644)
+
+
+if __name__ == '__main__':
+    unittest.main()